@@ -1,33 +1,136 @@
 import sys
 import os
-import certifi
+import json
 
-ca=certifi.where()
 from dotenv import load_dotenv
 load_dotenv()
 
-mongo_db_url=os.getenv("MONGODB_URL")
-print(mongo_db_url)
-
-import pymongo
-
+# nothing training-only is imported here: the training pipeline (mlflow, Mongo) is imported by the
+# training worker process, sklearn and scipy when the model is loaded, see SERVING_DEFERRED_IMPORTS
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logging
-from networksecurity.pipeline.training_pipeline import TrainingPipeline
+from networksecurity.pipeline.training_jobs import TrainingJobManager, clear_training_checkpoint
 from networksecurity.utils.model.estimator import NetworkModel
+from networksecurity.utils.model.registry import ModelRegistry, write_legacy_model_manifest
+from networksecurity.utils.main_utils.schema import FeatureSchema
+from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix,read_compact_csv
+from networksecurity.utils.model.batcher import MicroBatcher
+from networksecurity.utils.model.drift_monitor import DriftMonitor
+from networksecurity.utils.model.prediction_cache import PredictionCache
 
-from fastapi import FastAPI,File,UploadFile,Request
+from fastapi import FastAPI,File,UploadFile,Request,HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn import run as app_run
 from fastapi.responses import Response
 from starlette.responses import RedirectResponse
-import pandas as pd
+from contextlib import asynccontextmanager
+import numpy as np
+
+from networksecurity.constant.training_pipeline import MICRO_BATCH_MAX_SIZE,MICRO_BATCH_MAX_WAIT_MS,MICRO_BATCH_MAX_QUEUE_DEPTH
+from networksecurity.constant.training_pipeline import SERVING_IO_MAX_WORKERS,SERVING_DRIFT_WINDOW_ROWS,SERVING_DRIFT_MIN_ROWS
+from networksecurity.constant.training_pipeline import SERVING_PREDICTION_CACHE_MAX_ENTRIES,SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH,SERVING_PREDICTION_CACHE_PREWARM_ROWS
+from networksecurity.constant.training_pipeline import SERVING_BULK_MAX_WORKERS,SERVING_BULK_MAX_PENDING
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+model_registry = ModelRegistry()
+feature_schema = FeatureSchema.from_yaml()
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SERVING_IO_MAX_WORKERS", SERVING_IO_MAX_WORKERS)), thread_name_prefix="serving-io"
+)
+
+
+drift_monitor = DriftMonitor(window_rows=int(os.getenv("SERVING_DRIFT_WINDOW_ROWS", SERVING_DRIFT_WINDOW_ROWS)),
+                             min_rows=int(os.getenv("SERVING_DRIFT_MIN_ROWS", SERVING_DRIFT_MIN_ROWS)))
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("SERVING_PREDICTION_CACHE_MAX_ENTRIES", SERVING_PREDICTION_CACHE_MAX_ENTRIES))
+)
+
+
+def prewarm_prediction_cache():
+    """Caches the predictions of the most frequent feature vectors of the prewarm file for the current model"""
+    file_path = os.getenv("SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH", SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH)
+    if not file_path or not os.path.exists(file_path):
+        return
+    try:
+        x = FeatureMatrix.from_frame(read_compact_csv(file_path), feature_schema.feature_columns).codes
+        n_rows = prediction_cache.prewarm(
+            model_registry.get_model(), x,
+            max_rows=int(os.getenv("SERVING_PREDICTION_CACHE_PREWARM_ROWS", SERVING_PREDICTION_CACHE_PREWARM_ROWS)),
+        )
+        logging.info(f"Prediction cache prewarmed with {n_rows} feature vectors from {file_path}")
+    except (NetworkSecurityException, KeyError, ValueError) as e:
+        logging.error(f"Prediction cache prewarm failed: {e}")
+
+
+def score_batch(x):
+    """
+    Scores a micro-batch with one model. Its version and operating threshold (NaN for the model's
+    argmax decision) are returned per row, so each request reports the model that labelled it.
+    """
+    model, version, profile = model_registry.get_current()
+    # the cache restarts empty when the registry swaps in a new model
+    labels, probabilities = prediction_cache.predict_with_proba(model, x)
+    try:
+        drift_monitor.observe(profile, x, labels)
+    except NetworkSecurityException as e:
+        # monitoring must never fail a scoring request
+        logging.error(f"Drift monitoring failed: {e}")
+    threshold = model.threshold
+    return (labels, probabilities, np.full(len(labels), version),
+            np.full(len(labels), np.nan if threshold is None else threshold))
+
+
+# uploads are scored apart from the micro-batches, a large CSV never delays /v1/score
+bulk_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("SERVING_BULK_MAX_WORKERS", SERVING_BULK_MAX_WORKERS)), thread_name_prefix="bulk-scoring"
+)
+bulk_slots = threading.BoundedSemaphore(int(os.getenv("SERVING_BULK_MAX_PENDING", SERVING_BULK_MAX_PENDING)))
+
+
+async def score_bulk(x):
+    """
+    Scores a whole upload on bulk_executor, see score_batch.
+    :raises asyncio.QueueFull: If SERVING_BULK_MAX_PENDING uploads are already in flight.
+    """
+    if not bulk_slots.acquire(blocking=False):
+        raise asyncio.QueueFull()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(bulk_executor, score_batch, x)
+    finally:
+        bulk_slots.release()
+
+
+score_batcher = MicroBatcher(
+    predict_fn=score_batch,
+    max_batch_size=int(os.getenv("MICRO_BATCH_MAX_SIZE", MICRO_BATCH_MAX_SIZE)),
+    max_wait_ms=float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", MICRO_BATCH_MAX_WAIT_MS)),
+    max_queue_depth=int(os.getenv("MICRO_BATCH_MAX_QUEUE_DEPTH", MICRO_BATCH_MAX_QUEUE_DEPTH)),
+)
+
 
-from networksecurity.utils.main_utils.utils import load_object
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the model once per process, requests reuse it afterwards
+    try:
+        # a model published before manifests existed is served rather than refused
+        write_legacy_model_manifest(model_registry.model_dir)
+        model_registry.refresh(force=True)
+    except NetworkSecurityException as ne:
+        logging.error(f"Could not load model at startup: {ne}")
+    if model_registry.version:
+        prewarm_prediction_cache()
+    # new models are loaded in the background, never on a scoring request
+    model_registry.start()
+    training_jobs.start()
+    await score_batcher.start()
+    yield
+    await score_batcher.stop()
+    model_registry.stop()
 
-from networksecurity.constant.training_pipeline import DATA_INGESTION_COLLECTION_NAME,DATA_INGESTION_DATABASE_NAME
 
-app=FastAPI()
+app=FastAPI(lifespan=lifespan)
 origins=["*"]
 
 app.add_middleware(
@@ -48,46 +151,115 @@ async def root():
 
 
 
-from fastapi import BackgroundTasks
+def reload_model_after_training():
+    if model_registry.refresh(force=True):
+        prewarm_prediction_cache()
+
+
+# a cancelled run is not resumed, the next /train starts from scratch
+training_jobs = TrainingJobManager(on_success=reload_model_after_training, on_cancel=clear_training_checkpoint)
+
 
 @app.post("/train")
-async def train_model(background_tasks: BackgroundTasks):
-    try:
-        pipeline = TrainingPipeline()
+async def train_model():
+    # the pipeline runs in a separate worker process, see TrainingJobManager
+    job = training_jobs.submit()
+    return {"message": "Training pipeline queued.", "job_id": job.job_id, "status": job.status}
 
-        
-        # ✅ Run in background thread to avoid blocking the request
-        background_tasks.add_task(pipeline.run_pipeline)
 
-        return {"message": "Training pipeline started in the background."}
+@app.get("/train/{job_id}")
+async def training_status(job_id: str):
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job.to_dict()
+
+
+@app.delete("/train/{job_id}")
+async def cancel_training(job_id: str):
+    job = training_jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job.to_dict()
 
-    except NetworkSecurityException as ne:
-        logging.error(str(ne))
-        #raise HTTPException(status_code=500, detail=f"Pipeline error: {str(ne)}")
 
-    except Exception as e:
-        logging.error(str(e))
-        #raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+def write_prediction_output(df):
+    df.to_csv('prediction_output/output.csv')
+    return df.to_html(classes='table table-striped')
+
 
 @app.post("/predict")
 async def predict(request: Request,file: UploadFile = File(...)):
-    df=pd.read_csv(file.file)
-        #print(df)
-    preprocesor=load_object("final_model/preprocessor.pkl")
-    final_model=load_object("final_model/model.pkl")
-    network_model = NetworkModel(preprocessor=preprocesor,model=final_model)
-    print(df.iloc[0])
-    y_pred = network_model.predict(df)
-    print(y_pred)
+    loop = asyncio.get_running_loop()
+    # parsing and rendering are CPU bound, keep them off the event loop
+    df = await loop.run_in_executor(io_executor, read_compact_csv, file.file)
+    try:
+        x = FeatureMatrix.from_frame(df, feature_schema.feature_columns).codes
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        y_pred, y_score, _, _ = await score_bulk(x)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Too many uploads are being scored")
     df['predicted_column'] = y_pred
-    print(df['predicted_column'])
+    df['predicted_score'] = y_score
         #df['predicted_column'].replace(-1, 0)
         #return df.to_json()
-    df.to_csv('prediction_output/output.csv')
-    table_html = df.to_html(classes='table table-striped')
-        #print(table_html)
-    return templates.TemplateResponse("table.html", {"request": request, "table": table_html})
+    table_html = await loop.run_in_executor(io_executor, write_prediction_output, df)
+    return templates.TemplateResponse(request, "table.html", {"table": table_html})
+
+
+
+@app.post("/v1/score")
+async def score(request: Request):
+    """
+    Scores feature vectors without building a DataFrame or touching disk.
+
+    Accepts either JSON ({"records": [...]}, each record a list in schema column order or an
+    object keyed by column name) or an application/octet-stream body of row-major int8 codes.
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            x = feature_schema.array_from_bytes(body)
+        else:
+            payload = json.loads(body)
+            records = payload.get("records") if isinstance(payload, dict) else payload
+            x = feature_schema.array_from_records(records)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        labels, probabilities, versions, thresholds = await score_batcher.submit(x)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Scoring queue is full")
+    # taken from the model that scored these rows, a hot swap may have happened since
+    threshold = float(thresholds[0]) if len(thresholds) and not np.isnan(thresholds[0]) else None
+    return {
+        "model_version": int(versions[0]) if len(versions) else model_registry.version,
+        "labels": labels.tolist(),
+        "probabilities": probabilities.tolist(),
+        # operating threshold the labels were decided with, null for the model's argmax decision
+        "threshold": threshold,
+    }
+
+
+@app.get("/v1/metrics")
+async def metrics():
+    return {
+        "model_version": model_registry.version,
+        "micro_batching": score_batcher.metrics(),
+        "prediction_cache": prediction_cache.metrics(),
+    }
+
 
+@app.get("/v1/drift")
+async def drift():
+    """Drift of the recently scored traffic against the reference profile of the serving model"""
+    report = drift_monitor.report()
+    if report is None:
+        raise HTTPException(status_code=404, detail="No traffic scored by a model with a reference profile yet")
+    return {"model_version": model_registry.version, **report}
 
 
 # Run the app
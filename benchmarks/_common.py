@@ -0,0 +1,13 @@
+"""Helpers shared by the benchmark scripts."""
+import time
+
+
+def timed(fn, repeat: int = 1):
+    """
+    Calls fn repeat times.
+    :return: Tuple of (result of the last call, mean seconds per call).
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
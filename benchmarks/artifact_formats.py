@@ -0,0 +1,67 @@
+"""
+Compares the artifact formats of networksecurity.utils.main_utils.frame_store per pipeline stage.
+
+    python benchmarks/artifact_formats.py --repeat 20
+
+The phishing CSV is replicated --repeat times and every stage's reads and writes are timed:
+ingestion (feature store + train/test split), validation (read back, write validated) and
+transformation (read validated).
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import timed
+from networksecurity.utils.main_utils.feature_matrix import compact_frame
+from networksecurity.utils.main_utils.frame_store import FILE_EXTENSIONS, read_frame, write_frame
+
+
+def run_stages(data: pd.DataFrame, work_dir: str, file_format: str) -> dict:
+    extension = FILE_EXTENSIONS[file_format]
+    path = lambda name: os.path.join(work_dir, file_format, name + extension)
+    n_train = int(len(data) * 0.8)
+
+    _, ingestion = timed(lambda: (write_frame(data, path("feature_store")),
+                                  write_frame(data.iloc[:n_train], path("train")),
+                                  write_frame(data.iloc[n_train:], path("test"))))
+
+    def validation():
+        train, test = read_frame(path("train")), read_frame(path("test"))
+        write_frame(train, path("valid_train"))
+        write_frame(test, path("valid_test"))
+    _, validation_seconds = timed(validation)
+
+    _, transformation = timed(lambda: (read_frame(path("valid_train")), read_frame(path("valid_test"))))
+
+    size = sum(os.path.getsize(path(name)) for name in ("feature_store", "train", "test", "valid_train", "valid_test"))
+    return {
+        "format": file_format,
+        "ingestion_s": ingestion,
+        "validation_s": validation_seconds,
+        "transformation_s": transformation,
+        "total_s": ingestion + validation_seconds + transformation,
+        "bytes_written": size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file-path", default=os.path.join("Network_Data", "phisingData.csv"))
+    parser.add_argument("--repeat", type=int, default=20, help="times the CSV is replicated")
+    args = parser.parse_args(argv)
+
+    data = compact_frame(pd.concat([pd.read_csv(args.file_path)] * args.repeat, ignore_index=True))
+    print(f"{len(data)} rows x {data.shape[1]} columns")
+    with tempfile.TemporaryDirectory() as work_dir:
+        report = pd.DataFrame([run_stages(data, work_dir, file_format) for file_format in FILE_EXTENSIONS])
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    return report
+
+
+if __name__ == "__main__":
+    main()
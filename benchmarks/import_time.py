@@ -0,0 +1,91 @@
+"""
+Times the cold import of the entry points, each in a fresh interpreter.
+
+    python benchmarks/import_time.py --modules app networksecurity.pipeline.batch_prediction --repeat 5
+
+The median wall time of `import <module>` is reported with the heavy packages it loaded.
+The serving app is checked against SERVING_IMPORT_TIME_BUDGET_SECONDS and must not load
+SERVING_DEFERRED_IMPORTS; tests.py enforces the same budget. --importtime prints the slowest
+modules from python -X importtime to find what to defer next.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from networksecurity.constant.training_pipeline import SERVING_DEFERRED_IMPORTS, SERVING_IMPORT_TIME_BUDGET_SECONDS
+
+HEAVY_PACKAGES = ("pandas", "pyarrow", "sklearn", "scipy", "mlflow", "pymongo")
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(",".join(name for name in {packages!r} if name in sys.modules))
+"""
+
+
+def import_module_cold(module: str, packages=HEAVY_PACKAGES, importtime: bool = False):
+    """
+    Imports module in a fresh interpreter started in the repository root.
+    :return: Tuple of (seconds, loaded packages among packages, stderr).
+    """
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + \
+        ["-c", PROBE.format(module=module, packages=tuple(packages))]
+    result = subprocess.run(command, cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    seconds, loaded = result.stdout.strip().splitlines()[-2:]
+    return float(seconds), [name for name in loaded.split(",") if name], result.stderr
+
+
+def slowest_imports(importtime_output: str, limit: int) -> pd.DataFrame:
+    """Modules with the largest self time in python -X importtime output"""
+    rows = []
+    for line in importtime_output.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            rows.append({"module": match.group(4), "self_ms": int(match.group(1)) / 1000,
+                         "cumulative_ms": int(match.group(2)) / 1000})
+    return pd.DataFrame(rows).nlargest(limit, "self_ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", nargs="+",
+                        default=["app", "networksecurity.pipeline.batch_prediction",
+                                 "networksecurity.pipeline.training_pipeline"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="print the N slowest modules of each entry point")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for module in args.modules:
+        timings = []
+        for _ in range(args.repeat):
+            seconds, loaded, _ = import_module_cold(module, tuple(dict.fromkeys(HEAVY_PACKAGES + SERVING_DEFERRED_IMPORTS)))
+            timings.append(seconds)
+        row = {"module": module, "median_s": statistics.median(timings), "min_s": min(timings),
+               "loaded": " ".join(name for name in loaded if name in HEAVY_PACKAGES) or "-"}
+        if module == "app":
+            deferred = [name for name in loaded if name in SERVING_DEFERRED_IMPORTS]
+            row["within_budget"] = row["median_s"] <= SERVING_IMPORT_TIME_BUDGET_SECONDS and not deferred
+        rows.append(row)
+        if args.importtime:
+            _, _, stderr = import_module_cold(module, importtime=True)
+            print(f"slowest imports of {module}:")
+            print(slowest_imports(stderr, args.importtime).to_string(index=False))
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    return report
+
+
+if __name__ == "__main__":
+    main()
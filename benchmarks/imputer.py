@@ -0,0 +1,55 @@
+"""
+Times FastImputer of networksecurity.utils.ml_utils.imputer against sklearn's KNNImputer.
+
+    python benchmarks/imputer.py --train-rows 11055 --rows 2000 --missing-rate 0.03
+
+Training and query rows are ternary feature codes, a share of the query values is set to NaN.
+Both imputers are timed on the whole batch and on single rows, as scored by the API.
+"""
+import argparse
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import timed
+from networksecurity.utils.ml_utils.imputer import FastImputer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train-rows", type=int, default=11_055)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--columns", type=int, default=30)
+    parser.add_argument("--missing-rate", type=float, default=0.03)
+    parser.add_argument("--n-neighbors", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    train = rng.integers(-1, 2, size=(args.train_rows, args.columns)).astype(float)
+    query = rng.integers(-1, 2, size=(args.rows, args.columns)).astype(float)
+    query[rng.random(query.shape) < args.missing_rate] = np.nan
+    single = query[np.isnan(query).any(axis=1)][:1]
+    print(f"train {train.shape}, query {query.shape}, {int(np.isnan(query).any(axis=1).sum())} rows with NaN")
+
+    rows = []
+    for name, imputer in [("KNNImputer", KNNImputer(n_neighbors=args.n_neighbors)),
+                          ("FastImputer", FastImputer(n_neighbors=args.n_neighbors)),
+                          ("FastImputer (mode)", FastImputer(strategy="mode"))]:
+        _, fit_seconds = timed(lambda: imputer.fit(train))
+        _, batch_seconds = timed(lambda: imputer.transform(query))
+        _, single_seconds = timed(lambda: imputer.transform(single), repeat=20)
+        rows.append({"imputer": name, "fit_s": fit_seconds, "batch_s": batch_seconds,
+                     "single_row_ms": single_seconds * 1000, "pickle_kb": len(pickle.dumps(imputer)) / 1024})
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    return report
+
+
+if __name__ == "__main__":
+    main()
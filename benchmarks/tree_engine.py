@@ -0,0 +1,70 @@
+"""
+Times the compiled tree engine of networksecurity.utils.model.tree_engine against sklearn's predict_proba.
+
+    python benchmarks/tree_engine.py --batch-sizes 1 64 10000 --n-estimators 256
+
+A RandomForest, a GradientBoosting and an AdaBoost model are trained on ternary feature codes
+(the phishing data if it is found, random codes otherwise). NetworkModel picks the engine or
+sklearn per batch, see CompiledTreeEnsemble.handles, its column shows which one served.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._common import timed
+from networksecurity.constant.training_pipeline import TARGET_COLUMN
+from networksecurity.utils.model.tree_engine import compile_tree_engine
+
+DATA_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "Network_Data", "phisingData.csv")
+
+
+def load_data(rng):
+    if os.path.exists(DATA_FILE_PATH):
+        frame = pd.read_csv(DATA_FILE_PATH)
+        return frame.drop(columns=[TARGET_COLUMN]).to_numpy(dtype=float), (frame[TARGET_COLUMN] > 0).to_numpy(int)
+    x = rng.integers(-1, 2, size=(11_055, 30)).astype(float)
+    return x, (x[:, :5].sum(axis=1) + rng.normal(size=len(x)) > 0).astype(int)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10_000])
+    parser.add_argument("--n-estimators", type=int, default=256)
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="time spent per measurement")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x, y = load_data(rng)
+    models = {
+        "Random Forest": RandomForestClassifier(n_estimators=args.n_estimators, random_state=0),
+        "Gradient Boosting": GradientBoostingClassifier(n_estimators=args.n_estimators, random_state=0),
+        "AdaBoost": AdaBoostClassifier(n_estimators=args.n_estimators, random_state=0),
+    }
+    rows = []
+    for name, model in models.items():
+        model.fit(x, y)
+        engine = compile_tree_engine(model)
+        for batch_size in args.batch_sizes:
+            batch = x[rng.integers(0, len(x), size=batch_size)]
+            expected, sklearn_seconds = timed(lambda: model.predict_proba(batch), 1)
+            repeat = max(1, int(args.min_seconds / max(sklearn_seconds, 1e-6)))
+            expected, sklearn_seconds = timed(lambda: model.predict_proba(batch), repeat)
+            proba, engine_seconds = timed(lambda: engine.predict_proba(batch), repeat)
+            rows.append({"model": name, "batch": batch_size, "sklearn_ms": sklearn_seconds * 1000,
+                         "engine_ms": engine_seconds * 1000, "speedup": sklearn_seconds / engine_seconds,
+                         "identical": bool(np.array_equal(proba, expected)),
+                         "NetworkModel": "engine" if engine.handles(batch_size) else "sklearn"})
+    report = pd.DataFrame(rows)
+    print(report.to_string(index=False, float_format=lambda value: f"{value:.3f}"))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,5 @@
-import os
-import sys
-import json
+"""Kept for existing scripts, the bulk loader lives in push_data.py: python push_data.py --help"""
+from push_data import NetworkDataExtract, main
 
-from dotenv import load_dotenv
-load_dotenv()
-
-MONGO_DB_URL=os.getenv("MONGODB_URL")
-print(MONGO_DB_URL)
-
-import certifi
-ca=certifi.where()
-
-import pandas as pd
-import numpy as np
-import pymongo
-from networksecurity.exception.exceptions import NetworkSecurityException
-from networksecurity.logging.logger import logging
-
-class NetworkDataExtract():
-    def __init__(self):
-        try:
-            pass
-        except Exception as e:
-            raise NetworkSecurityException(e,sys)
-        
-    def csv_to_json_convertor(self,file_path):
-        try:
-            data=pd.read_csv(file_path)
-            data.reset_index(drop=True,inplace=True)
-            records=list(json.loads(data.T.to_json()).values())
-            return records
-        except Exception as e:
-            raise NetworkSecurityException(e,sys)
-        
-    def insert_data_mongodb(self,records,database,collection):
-        try:
-            self.database=database
-            self.collection=collection
-            self.records=records
-
-            self.mongo_client=pymongo.MongoClient(MONGO_DB_URL)
-            self.database = self.mongo_client[self.database]
-            
-            self.collection=self.database[self.collection]
-            self.collection.insert_many(self.records)
-            return(len(self.records))
-        except Exception as e:
-            raise NetworkSecurityException(e,sys)
-        
 if __name__=='__main__':
-    FILE_PATH=r"Network_Data\phisingData.csv"
-    DATABASE="PhisingData"
-    Collection="network_security"
-    networkobj=NetworkDataExtract()
-    records=networkobj.csv_to_json_convertor(file_path=FILE_PATH)
-    #print(records)
-    no_of_records=networkobj.insert_data_mongodb(records,DATABASE,Collection)
-    print(no_of_records)
-        
-
-
+    main()
@@ -3,51 +3,198 @@ from networksecurity.entity.config_entity import DataIngestionConfig
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logger
 from networksecurity.entity.artifact_entity import ArtifactEntity
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN, TRAINING_MODE_FULL, TRAINING_MODE_INCREMENTAL
+from networksecurity.utils.main_utils.feature_matrix import MISSING_CODE, compact_frame, is_int8_compatible
+from networksecurity.utils.main_utils.frame_store import append_frame, read_frame, write_frame
+from networksecurity.utils.main_utils.utils import read_yaml_file
 
 import os
 import pymongo
 import sys
-from typing import List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from bson import ObjectId
+from networksecurity.utils.ml_utils.drift import DriftProfile, ReferenceProfile
 from sklearn.model_selection import train_test_split
 
 
-# Ensure MONGO_URI is loaded
 load_dotenv()
-MONGO_URL = os.getenv("MONGODB_URL")
-print("MONGO_URL:", MONGO_URL)
-if not MONGO_URL:
-    raise ValueError("MONGODB_URI environment variable is not set.")
 
 
 class DataIngestion:
     def __init__(self, data_ingestion_config: DataIngestionConfig):
         try:
             self.data_ingestion_config = data_ingestion_config
-            self.mongo_client = pymongo.MongoClient(MONGO_URL)
+            # read here rather than at import, only ingestion needs Mongo
+            mongo_url = os.getenv("MONGODB_URL")
+            if not mongo_url:
+                raise ValueError("MONGODB_URL environment variable is not set.")
+            # one pooled connection per concurrent partition read
+            self.mongo_client = pymongo.MongoClient(mongo_url, maxPoolSize=max(100, data_ingestion_config.read_concurrency))
+            # newest _id seen by the last export, the watermark of the next incremental run
+            self.watermark: Optional[str] = None
+            self.schema_columns: List[str] = list(read_yaml_file(SCHEMA_FILE_PATH)["columns"])
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
-    def export_collection_as_dataframe(self) -> pd.DataFrame:
+    def stream_collection(self, collection, query: dict) -> Tuple[np.ndarray, Optional[ObjectId]]:
+        """
+        Reads the documents matching query projected on the schema columns, cursor_batch_size
+        documents at a time, straight into one preallocated int8 array. The array is only widened
+        to float64 if a value does not fit in int8. Missing fields are stored as missing values
+        (MISSING_CODE or NaN). Memory grows with the number of documents, not with their BSON size.
+        :return: Tuple of (values in schema column order, newest _id or None).
+        """
+        columns = self.schema_columns
+        batch_size = self.data_ingestion_config.cursor_batch_size
+        log_interval = self.data_ingestion_config.progress_log_interval
+        # _id is always returned, it is only kept for the watermark
+        projection = {column: 1 for column in columns}
+
+        expected = collection.count_documents(query) if query else collection.estimated_document_count()
+        values = np.empty((max(expected, 1), len(columns)), dtype=np.int8)
+        n_rows = 0
+        newest_id = None
+        next_log = log_interval
+        started = time.perf_counter()
+
+        cursor = iter(collection.find(query, projection=projection, batch_size=batch_size, sort=[("_id", 1)]))
+        while True:
+            batch = list(islice(cursor, batch_size))
+            if not batch:
+                break
+            block = np.array([[document.get(column) for column in columns] for document in batch], dtype=np.float64)
+            batch_newest_id = max(document["_id"] for document in batch)
+            newest_id = batch_newest_id if newest_id is None else max(newest_id, batch_newest_id)
+
+            if n_rows + len(block) > len(values):
+                # documents inserted while exporting
+                grown = np.empty((max(2 * len(values), n_rows + len(block)), len(columns)), dtype=values.dtype)
+                grown[:n_rows] = values[:n_rows]
+                values = grown
+            missing = np.isnan(block)
+            if values.dtype == np.int8 and not is_int8_compatible(np.where(missing, 0, block)):
+                values = np.where(values == MISSING_CODE, np.nan, values).astype(np.float64)
+            if values.dtype == np.int8:
+                block = np.where(missing, MISSING_CODE, block)
+            values[n_rows:n_rows + len(block)] = block
+            n_rows += len(block)
+
+            if n_rows >= next_log:
+                elapsed = time.perf_counter() - started
+                logger.info(f"Exported {n_rows}/{expected} records ({n_rows / elapsed:.0f} records/s)")
+                next_log += log_interval
+
+        logger.info(f"Exported {n_rows} records in {time.perf_counter() - started:.1f}s")
+        return values[:n_rows], newest_id
+
+    def source_fingerprint(self) -> dict:
+        """
+        Cheap identity of the collection contents: document count and newest _id. Documents
+        inserted or deleted change it, documents updated in place do not.
+        """
+        try:
+            collection = self.mongo_client[self.data_ingestion_config.database_name][self.data_ingestion_config.collection_name]
+            newest = collection.find_one({}, projection={"_id": 1}, sort=[("_id", -1)])
+            return {"count": collection.estimated_document_count(),
+                    "newest_id": str(newest["_id"]) if newest else None}
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def compute_split_points(self, collection, query: dict, n_partitions: int) -> List[ObjectId]:
+        """
+        _id values that cut the documents matching query into n_partitions ranges of similar size.
+        The "skip" strategy walks the _id index for exact quantiles, "sample" takes them from a
+        $sample of split_samples_per_partition ids per partition.
+        """
+        if n_partitions <= 1:
+            return []
+        strategy = self.data_ingestion_config.split_strategy
+        if strategy == "skip":
+            expected = collection.count_documents(query)
+            split_points = []
+            for k in range(1, n_partitions):
+                cursor = collection.find(query, projection={"_id": 1}, sort=[("_id", 1)]).skip(k * expected // n_partitions).limit(1)
+                split_points.extend(document["_id"] for document in cursor)
+        elif strategy == "sample":
+            n_samples = n_partitions * self.data_ingestion_config.split_samples_per_partition
+            pipeline = [{"$match": query}, {"$sample": {"size": n_samples}}, {"$project": {"_id": 1}}]
+            sampled = sorted(document["_id"] for document in collection.aggregate(pipeline))
+            split_points = [sampled[k * len(sampled) // n_partitions] for k in range(1, n_partitions)] if sampled else []
+        else:
+            raise ValueError(f"Unknown split strategy: {strategy}")
+        return sorted(set(split_points))
+
+    @staticmethod
+    def partition_queries(query: dict, split_points: List[ObjectId]) -> List[dict]:
+        """Adds one _id range per partition to query, the ranges cover every _id exactly once."""
+        bounds = [None] + list(split_points) + [None]
+        queries = []
+        for lower, upper in zip(bounds[:-1], bounds[1:]):
+            id_range = dict(query.get("_id", {}))
+            if lower is not None:
+                id_range["$gte"] = lower
+            if upper is not None:
+                id_range["$lt"] = upper
+            queries.append({**query, "_id": id_range} if id_range else dict(query))
+        return queries
+
+    def read_partitions(self, collection, query: dict) -> Tuple[np.ndarray, Optional[ObjectId]]:
+        """
+        Reads the documents matching query as _id ranges on read_concurrency threads, each with
+        its own connection from the client pool. Partitions are concatenated in _id order, so the
+        result does not depend on which read finishes first.
+        :return: Tuple of (values in schema column order, newest _id or None).
+        """
+        config = self.data_ingestion_config
+        expected = collection.count_documents(query) if query else collection.estimated_document_count()
+        n_partitions = max(1, min(config.read_partitions, expected // max(config.min_partition_size, 1)))
+        queries = self.partition_queries(query, self.compute_split_points(collection, query, n_partitions))
+        if len(queries) == 1:
+            return self.stream_collection(collection, queries[0])
+
+        logger.info(f"Reading {expected} records as {len(queries)} partitions with {config.read_concurrency} threads")
+        with ThreadPoolExecutor(max_workers=config.read_concurrency, thread_name_prefix="mongo-read") as executor:
+            results = list(executor.map(lambda partition_query: self.stream_collection(collection, partition_query), queries))
+
+        parts = [values for values, _ in results]
+        if any(part.dtype != np.int8 for part in parts):
+            parts = [np.where(part == MISSING_CODE, np.nan, part).astype(np.float64) if part.dtype == np.int8 else part
+                     for part in parts]
+        newest_ids = [newest_id for _, newest_id in results if newest_id is not None]
+        return np.concatenate(parts), max(newest_ids) if newest_ids else None
+
+    def export_collection_as_dataframe(self, after_watermark: Optional[str] = None) -> pd.DataFrame:
+        """
+        Exports the collection, or with after_watermark only the documents whose _id is newer.
+        ObjectIds grow with insertion time, so _id works as an append-only watermark.
+        """
         try:
             logger.info("Connecting to MongoDB and fetching data...")
             db = self.mongo_client[self.data_ingestion_config.database_name]
-            logger.info(f"Databases available: {self.mongo_client.list_database_names()}")
-            logger.info(f"Collections in DB '{db.name}': {db.list_collection_names()}")
-
             collection = db[self.data_ingestion_config.collection_name]
-            logger.info(f"Using collection: {collection.name}")
+            logger.info(f"Using collection: {self.data_ingestion_config.database_name}.{self.data_ingestion_config.collection_name}")
 
-            data = list(collection.find())
-            logger.info(f"Fetched {len(data)} records from MongoDB.")
+            query = {"_id": {"$gt": ObjectId(after_watermark)}} if after_watermark else {}
+            values, newest_id = self.read_partitions(collection, query)
+            logger.info(f"Fetched {len(values)} records from MongoDB.")
 
-            if len(data) == 0:
+            if len(values) == 0:
+                if after_watermark:
+                    self.watermark = after_watermark
+                    return pd.DataFrame(columns=self.schema_columns)
                 raise ValueError("No data found in MongoDB collection.")
+            self.watermark = str(newest_id)
 
-            df = pd.DataFrame(data)
-            if "_id" in df.columns:
-                df.drop(columns=["_id"], inplace=True)
-            df.dropna(inplace=True)
+            # rows with a missing value are dropped
+            missing = values == MISSING_CODE if values.dtype == np.int8 else np.isnan(values)
+            values = values[~missing.any(axis=1)]
+            # ternary features and label fit in one byte per value
+            df = compact_frame(pd.DataFrame(values, columns=self.schema_columns))
 
             logger.info(f"DataFrame shape after cleaning: {df.shape}")
             return df
@@ -59,13 +206,52 @@ class DataIngestion:
         try:
             logger.info("Exporting data into feature store...")
             feature_store_path = self.data_ingestion_config.feature_store_file_path
-            os.makedirs(os.path.dirname(feature_store_path), exist_ok=True)
-            data.to_csv(feature_store_path, index=False)
+            write_frame(data, feature_store_path)
             logger.info(f"Data exported to {feature_store_path}")
             return data
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
+    def update_persistent_feature_store(self, data: pd.DataFrame, append: bool) -> str:
+        """Overwrites (full run) or appends to (incremental run) the feature store kept across runs."""
+        try:
+            store_path = self.data_ingestion_config.persistent_feature_store_file_path
+            if append:
+                append_frame(data, store_path)
+            else:
+                write_frame(data, store_path)
+            logger.info(f"{'Appended' if append else 'Wrote'} {len(data)} records to {store_path}")
+            return store_path
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def detect_drift(self, data: pd.DataFrame) -> bool:
+        """
+        Compares the feature histograms of the new records with the reference profile of the
+        published model, or with the persistent feature store if there is no profile.
+        :return: True if any feature column drifted, see DriftProfile.compare.
+        """
+        try:
+            profile_path = self.data_ingestion_config.reference_profile_file_path
+            store_path = self.data_ingestion_config.persistent_feature_store_file_path
+            if os.path.exists(profile_path):
+                # time proportional to the new records, the historical data is not read
+                profile = ReferenceProfile.load(profile_path).features
+            elif os.path.exists(store_path):
+                reference = read_frame(store_path)
+                columns = [column for column in data.columns if column in reference.columns and column != TARGET_COLUMN]
+                profile = DriftProfile.from_frame(reference, columns)
+            else:
+                return False
+            report = profile.compare(data, p_value_threshold=self.data_ingestion_config.drift_p_value,
+                                     psi_threshold=self.data_ingestion_config.drift_psi_threshold)
+            drifted = report.index[report["drifted"]].tolist()
+            if drifted:
+                logger.warning(f"New records drifted from the feature store in columns: {drifted}")
+            return bool(drifted)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
     def initiate_train_test_split(self, data: pd.DataFrame) -> List[pd.DataFrame]:
         try:
             logger.info("Splitting data into train and test sets...")
@@ -75,10 +261,8 @@ class DataIngestion:
                 random_state=42
             )
 
-            os.makedirs(os.path.dirname(self.data_ingestion_config.training_file_path), exist_ok=True)
-
-            train.to_csv(self.data_ingestion_config.training_file_path, index=False)
-            test.to_csv(self.data_ingestion_config.testing_file_path, index=False)
+            write_frame(train, self.data_ingestion_config.training_file_path)
+            write_frame(test, self.data_ingestion_config.testing_file_path)
 
             logger.info(f"Train data saved at {self.data_ingestion_config.training_file_path}")
             logger.info(f"Test data saved at {self.data_ingestion_config.testing_file_path}")
@@ -87,17 +271,36 @@ class DataIngestion:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
 
-    def initiate_data_ingestion(self) -> ArtifactEntity:
+    def initiate_data_ingestion(self, mode: str = TRAINING_MODE_FULL, watermark: Optional[str] = None) -> ArtifactEntity:
+        """
+        Full mode exports the whole collection and rewrites the persistent feature store.
+        Incremental mode only exports the documents after watermark and appends them to the store.
+        If there are none (n_records=0) or they drifted (drift_detected), the artifact is returned
+        before anything is written.
+        """
         try:
-            logger.info("Initiating complete data ingestion pipeline...")
-            data = self.export_collection_as_dataframe()
-            data = self.export_data_into_feature_store(data)
-            train, test = self.initiate_train_test_split(data)
-
+            logger.info(f"Initiating {mode} data ingestion pipeline...")
+            incremental = mode == TRAINING_MODE_INCREMENTAL
+            data = self.export_collection_as_dataframe(after_watermark=watermark if incremental else None)
             artifact = ArtifactEntity(
                 train_file_path=self.data_ingestion_config.training_file_path,
-                test_file_path=self.data_ingestion_config.testing_file_path
+                test_file_path=self.data_ingestion_config.testing_file_path,
+                mode=mode,
+                watermark=self.watermark,
+                n_records=len(data),
             )
+            if len(data) == 0:
+                logger.info(f"No new records after watermark {watermark}")
+                return artifact
+
+            if incremental and self.detect_drift(data):
+                artifact.drift_detected = True
+                return artifact
+
+            self.update_persistent_feature_store(data, append=incremental)
+            data = self.export_data_into_feature_store(data)
+            train, test = self.initiate_train_test_split(data)
+
             logger.info("Data ingestion pipeline completed successfully.")
             return artifact
 
@@ -2,11 +2,11 @@ import sys
 import os
 import numpy as np
 import pandas as pd
-from sklearn.impute import KNNImputer
 from sklearn.pipeline import Pipeline
 
 from networksecurity.constant.training_pipeline import TARGET_COLUMN
 from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_IMPUTER_PARAMS
+from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_IMPUTER_STRATEGY
 
 from networksecurity.entity.artifact_entity import (
     DataTransformationArtifact,
@@ -16,7 +16,11 @@ from networksecurity.entity.artifact_entity import (
 from networksecurity.entity.config_entity import DataTransformationConfig
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logging
-from networksecurity.utils.main_utils.utils import save_numpy_array_data,save_object
+from networksecurity.utils.main_utils.utils import load_object,save_feature_label_arrays,save_object
+from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix,compact_array
+from networksecurity.utils.main_utils.frame_store import read_frame
+from networksecurity.utils.ml_utils.drift import ReferenceProfile
+from networksecurity.utils.ml_utils.imputer import FastImputer
 
 class DataTransformation:
     def __init__(self,data_validation_artifact:DataValidationArtifact,
@@ -30,14 +34,14 @@ class DataTransformation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_frame(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys)
         
     def get_data_transformer_object(cls)->Pipeline:
         """
-        It initialises a KNNImputer object with the parameters specified in the training_pipeline.py file
-        and returns a Pipeline object with the KNNImputer object as the first step.
+        It initialises a FastImputer object (nearest neighbours, or the column modes) with the parameters
+        specified in the training_pipeline.py file and returns a Pipeline object with it as the first step.
 
         Args:
           cls: DataTransformation
@@ -49,9 +53,10 @@ class DataTransformation:
             "Entered get_data_trnasformer_object method of Trnasformation class"
         )
         try:
-           imputer:KNNImputer=KNNImputer(**DATA_TRANSFORMATION_IMPUTER_PARAMS)
+           imputer:FastImputer=FastImputer(strategy=DATA_TRANSFORMATION_IMPUTER_STRATEGY,
+                                           **DATA_TRANSFORMATION_IMPUTER_PARAMS)
            logging.info(
-                f"Initialise KNNImputer with {DATA_TRANSFORMATION_IMPUTER_PARAMS}"
+                f"Initialise FastImputer ({DATA_TRANSFORMATION_IMPUTER_STRATEGY}) with {DATA_TRANSFORMATION_IMPUTER_PARAMS}"
             )
            processor:Pipeline=Pipeline([("imputer",imputer)])
            return processor
@@ -59,39 +64,67 @@ class DataTransformation:
             raise NetworkSecurityException(e,sys)
 
         
-    def initiate_data_transformation(self)->DataTransformationArtifact:
+    def build_reference_profile(self, features: list, labels: list, update: bool) -> ReferenceProfile:
+        """
+        Profile of the raw features (before imputation, as they arrive at serving) and the labels.
+        :param update: Add the rows to the published profile, for incremental runs.
+        """
+        try:
+            final_profile_path = self.data_transformation_config.final_reference_profile_file_path
+            if update and os.path.exists(final_profile_path):
+                profile = ReferenceProfile.load(final_profile_path)
+                start = 0
+            else:
+                profile = ReferenceProfile.from_training_data(features[0].codes, labels[0], features[0].columns)
+                start = 1
+            for feature_matrix, batch_labels in zip(features[start:], labels[start:]):
+                profile.update(feature_matrix.codes, batch_labels)
+            profile.save(self.data_transformation_config.reference_profile_file_path)
+            return profile
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def initiate_data_transformation(self, fit_preprocessor: bool = True)->DataTransformationArtifact:
+        """
+        :param fit_preprocessor: Fit a new preprocessor on the train split. Incremental runs pass
+                                 False to transform the new records with the published preprocessor.
+        """
         logging.info("Entered initiate_data_transformation method of DataTransformation class")
         try:
             logging.info("Starting data transformation")
             train_df=DataTransformation.read_data(self.data_validation_artifact.valid_train_file_path)
             test_df=DataTransformation.read_data(self.data_validation_artifact.valid_test_file_path)
 
-            ## training dataframe
-            input_feature_train_df=train_df.drop(columns=[TARGET_COLUMN],axis=1)
+            ## training dataframe, features stay int8 until they reach sklearn
+            input_feature_train=FeatureMatrix.from_frame(train_df.drop(columns=[TARGET_COLUMN]))
             target_feature_train_df = train_df[TARGET_COLUMN]
             target_feature_train_df = target_feature_train_df.replace(-1, 0)
 
             #testing dataframe
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_test = FeatureMatrix.from_frame(test_df.drop(columns=[TARGET_COLUMN]))
             target_feature_test_df = test_df[TARGET_COLUMN]
             target_feature_test_df = target_feature_test_df.replace(-1, 0)
 
-            preprocessor=self.get_data_transformer_object()
-
-            preprocessor_object=preprocessor.fit(input_feature_train_df)
-            transformed_input_train_feature=preprocessor_object.transform(input_feature_train_df)
-            transformed_input_test_feature =preprocessor_object.transform(input_feature_test_df)
+            if fit_preprocessor:
+                preprocessor=self.get_data_transformer_object()
+                preprocessor_object=preprocessor.fit(input_feature_train.to_float())
+            else:
+                preprocessor_object=load_object(self.data_transformation_config.final_preprocessor_file_path)
+            transformed_input_train_feature=preprocessor_object.transform(input_feature_train.to_float())
+            transformed_input_test_feature =preprocessor_object.transform(input_feature_test.to_float())
              
-
-            train_arr = np.c_[transformed_input_train_feature, np.array(target_feature_train_df) ]
-            test_arr = np.c_[ transformed_input_test_feature, np.array(target_feature_test_df) ]
-
-            #save numpy array data
-            save_numpy_array_data( self.data_transformation_config.transformed_train_file_path, array=train_arr, )
-            save_numpy_array_data( self.data_transformation_config.transformed_test_file_path,array=test_arr,)
+            # imputed values are only kept as float if they are not whole numbers
+            train_features = compact_array(transformed_input_train_feature)
+            test_features = compact_array(transformed_input_test_feature)
+            train_labels = compact_array(np.asarray(target_feature_train_df))
+            test_labels = compact_array(np.asarray(target_feature_test_df))
+
+            #save features and labels as separate memory-mappable arrays
+            save_feature_label_arrays( self.data_transformation_config.transformed_train_file_path, train_features, train_labels)
+            save_feature_label_arrays( self.data_transformation_config.transformed_test_file_path, test_features, test_labels)
             save_object( self.data_transformation_config.transformed_object_file_path, preprocessor_object,)
-
-            save_object( "final_model/preprocessor.pkl", preprocessor_object,)
+            self.build_reference_profile([input_feature_train, input_feature_test], [train_labels, test_labels],
+                                         update=not fit_preprocessor)
 
 
             #preparing artifacts
@@ -99,7 +132,8 @@ class DataTransformation:
             data_transformation_artifact=DataTransformationArtifact(
                 transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
                 transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
+                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path,
+                reference_profile_file_path=self.data_transformation_config.reference_profile_file_path,
             )
             return data_transformation_artifact
 
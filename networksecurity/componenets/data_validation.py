@@ -5,12 +5,14 @@ from networksecurity.logging.logger import logger
 from networksecurity.entity.artifact_entity import ArtifactEntity, DataValidationArtifact
 from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
 from networksecurity.utils.main_utils.utils import read_yaml_file,write_yaml_file
+from networksecurity.utils.main_utils.frame_store import read_frame, write_frame
 
-from scipy.stats import ks_2samp
+from networksecurity.utils.ml_utils.drift import DriftProfile
 
 import os
 import pymongo
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import pandas as pd
 
@@ -26,7 +28,7 @@ class DataValidation:
     @staticmethod
     def read_data(file_path: str) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_frame(file_path)
         except Exception as e:
             raise NetworkSecurityException(e, sys) from e
 
@@ -45,18 +47,16 @@ class DataValidation:
 
     def data_drift(self, train_data: pd.DataFrame, test_data: pd.DataFrame) -> bool:
         try:
-            report = {}
-            drift_detected = False
-            for column in train_data.columns:
-                if column in test_data.columns:
-                    stat, p_value = ks_2samp(train_data[column], test_data[column])
-                    report[column] = {
-                        "statistic": stat,
-                        "p_value": p_value
-                    }
-                    if p_value < 0.05:
-                        logger.warning(f"Data drift detected in column '{column}' (p-value: {p_value})")
-                        drift_detected = True
+            columns = [column for column in train_data.columns if column in test_data.columns]
+            drift = DriftProfile.from_frame(train_data, columns).compare(
+                test_data, p_value_threshold=self.data_validation_config.drift_p_value,
+                psi_threshold=self.data_validation_config.drift_psi_threshold)
+            report = {column: {name: float(value) if name != "drifted" else bool(value) for name, value in row.items()}
+                      for column, row in drift.to_dict(orient="index").items()}
+            drift_detected = bool(drift["drifted"].any())
+            for column in drift.index[drift["drifted"]]:
+                logger.warning(f"Data drift detected in column '{column}' (PSI: {drift.loc[column, 'psi']:.3f}, "
+                               f"p-value: {drift.loc[column, 'p_value']:.3g})")
 
             drift_report_file_path = self.data_validation_config.drift_report_file_path
             dir_path = os.path.dirname(drift_report_file_path)
@@ -74,23 +74,19 @@ class DataValidation:
             train_file_path = self.data_ingestion_artifact.train_file_path
             test_file_path = self.data_ingestion_artifact.test_file_path
 
-            train_dataframe = self.read_data(train_file_path)
-            test_dataframe = self.read_data(test_file_path)
-
-            validation_status = self.validate_number_of_columns(train_dataframe) and \
-                                self.validate_number_of_columns(test_dataframe)
-            if not validation_status:
-                raise NetworkSecurityException("Data validation failed due to column mismatch.", sys)
-
-            status= self.data_drift(train_dataframe, test_dataframe)
-
-            dir_path = os.path.dirname(self.data_validation_config.valid_train_file_path)
-            os.makedirs(dir_path, exist_ok=True)
-
-
-            # Save valid data
-            train_dataframe.to_csv(self.data_validation_config.valid_train_file_path, index=False,header=True)
-            test_dataframe.to_csv(self.data_validation_config.valid_test_file_path, index=False,header=True)
+            # train and test are independent: read and check them, then drift and writes, concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                train_dataframe, test_dataframe = executor.map(self.read_data, [train_file_path, test_file_path])
+                validation_status = all(executor.map(self.validate_number_of_columns, [train_dataframe, test_dataframe]))
+                if not validation_status:
+                    raise ValueError("Data validation failed due to column mismatch.")
+
+                drift = executor.submit(self.data_drift, train_dataframe, test_dataframe)
+                writes = [executor.submit(write_frame, train_dataframe, self.data_validation_config.valid_train_file_path),
+                          executor.submit(write_frame, test_dataframe, self.data_validation_config.valid_test_file_path)]
+                status = drift.result()
+                for write in writes:
+                    write.result()
 
             data_validation_artifact = DataValidationArtifact(
                 valid_train_file_path=self.data_validation_config.valid_train_file_path,
@@ -1,22 +1,32 @@
 import os
 import sys
+import copy
 import pickle
-import mlflow
+import shutil
+import threading
+import numpy as np
+import pandas as pd
 from dotenv import load_dotenv
 
 from networksecurity.entity.config_entity import ModelTrainerConfig
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging import logger
-from networksecurity.constant.training_pipeline import MODEL_FILE_NAME, SAVED_MODEL_DIR
+from networksecurity.constant.training_pipeline import MODEL_FILE_NAME, SAVED_MODEL_DIR, FINAL_MODEL_DIR, FINAL_PREPROCESSOR_FILE_NAME
+from networksecurity.constant.training_pipeline import FINAL_REFERENCE_PROFILE_FILE_NAME, FINAL_MODEL_ENGINE_FILE_NAME
+from networksecurity.constant.training_pipeline import FINAL_MODEL_METADATA_FILE_NAME
+from networksecurity.constant.training_pipeline import DATA_TRANSFORMATION_MMAP_MODE
 from networksecurity.entity.artifact_entity import ModelTrainerArtifact, DataTransformationArtifact
-from networksecurity.utils.main_utils.utils import load_numpy_array_data, load_object
-from networksecurity.utils.ml_utils.metric.classification_metric import get_classification_score
-from networksecurity.utils.model.estimator import NetworkModel
+from networksecurity.utils.main_utils.utils import load_feature_label_arrays, load_object, read_yaml_file
+from networksecurity.utils.ml_utils.metric.classification_metric import POSITIVE_LABEL, LOWER_IS_BETTER, ModelScorer, choose_threshold, precision_recall_at
+from networksecurity.utils.model.estimator import NetworkModel, incremental_fit
+from networksecurity.utils.model.registry import write_model_manifest
+from networksecurity.utils.model.tree_engine import compile_tree_engine
 
-from networksecurity.utils.main_utils.utils import save_object,evaluate_models
+from networksecurity.utils.main_utils.utils import save_object,evaluate_models,best_cv_candidate,write_yaml_file
 
+from sklearn.base import clone
+from sklearn.model_selection import cross_val_predict
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import r2_score
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import (
@@ -26,15 +36,27 @@ from sklearn.ensemble import (
 )
 load_dotenv()
 
-# Access them
-mlflow_uri = os.getenv("MLFLOW_TRACKING_URI")
-username = os.getenv("MLFLOW_TRACKING_USERNAME")
-password = os.getenv("MLFLOW_TRACKING_PASSWORD")
+_mlflow_lock = threading.Lock()
+_mlflow_configured = False
 
-import mlflow
 
-mlflow.set_tracking_uri(mlflow_uri)
-mlflow.set_experiment("Network_Security_Experiment")
+def configure_mlflow():
+    """
+    Imports mlflow and points it at MLFLOW_TRACKING_URI and the experiment, once per process.
+    Done on the first tracked run rather than at import, so importing this module neither
+    loads mlflow nor creates a tracking store.
+    :return: The mlflow module.
+    """
+    global _mlflow_configured
+    import mlflow
+
+    with _mlflow_lock:
+        if not _mlflow_configured:
+            # MLFLOW_TRACKING_USERNAME and MLFLOW_TRACKING_PASSWORD are read by mlflow itself
+            mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
+            mlflow.set_experiment("Network_Security_Experiment")
+            _mlflow_configured = True
+    return mlflow
 
 
 class ModelTrainer:
@@ -55,6 +77,7 @@ class ModelTrainer:
         :param classification_metric: The classification metrics of the model.
         """
         try:
+            mlflow = configure_mlflow()
             with mlflow.start_run():
                 f1_score = classification_metric.f1_score
                 precision_score = classification_metric.precision_score
@@ -63,12 +86,32 @@ class ModelTrainer:
                 mlflow.log_metric("f1_score", f1_score)
                 mlflow.log_metric("precision_score", precision_score)
                 mlflow.log_metric("recall_score", recall_score)
+                for name in ("accuracy_score", "roc_auc_score", "log_loss"):
+                    value = getattr(classification_metric, name)
+                    if value is not None:
+                        mlflow.log_metric(name, value)
 
                 import joblib
                 joblib.dump(model, "temp_model.pkl")
                 mlflow.log_artifact("temp_model.pkl")
         except Exception as e:
             logger.logging.error(f"Error tracking model with MLflow: {e}")
+    def save_model_selection_report(self, candidates: list) -> pd.DataFrame:
+        """
+        Writes one row per evaluated candidate (model, params, timings, CV scores).
+
+        :param candidates: Candidate rows returned by evaluate_models.
+        :return: The report as a DataFrame.
+        """
+        report = pd.DataFrame(candidates)
+        report["params"] = report["params"].astype(str)
+        report = report.sort_values(["model", "rank_test_score"], kind="stable")
+        report_file_path = self.model_trainer_config.model_selection_report_file_path
+        os.makedirs(os.path.dirname(report_file_path), exist_ok=True)
+        report.to_csv(report_file_path, index=False)
+        logger.logging.info(f"Model selection report with {len(report)} candidates saved to {report_file_path}")
+        return report
+
     def train_model(self, X_train, y_train,x_test, y_test):
         """
         Trains the model using the provided training data.
@@ -111,49 +154,46 @@ class ModelTrainer:
             }
             
         }
-        model_report:dict=evaluate_models(X_train=X_train,y_train=y_train,X_test=x_test,y_test=y_test,
-                                          models=models,param=params)
+        # predictions and metrics of every candidate are computed once per split and reused below
+        scorer=ModelScorer({"train": (X_train, y_train), "test": (x_test, y_test)})
+        selection_metric=self.model_trainer_config.selection_metric
+        model_report,candidates=evaluate_models(X_train=X_train,y_train=y_train,X_test=x_test,y_test=y_test,
+                                          models=models,param=params,
+                                          metric=selection_metric,scorer=scorer,
+                                          search_strategy=self.model_trainer_config.search_strategy,
+                                          cv=self.model_trainer_config.search_cv,
+                                          n_jobs=self.model_trainer_config.search_n_jobs,
+                                          n_iter=self.model_trainer_config.search_n_iter,
+                                          return_candidates=True)
+        self.save_model_selection_report(candidates)
         
-        ## To get best model score from dict
-        best_model_score = max(sorted(model_report.values()))
-
-        ## To get best model name from dict
-
-        best_model_name = list(model_report.keys())[
-            list(model_report.values()).index(best_model_score)
-        ]
+        ## To get best model name by its CV score, the test split is only reported
+        best_candidate = best_cv_candidate(candidates)
+        best_model_name = best_candidate["model"]
         best_model = models[best_model_name]
-        y_train_pred=best_model.predict(X_train)
+        logger.logging.info(f"Best model: {best_model_name} with CV {selection_metric} "
+                            f"{best_candidate['mean_test_score']:.4f}, test {model_report[best_model_name]}")
 
-        classification_train_metric=get_classification_score(y_true=y_train,y_pred=y_train_pred)
+        classification_train_metric=scorer.score(best_model_name, "train")
 
-        self.track_model(best_model,classification_train_metric)
-        
         ## Track the experiements with mlflow
-       
-
+        self.track_model(best_model,classification_train_metric)
 
-        y_test_pred=best_model.predict(x_test)
-        classification_test_metric=get_classification_score(y_true=y_test,y_pred=y_test_pred)
+        classification_test_metric=scorer.score(best_model_name, "test")
         self.track_model(best_model,classification_test_metric)
 
         #self.track_mlflow(best_model,classification_test_metric)
 
-        preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
-            
-        model_dir_path = os.path.dirname(self.model_trainer_config.trained_model_file_path)
-        os.makedirs(model_dir_path,exist_ok=True)
-
-        Network_Model=NetworkModel(preprocessor=preprocessor,model=best_model)
-        save_object(self.model_trainer_config.trained_model_file_path,obj=NetworkModel)
-        #model pusher
-        save_object("final_model/model.pkl",best_model)
-        
+        _, test_proba = scorer.outputs(best_model_name, "test")
+        validation_proba = self.out_of_fold_proba(best_model, X_train, y_train)
+        self.publish_model(best_model, self.model_metadata(best_model, y_train, validation_proba, y_test, test_proba))
 
         ## Model Trainer Artifact
         model_trainer_artifact=ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path,
                              train_metric_artifact=classification_train_metric,
-                             test_metric_artifact=classification_test_metric
+                             test_metric_artifact=classification_test_metric,
+                             model_selection_report_file_path=self.model_trainer_config.model_selection_report_file_path,
+                             reference_profile_file_path=self.data_transformation_artifact.reference_profile_file_path,
                              )
         logger.logging.info(f"Model trainer artifact: {model_trainer_artifact}")
         return model_trainer_artifact
@@ -161,29 +201,196 @@ class ModelTrainer:
         
           
     
-    def initiate_model_trainer(self) -> ModelTrainerArtifact:
+    def out_of_fold_proba(self, model, x, y):
+        """
+        Positive-class probability of every training row from a copy of model fitted on the
+        other search_cv folds, so the threshold is not chosen on rows the model was fitted on.
+        :return: None for models without predict_proba or if the folds cannot be fitted.
+        """
+        if not hasattr(model, "predict_proba"):
+            return None
+        try:
+            proba = cross_val_predict(clone(model), x, y, cv=self.model_trainer_config.search_cv,
+                                      n_jobs=self.model_trainer_config.search_n_jobs, method="predict_proba")
+        except ValueError as e:
+            # e.g. fewer records of a class than folds in a small incremental run
+            logger.logging.warning(f"Out-of-fold probabilities unavailable, no operating threshold: {e}")
+            return None
+        positive = np.flatnonzero(np.unique(y) == POSITIVE_LABEL)
+        return proba[:, positive[0]] if len(positive) else None
+
+    def model_metadata(self, model, y_validation, validation_proba, y_test, test_proba) -> dict:
+        """
+        Metadata published with the model, with the operating threshold on the positive-class
+        probability that reaches the configured precision or recall target on the out-of-fold
+        validation probabilities. Precision and recall at that threshold are reported on the
+        untouched test split.
+        """
+        metadata = {"model": type(model).__name__, "threshold": None}
+        threshold_metric = self.model_trainer_config.threshold_metric
+        if threshold_metric is None or validation_proba is None:
+            return metadata
+        operating_point = choose_threshold(y_validation, validation_proba, metric=threshold_metric,
+                                           target=self.model_trainer_config.threshold_target)
+        if operating_point is None:
+            logger.logging.warning(f"No threshold reaches validation {threshold_metric} "
+                                   f"{self.model_trainer_config.threshold_target}, keeping the model's decision")
+            return metadata
+        metadata.update({
+            "threshold": operating_point["threshold"],
+            "threshold_metric": operating_point["metric"],
+            "threshold_target": operating_point["target"],
+            "validation_precision": operating_point["precision"],
+            "validation_recall": operating_point["recall"],
+        })
+        if test_proba is not None:
+            metadata["test_precision"], metadata["test_recall"] = precision_recall_at(
+                y_test, test_proba, operating_point["threshold"])
+        logger.logging.info(f"Operating threshold {operating_point['threshold']:.4f}: test precision "
+                            f"{metadata.get('test_precision')}, recall {metadata.get('test_recall')}")
+        return metadata
+
+    def publish_model(self, model, metadata=None):
+        """
+        Saves the NetworkModel artifact and publishes preprocessor and model to the final model
+        directory. The manifest goes last so the registry never loads a half-written pair.
+        """
+        preprocessor = load_object(file_path=self.data_transformation_artifact.transformed_object_file_path)
+
+        model_dir_path = os.path.dirname(self.model_trainer_config.trained_model_file_path)
+        os.makedirs(model_dir_path,exist_ok=True)
+
+        Network_Model=NetworkModel(preprocessor=preprocessor,model=model,metadata=metadata)
+        save_object(self.model_trainer_config.trained_model_file_path,obj=Network_Model)
+        self.push_model(preprocessor, model, self.data_transformation_artifact.reference_profile_file_path,
+                        engine=Network_Model.engine, metadata=Network_Model.metadata)
+
+    def push_model(self, preprocessor, model, reference_profile_file_path=None, engine=None, metadata=None):
+        #model pusher: preprocessor, model, compiled engine, metadata and reference profile are published together, the manifest goes last
+        final_model_dir = self.model_trainer_config.final_model_dir
+        save_object(os.path.join(final_model_dir, FINAL_PREPROCESSOR_FILE_NAME),preprocessor)
+        save_object(os.path.join(final_model_dir, MODEL_FILE_NAME),model)
+        final_metadata_path = os.path.join(final_model_dir, FINAL_MODEL_METADATA_FILE_NAME)
+        if metadata:
+            write_yaml_file(final_metadata_path, metadata, replace=True)
+        elif os.path.exists(final_metadata_path):
+            os.remove(final_metadata_path)
+        engine = engine if engine is not None else compile_tree_engine(model)
+        final_engine_path = os.path.join(final_model_dir, FINAL_MODEL_ENGINE_FILE_NAME)
+        if engine is not None:
+            save_object(final_engine_path, engine)
+        elif os.path.exists(final_engine_path):
+            # engine of an earlier tree model
+            os.remove(final_engine_path)
+        final_profile_path = os.path.join(final_model_dir, FINAL_REFERENCE_PROFILE_FILE_NAME)
+        if reference_profile_file_path and os.path.exists(reference_profile_file_path):
+            shutil.copyfile(reference_profile_file_path, final_profile_path + ".tmp")
+            os.replace(final_profile_path + ".tmp", final_profile_path)
+        elif os.path.exists(final_profile_path):
+            # profile of an earlier model
+            os.remove(final_profile_path)
+        write_model_manifest(final_model_dir)
+
+    def republish(self, model_trainer_artifact: ModelTrainerArtifact):
+        """Publishes the model of an earlier run again, e.g. when the stage cache reuses its artifacts."""
+        try:
+            network_model = load_object(model_trainer_artifact.trained_model_file_path)
+            self.push_model(network_model.preprocessor, network_model.model,
+                            model_trainer_artifact.reference_profile_file_path,
+                            engine=getattr(network_model, "engine", None),
+                            metadata=getattr(network_model, "metadata", None))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys) from e
+
+    def update_model(self, X_train, y_train, x_test, y_test) -> ModelTrainerArtifact:
+        """
+        Incremental run: updates the published model with the new records only, see incremental_fit.
+        The new test split scores the model before and after the update, and the update is only
+        published if it is at most warm_start_tolerance worse on the selection metric. Otherwise
+        the published model is kept and returned as this run's model.
+        """
+        final_model_dir = self.model_trainer_config.final_model_dir
+        previous_model = load_object(os.path.join(final_model_dir, MODEL_FILE_NAME))
+        selection_metric = self.model_trainer_config.selection_metric
+        scorer = ModelScorer({"train": (X_train, y_train), "test": (x_test, y_test)})
+        scorer.add_model("previous", previous_model)
+        previous_score = scorer.metric("previous", "test", selection_metric)
+
+        # warm starts update the model in place, the published one is kept for the comparison
+        model = incremental_fit(copy.deepcopy(previous_model), X_train, y_train,
+                                n_estimators=self.model_trainer_config.warm_start_n_estimators)
+        scorer.add_model("updated", model)
+        updated_score = scorer.metric("updated", "test", selection_metric)
+        logger.logging.info(f"Incremental update on {len(y_train)} records: test {selection_metric} "
+                            f"{previous_score} before, {updated_score} after")
+
+        tolerance = self.model_trainer_config.warm_start_tolerance
+        if selection_metric in LOWER_IS_BETTER:
+            accepted = updated_score <= previous_score + tolerance
+        else:
+            accepted = updated_score >= previous_score - tolerance
+        if not accepted:
+            logger.logging.warning(f"Incremental update lowered test {selection_metric} from {previous_score} to "
+                                   f"{updated_score}, keeping the published model")
+            return self.keep_published_model(previous_model, scorer.score("previous", "train"),
+                                             scorer.score("previous", "test"))
+
+        classification_train_metric = scorer.score("updated", "train")
+        self.track_model(model, classification_train_metric)
+        classification_test_metric = scorer.score("updated", "test")
+        self.track_model(model, classification_test_metric)
+
+        _, test_proba = scorer.outputs("updated", "test")
+        validation_proba = self.out_of_fold_proba(model, X_train, y_train)
+        self.publish_model(model, self.model_metadata(model, y_train, validation_proba, y_test, test_proba))
+
+        model_trainer_artifact=ModelTrainerArtifact(trained_model_file_path=self.model_trainer_config.trained_model_file_path,
+                             train_metric_artifact=classification_train_metric,
+                             test_metric_artifact=classification_test_metric,
+                             reference_profile_file_path=self.data_transformation_artifact.reference_profile_file_path,
+                             )
+        logger.logging.info(f"Model trainer artifact: {model_trainer_artifact}")
+        return model_trainer_artifact
+
+    def keep_published_model(self, model, train_metric, test_metric) -> ModelTrainerArtifact:
+        """
+        Saves the published model, with its metadata and reference profile, as this run's
+        NetworkModel artifact without publishing anything, so a republish leaves it unchanged.
+        """
+        final_model_dir = self.model_trainer_config.final_model_dir
+        metadata_file_path = os.path.join(final_model_dir, FINAL_MODEL_METADATA_FILE_NAME)
+        metadata = read_yaml_file(metadata_file_path) if os.path.exists(metadata_file_path) else None
+        preprocessor = load_object(os.path.join(final_model_dir, FINAL_PREPROCESSOR_FILE_NAME))
+        os.makedirs(os.path.dirname(self.model_trainer_config.trained_model_file_path), exist_ok=True)
+        save_object(self.model_trainer_config.trained_model_file_path,
+                    obj=NetworkModel(preprocessor=preprocessor, model=model, metadata=metadata))
+        reference_profile_file_path = os.path.join(final_model_dir, FINAL_REFERENCE_PROFILE_FILE_NAME)
+        model_trainer_artifact = ModelTrainerArtifact(
+            trained_model_file_path=self.model_trainer_config.trained_model_file_path,
+            train_metric_artifact=train_metric,
+            test_metric_artifact=test_metric,
+            reference_profile_file_path=reference_profile_file_path if os.path.exists(reference_profile_file_path) else None,
+        )
+        logger.logging.info(f"Model trainer artifact: {model_trainer_artifact}")
+        return model_trainer_artifact
+
+    def initiate_model_trainer(self, incremental: bool = False) -> ModelTrainerArtifact:
         """
         Initiates the model training process.
-        
+
+        :param incremental: Update the published model with the new records instead of running model selection.
         :return: ModelTrainerArtifact containing the trained model and its accuracy.
         """
         try:
             # Load transformed data
             train_file_path = self.data_transformation_artifact.transformed_train_file_path
             test_file_path = self.data_transformation_artifact.transformed_test_file_path
-            train_arr = load_numpy_array_data(train_file_path)
-            test_arr = load_numpy_array_data(test_file_path)
-
-
-
-
-            x_train,y_train,x_test,y_test=(
-                train_arr[:,:-1],
-                train_arr[:,-1],
-                test_arr[:,:-1],
-                test_arr[:,-1]
-            )
+            # memory-mapped: GridSearch workers share the pages instead of copying the arrays
+            x_train,y_train=load_feature_label_arrays(train_file_path,mmap_mode=DATA_TRANSFORMATION_MMAP_MODE,verify=True)
+            x_test,y_test=load_feature_label_arrays(test_file_path,mmap_mode=DATA_TRANSFORMATION_MMAP_MODE,verify=True)
 
+            if incremental:
+                return self.update_model(x_train, y_train, x_test, y_test)
             model_trainer_artifact=self.train_model(x_train, y_train,x_test, y_test)
             return model_trainer_artifact
         except Exception as e:
@@ -1,7 +1,6 @@
 import os
 import sys
 import numpy as np
-import pandas as pd
 
 """
 defining common constant variable for training pipeline
@@ -19,6 +18,21 @@ SCHEMA_FILE_PATH = os.path.join("data_schema", "schema.yaml")
 SAVED_MODEL_DIR =os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
 
+FINAL_MODEL_DIR: str = "final_model"
+FINAL_PREPROCESSOR_FILE_NAME: str = "preprocessor.pkl"
+## feature histograms and label counts of the training data, see ReferenceProfile
+FINAL_REFERENCE_PROFILE_FILE_NAME: str = "reference_profile.json"
+## tree models compiled for NumPy inference, see CompiledTreeEnsemble
+FINAL_MODEL_ENGINE_FILE_NAME: str = "model_engine.pkl"
+## operating threshold and other metadata of the published model
+FINAL_MODEL_METADATA_FILE_NAME: str = "model_metadata.yaml"
+## batches with more (row, tree) pairs are predicted by sklearn, faster on large batches
+TREE_ENGINE_MAX_PAIRS: int = 16_384
+
+## format of the tabular artifacts between stages: "parquet", "arrow" (Arrow IPC) or "csv" (export)
+ARTIFACT_FILE_FORMAT: str = "arrow"
+ARTIFACT_COMPRESSION: str = "zstd"
+
 
 
 
@@ -31,6 +45,42 @@ DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 DATA_INGESTION_TRAIN_TEST_SPLIT_RATION: float = 0.2
+DATA_INGESTION_CURSOR_BATCH_SIZE: int = 10_000
+DATA_INGESTION_PROGRESS_LOG_INTERVAL: int = 100_000
+## the collection is read as _id ranges over concurrent connections of the client pool,
+## split points come from "sample" ($sample quantiles) or "skip" (exact, scans the _id index)
+DATA_INGESTION_READ_PARTITIONS: int = 8
+DATA_INGESTION_READ_CONCURRENCY: int = 4
+DATA_INGESTION_MIN_PARTITION_SIZE: int = 50_000
+DATA_INGESTION_SPLIT_STRATEGY: str = "sample"
+DATA_INGESTION_SPLIT_SAMPLES_PER_PARTITION: int = 100
+
+## feature store kept across runs, incremental runs append the documents added after the watermark
+DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR: str = "feature_store"
+## new records drifted if a chi-square test rejects and the PSI reaches the threshold, see utils/ml_utils/drift.py
+DATA_INGESTION_DRIFT_P_VALUE: float = 0.05
+DATA_INGESTION_DRIFT_PSI_THRESHOLD: float = 0.1
+
+"""
+Training mode related constant start with TRAINING VAR NAME
+"""
+TRAINING_MODE_FULL: str = "full"
+TRAINING_MODE_INCREMENTAL: str = "incremental"
+TRAINING_MODE_AUTO: str = "auto"
+TRAINING_STATE_FILE_NAME: str = "training_state.yaml"
+## auto mode retrains from scratch at least this often, and whenever the new records drift
+TRAINING_FULL_RETRAIN_INTERVAL_DAYS: float = 7.0
+## stages whose inputs, constants and code are unchanged reuse the artifacts of an earlier run
+TRAINING_STAGE_CACHE_ENABLED: bool = True
+TRAINING_STAGE_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, ".stage_cache")
+TRAINING_PIPELINE_MAX_WORKERS: int = 4
+# written when a stage finishes, a failed run resumes from it
+TRAINING_PIPELINE_CHECKPOINT_FILE_PATH: str = os.path.join(ARTIFACT_DIR, "pipeline_checkpoint.yaml")
+TRAINING_PIPELINE_TIMINGS_FILE_NAME: str = "stage_timings.yaml"
+## finished training jobs kept for /train/{job_id}, the oldest are dropped first
+TRAINING_JOBS_MAX_FINISHED: int = 100
+## how often the dispatcher checks a running worker for its result or its exit
+TRAINING_JOB_RESULT_POLL_SECONDS: float = 1.0
 
 """
 Data Validation related constant start with DATA_VALIDATION VAR NAME
@@ -40,6 +90,8 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+DATA_VALIDATION_DRIFT_P_VALUE: float = 0.05
+DATA_VALIDATION_DRIFT_PSI_THRESHOLD: float = 0.1
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
 
 """
@@ -55,10 +107,17 @@ DATA_TRANSFORMATION_IMPUTER_PARAMS: dict = {
     "n_neighbors": 3,
     "weights": "uniform",
 }
+## "knn" imputes from the nearest complete training rows, "mode" from the most frequent value of each column
+DATA_TRANSFORMATION_IMPUTER_STRATEGY: str = "knn"
 DATA_TRANSFORMATION_TRAIN_FILE_PATH: str = "train.npy"
 
 DATA_TRANSFORMATION_TEST_FILE_PATH: str = "test.npy"
 
+## features and labels are stored as separate memory-mappable arrays described by a manifest
+DATA_TRANSFORMATION_MANIFEST_FILE_SUFFIX: str = "_manifest.yaml"
+DATA_TRANSFORMATION_MMAP_MODE: str = "r"
+DATA_TRANSFORMATION_REFERENCE_PROFILE_FILE_NAME: str = "reference_profile.json"
+
 
 """
 Model Trainer ralated constant start with MODE TRAINER VAR NAME
@@ -70,4 +129,63 @@ MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD: float = 0.05
 
-TRAINING_BUCKET_NAME = "networksecurity15082025"
\ No newline at end of file
+## hyperparameter search: "grid", "random" or "halving"
+MODEL_TRAINER_SEARCH_STRATEGY: str = "grid"
+MODEL_TRAINER_SEARCH_CV: int = 3
+MODEL_TRAINER_SEARCH_N_JOBS: int = -1
+MODEL_TRAINER_SEARCH_N_ITER: int = 20
+MODEL_TRAINER_SELECTION_REPORT_FILE_NAME: str = "model_selection_report.csv"
+## metric used for the CV search and for ranking the candidates on their CV scores (the test
+## split is only reported), one of
+## f1_score, precision_score, recall_score, accuracy_score, roc_auc_score, log_loss
+MODEL_TRAINER_SELECTION_METRIC: str = "f1_score"
+## trees added to a warm-started ensemble per incremental run
+MODEL_TRAINER_WARM_START_N_ESTIMATORS: int = 32
+## an incremental update is published only if its test selection metric is at most this much worse
+## than the published model's on the same records, otherwise the published model keeps serving
+MODEL_TRAINER_WARM_START_TOLERANCE: float = 0.01
+## operating threshold on the positive-class probability, chosen on out-of-fold probabilities of the
+## training split to reach a "precision" or "recall" target and reported on the test split;
+## None keeps the model's own argmax decision
+MODEL_TRAINER_THRESHOLD_METRIC: str = "precision"
+MODEL_TRAINER_THRESHOLD_TARGET: float = 0.95
+
+TRAINING_BUCKET_NAME = "networksecurity15082025"
+
+"""
+Model Registry related constant start with MODEL_REGISTRY VAR NAME
+"""
+MODEL_REGISTRY_MANIFEST_FILE_NAME: str = "manifest.yaml"
+MODEL_REGISTRY_POLL_INTERVAL_SECONDS: float = 5.0
+
+"""
+Online scoring related constant start with MICRO_BATCH or SERVING VAR NAME
+"""
+MICRO_BATCH_MAX_SIZE: int = 256
+MICRO_BATCH_MAX_WAIT_MS: float = 2.0
+MICRO_BATCH_MAX_QUEUE_DEPTH: int = 10000
+SERVING_IO_MAX_WORKERS: int = 4
+## /predict uploads are scored on their own threads, never on the micro-batch worker of /v1/score;
+## uploads beyond SERVING_BULK_MAX_PENDING in flight are answered with 503
+SERVING_BULK_MAX_WORKERS: int = 1
+SERVING_BULK_MAX_PENDING: int = 8
+## live traffic rows compared against the reference profile by /v1/drift
+SERVING_DRIFT_WINDOW_ROWS: int = 10_000
+## below this many rows in the window the tests flag noise, /v1/drift reports "insufficient_data"
+SERVING_DRIFT_MIN_ROWS: int = 500
+## distinct feature vectors whose prediction is cached, 0 disables the cache
+SERVING_PREDICTION_CACHE_MAX_ENTRIES: int = 100_000
+## the most frequent vectors of this file are scored into the cache when a model is loaded
+SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH: str = os.path.join("Network_Data", FILE_NAME)
+SERVING_PREDICTION_CACHE_PREWARM_ROWS: int = 10_000
+## importing app must stay within this time and must not load these modules, see benchmarks/import_time.py
+SERVING_IMPORT_TIME_BUDGET_SECONDS: float = 2.0
+SERVING_DEFERRED_IMPORTS: tuple = (
+    "sklearn", "scipy", "mlflow", "pymongo", "networksecurity.pipeline.training_pipeline",
+)
+
+"""
+Batch Prediction related constant start with BATCH_PREDICTION VAR NAME
+"""
+BATCH_PREDICTION_CHUNK_SIZE: int = 100_000
+BATCH_PREDICTION_SHARDS_PER_WORKER: int = 2
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
 class ArtifactEntity:
     train_file_path: str
     test_file_path: str
+    mode: str = "full"
+    # str of the newest ingested ObjectId and the number of documents read in this run
+    watermark: Optional[str] = None
+    n_records: int = 0
+    drift_detected: bool = False
 
 @dataclass
 class DataValidationArtifact:
@@ -17,8 +23,11 @@ class DataValidationArtifact:
 @dataclass
 class DataTransformationArtifact:
     transformed_object_file_path: str
+    # manifests of the features/labels arrays, see save_feature_label_arrays
     transformed_train_file_path: str
     transformed_test_file_path: str
+    # feature histograms and label counts of the training data, see ReferenceProfile
+    reference_profile_file_path: Optional[str] = None
 
 
 
@@ -28,6 +37,10 @@ class ClassificationMetricArtifact:
     f1_score: float
     precision_score: float
     recall_score: float
+    accuracy_score: Optional[float] = None
+    # only available for models with predict_proba
+    roc_auc_score: Optional[float] = None
+    log_loss: Optional[float] = None
     
 
 @dataclass
@@ -35,3 +48,5 @@ class ModelTrainerArtifact:
     trained_model_file_path: str
     train_metric_artifact:ClassificationMetricArtifact
     test_metric_artifact:ClassificationMetricArtifact
+    model_selection_report_file_path: Optional[str] = None
+    reference_profile_file_path: Optional[str] = None
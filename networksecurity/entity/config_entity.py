@@ -1,9 +1,7 @@
 from datetime import datetime
 import os
 from networksecurity.constant import training_pipeline
-
-print(training_pipeline.PIPELINE_NAME)
-print(training_pipeline.ARTIFACT_DIR)
+from networksecurity.utils.main_utils.frame_store import artifact_file_name
 
 
 class TrainingPipelineConfig:
@@ -14,6 +12,13 @@ class TrainingPipelineConfig:
         self.artifact_dir=os.path.join(self.artifact_name,timestamp)
         self.model_dir=os.path.join("final_model")
         self.timestamp: str=timestamp
+        self.training_state_file_path: str = os.path.join(
+            training_pipeline.DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR, training_pipeline.TRAINING_STATE_FILE_NAME
+        )
+        self.checkpoint_file_path: str = training_pipeline.TRAINING_PIPELINE_CHECKPOINT_FILE_PATH
+        self.stage_timings_file_path: str = os.path.join(
+            self.artifact_dir, training_pipeline.TRAINING_PIPELINE_TIMINGS_FILE_NAME
+        )
 
 
 
@@ -23,43 +28,66 @@ class DataIngestionConfig:
             training_pipeline_config.artifact_dir,training_pipeline.DATA_INGESTION_DIR_NAME
         )
         self.feature_store_file_path: str = os.path.join(
-                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR, training_pipeline.FILE_NAME
+                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR, artifact_file_name(training_pipeline.FILE_NAME)
             )
         self.training_file_path: str = os.path.join(
-                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TRAIN_FILE_NAME
+                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, artifact_file_name(training_pipeline.TRAIN_FILE_NAME)
             )
         self.testing_file_path: str = os.path.join(
-                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, training_pipeline.TEST_FILE_NAME
+                self.data_ingestion_dir, training_pipeline.DATA_INGESTION_INGESTED_DIR, artifact_file_name(training_pipeline.TEST_FILE_NAME)
             )
         self.train_test_split_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_TEST_SPLIT_RATION
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
+        self.persistent_feature_store_file_path: str = os.path.join(
+                training_pipeline.DATA_INGESTION_PERSISTENT_FEATURE_STORE_DIR, artifact_file_name(training_pipeline.FILE_NAME)
+            )
+        self.cursor_batch_size: int = training_pipeline.DATA_INGESTION_CURSOR_BATCH_SIZE
+        self.progress_log_interval: int = training_pipeline.DATA_INGESTION_PROGRESS_LOG_INTERVAL
+        self.read_partitions: int = training_pipeline.DATA_INGESTION_READ_PARTITIONS
+        self.read_concurrency: int = training_pipeline.DATA_INGESTION_READ_CONCURRENCY
+        self.min_partition_size: int = training_pipeline.DATA_INGESTION_MIN_PARTITION_SIZE
+        self.split_strategy: str = training_pipeline.DATA_INGESTION_SPLIT_STRATEGY
+        self.split_samples_per_partition: int = training_pipeline.DATA_INGESTION_SPLIT_SAMPLES_PER_PARTITION
+        self.drift_p_value: float = training_pipeline.DATA_INGESTION_DRIFT_P_VALUE
+        self.drift_psi_threshold: float = training_pipeline.DATA_INGESTION_DRIFT_PSI_THRESHOLD
+        ## profile of the published model, new records are compared against it instead of the feature store
+        self.reference_profile_file_path: str = os.path.join(
+            training_pipeline_config.model_dir, training_pipeline.FINAL_REFERENCE_PROFILE_FILE_NAME
+        )
 
 class DataValidationConfig:
     def __init__(self,training_pipeline_config:TrainingPipelineConfig):
         self.data_validation_dir: str = os.path.join( training_pipeline_config.artifact_dir, training_pipeline.DATA_VALIDATION_DIR_NAME)
         self.valid_data_dir: str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_VALID_DIR)
         self.invalid_data_dir: str = os.path.join(self.data_validation_dir, training_pipeline.DATA_VALIDATION_INVALID_DIR)
-        self.valid_train_file_path: str = os.path.join(self.valid_data_dir, training_pipeline.TRAIN_FILE_NAME)
-        self.valid_test_file_path: str = os.path.join(self.valid_data_dir, training_pipeline.TEST_FILE_NAME)
-        self.invalid_train_file_path: str = os.path.join(self.invalid_data_dir, training_pipeline.TRAIN_FILE_NAME)
-        self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, training_pipeline.TEST_FILE_NAME)
+        self.valid_train_file_path: str = os.path.join(self.valid_data_dir, artifact_file_name(training_pipeline.TRAIN_FILE_NAME))
+        self.valid_test_file_path: str = os.path.join(self.valid_data_dir, artifact_file_name(training_pipeline.TEST_FILE_NAME))
+        self.invalid_train_file_path: str = os.path.join(self.invalid_data_dir, artifact_file_name(training_pipeline.TRAIN_FILE_NAME))
+        self.invalid_test_file_path: str = os.path.join(self.invalid_data_dir, artifact_file_name(training_pipeline.TEST_FILE_NAME))
         self.drift_report_file_path: str = os.path.join(
             self.data_validation_dir,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME,
         )
+        self.drift_p_value: float = training_pipeline.DATA_VALIDATION_DRIFT_P_VALUE
+        self.drift_psi_threshold: float = training_pipeline.DATA_VALIDATION_DRIFT_PSI_THRESHOLD
 
 
 class DataTransformationConfig:
      def __init__(self,training_pipeline_config:TrainingPipelineConfig):
         self.data_transformation_dir: str = os.path.join( training_pipeline_config.artifact_dir,training_pipeline.DATA_TRANSFORMATION_DIR_NAME )
         self.transformed_train_file_path: str = os.path.join( self.data_transformation_dir,training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TRAIN_FILE_NAME.replace("csv", "npy"),)
+            training_pipeline.TRAIN_FILE_NAME.replace(".csv", training_pipeline.DATA_TRANSFORMATION_MANIFEST_FILE_SUFFIX),)
         self.transformed_test_file_path: str = os.path.join(self.data_transformation_dir,  training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TEST_FILE_NAME.replace("csv", "npy"), )
+            training_pipeline.TEST_FILE_NAME.replace(".csv", training_pipeline.DATA_TRANSFORMATION_MANIFEST_FILE_SUFFIX), )
         self.transformed_object_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME,)
+        ## preprocessor of the published model, reused by incremental runs
+        self.final_preprocessor_file_path: str = os.path.join( training_pipeline_config.model_dir, training_pipeline.FINAL_PREPROCESSOR_FILE_NAME)
+        self.reference_profile_file_path: str = os.path.join( self.data_transformation_dir, training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            training_pipeline.DATA_TRANSFORMATION_REFERENCE_PROFILE_FILE_NAME,)
+        self.final_reference_profile_file_path: str = os.path.join( training_pipeline_config.model_dir, training_pipeline.FINAL_REFERENCE_PROFILE_FILE_NAME)
         
 class ModelTrainerConfig:
     def __init__(self,training_pipeline_config:TrainingPipelineConfig):
@@ -71,4 +99,17 @@ class ModelTrainerConfig:
             training_pipeline.MODEL_FILE_NAME
         )
         self.expected_accuracy: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
-        self.overfitting_underfitting_threshold = training_pipeline.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
\ No newline at end of file
+        self.overfitting_underfitting_threshold = training_pipeline.MODEL_TRAINER_OVER_FIITING_UNDER_FITTING_THRESHOLD
+        self.model_selection_report_file_path: str = os.path.join(
+            self.model_trainer_dir, training_pipeline.MODEL_TRAINER_SELECTION_REPORT_FILE_NAME
+        )
+        self.search_strategy: str = training_pipeline.MODEL_TRAINER_SEARCH_STRATEGY
+        self.search_cv: int = training_pipeline.MODEL_TRAINER_SEARCH_CV
+        self.search_n_jobs: int = training_pipeline.MODEL_TRAINER_SEARCH_N_JOBS
+        self.search_n_iter: int = training_pipeline.MODEL_TRAINER_SEARCH_N_ITER
+        self.selection_metric: str = training_pipeline.MODEL_TRAINER_SELECTION_METRIC
+        self.warm_start_n_estimators: int = training_pipeline.MODEL_TRAINER_WARM_START_N_ESTIMATORS
+        self.warm_start_tolerance: float = training_pipeline.MODEL_TRAINER_WARM_START_TOLERANCE
+        self.threshold_metric: str = training_pipeline.MODEL_TRAINER_THRESHOLD_METRIC
+        self.threshold_target: float = training_pipeline.MODEL_TRAINER_THRESHOLD_TARGET
+        self.final_model_dir: str = training_pipeline_config.model_dir
\ No newline at end of file
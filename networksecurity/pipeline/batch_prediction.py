@@ -1,9 +1,13 @@
 import os
 import sys
+import time
+import shutil
 import pandas as pd
 import numpy as np
+import yaml
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logging
@@ -11,14 +15,20 @@ from networksecurity.logging.logger import logging
 from networksecurity.entity.config_entity import TrainingPipelineConfig
 from networksecurity.entity.artifact_entity import ModelTrainerArtifact
 
-from networksecurity.utils.main_utils.utils import load_object
+from networksecurity.utils.main_utils.utils import load_object, read_yaml_file
 from networksecurity.utils.model.estimator import NetworkModel
+from networksecurity.utils.main_utils.schema import FeatureSchema
+from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix
 
 from networksecurity.constant.training_pipeline import (
     SAVED_MODEL_DIR,
     MODEL_FILE_NAME,
+    FINAL_MODEL_DIR,
+    FINAL_MODEL_METADATA_FILE_NAME,
     PREPROCESSING_OBJECT_FILE_NAME,
-    TARGET_COLUMN
+    TARGET_COLUMN,
+    BATCH_PREDICTION_CHUNK_SIZE,
+    BATCH_PREDICTION_SHARDS_PER_WORKER
 )
 
 
@@ -28,6 +38,8 @@ class BatchPredictionConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
         self.training_pipeline_config = training_pipeline_config
         self.model_file_path = os.path.join(SAVED_MODEL_DIR, MODEL_FILE_NAME)
+        # operating threshold published by the trainer next to the final model, optional
+        self.model_metadata_file_path = os.path.join(FINAL_MODEL_DIR, FINAL_MODEL_METADATA_FILE_NAME)
         self.preprocessor_file_path = os.path.join(
             training_pipeline_config.artifact_dir,
             "data_transformation",
@@ -46,6 +58,18 @@ class BatchPredictionConfig:
             self.prediction_dir,
             "prediction_log.txt"
         )
+        self.shard_dir = os.path.join(
+            self.prediction_dir,
+            "shards"
+        )
+        self.throughput_report_file_path = os.path.join(
+            self.prediction_dir,
+            "throughput_report.yaml"
+        )
+        self.rejected_file_path = os.path.join(
+            self.prediction_dir,
+            "rejected.csv"
+        )
 
 
 class BatchPredictionArtifact:
@@ -56,6 +80,126 @@ class BatchPredictionArtifact:
         self.prediction_log_file_path = prediction_log_file_path
 
 
+class PredictionSummary:
+    """Running counts for the prediction summary, updated chunk by chunk"""
+    
+    def __init__(self):
+        self.total_records = 0
+        self.n_features = 0
+        self.n_chunks = 0
+        self.rejected_records = 0
+        self.prediction_counts: Dict[Any, int] = {}
+        self.column_violations: Dict[str, int] = {}
+    
+    def update(self, data: pd.DataFrame, predictions: np.ndarray, rejected_records: int = 0,
+               column_violations: Optional[Dict[str, int]] = None):
+        self.total_records += len(data) + rejected_records
+        self.n_features = len(data.columns)
+        self.n_chunks += 1
+        self.rejected_records += rejected_records
+        for column, count in (column_violations or {}).items():
+            self.column_violations[column] = self.column_violations.get(column, 0) + count
+        unique_predictions, counts = np.unique(predictions, return_counts=True)
+        for prediction, count in zip(unique_predictions.tolist(), counts.tolist()):
+            self.prediction_counts[prediction] = self.prediction_counts.get(prediction, 0) + count
+    
+    def merge(self, other: "PredictionSummary"):
+        self.total_records += other.total_records
+        self.n_features = other.n_features or self.n_features
+        self.n_chunks += other.n_chunks
+        self.rejected_records += other.rejected_records
+        for prediction, count in other.prediction_counts.items():
+            self.prediction_counts[prediction] = self.prediction_counts.get(prediction, 0) + count
+        for column, count in other.column_violations.items():
+            self.column_violations[column] = self.column_violations.get(column, 0) + count
+
+
+class _ByteRangeReader:
+    """File-like view of the bytes [start, end) of a file, read lazily by pandas"""
+    
+    def __init__(self, file_path: str, start: int, end: int):
+        self.file_obj = open(file_path, 'rb')
+        self.file_obj.seek(start)
+        self.remaining = end - start
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file_obj.read(size)
+        self.remaining -= len(data)
+        return data
+    
+    def close(self):
+        self.file_obj.close()
+
+
+def split_csv_into_byte_ranges(file_path: str, n_shards: int) -> List[tuple]:
+    """
+    Split a CSV file into at most n_shards byte ranges that start and end on line boundaries.
+    The header line is excluded from every range.
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as file_obj:
+            file_obj.readline()
+            data_start = file_obj.tell()
+            boundaries = [data_start]
+            step = max((file_size - data_start) // max(n_shards, 1), 1)
+            for i in range(1, n_shards):
+                target = data_start + i * step
+                if target <= boundaries[-1]:
+                    continue
+                file_obj.seek(target - 1)
+                file_obj.readline()
+                position = file_obj.tell()
+                if position >= file_size:
+                    break
+                if position > boundaries[-1]:
+                    boundaries.append(position)
+            boundaries.append(file_size)
+        return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+_shard_worker_batch_prediction = None
+
+
+def _init_shard_worker(batch_prediction_config):
+    """Loads the model once per worker process"""
+    global _shard_worker_batch_prediction
+    _shard_worker_batch_prediction = BatchPrediction(batch_prediction_config)
+    _shard_worker_batch_prediction.load_model_and_preprocessor()
+
+
+def _score_shard(shard: dict) -> dict:
+    batch_prediction = _shard_worker_batch_prediction
+    batch_prediction.start_rejects(shard["rejected_file_path"], header=False)
+    network_model = batch_prediction.network_model()
+    started = time.perf_counter()
+    summary = PredictionSummary()
+    
+    reader = _ByteRangeReader(shard["file_path"], shard["start"], shard["end"])
+    try:
+        with open(shard["output_file_path"], 'w') as output:
+            for chunk in pd.read_csv(reader, header=None, names=shard["columns"], chunksize=shard["chunk_size"]):
+                valid_data, predictions, scores = batch_prediction.score_chunk(network_model, chunk, summary)
+                valid_data['predicted_result'] = predictions
+                valid_data['predicted_score'] = scores
+                valid_data.to_csv(output, index=False, header=False)
+    finally:
+        reader.close()
+    
+    return {
+        "shard_index": shard["shard_index"],
+        "output_file_path": shard["output_file_path"],
+        "rejected_file_path": shard["rejected_file_path"],
+        "pid": os.getpid(),
+        "summary": summary,
+        "seconds": time.perf_counter() - started,
+    }
+
+
 class BatchPrediction:
     """Main class for batch prediction pipeline"""
     
@@ -63,6 +207,11 @@ class BatchPrediction:
         self.batch_prediction_config = batch_prediction_config
         self.model = None
         self.preprocessor = None
+        self.metadata = None
+        self.schema = FeatureSchema.from_yaml()
+        self.rejected_file_path = batch_prediction_config.rejected_file_path
+        self._rejects_header = True
+        self._rejects_started = False
         
     def load_model_and_preprocessor(self):
         """Load the trained model and preprocessor"""
@@ -88,58 +237,113 @@ class BatchPrediction:
                     f"Preprocessor file not found at {self.batch_prediction_config.preprocessor_file_path}",
                     sys
                 )
+            
+            # Load the operating threshold, models published without one keep their own decision
+            metadata_file_path = getattr(self.batch_prediction_config, "model_metadata_file_path", None)
+            if metadata_file_path and os.path.exists(metadata_file_path):
+                self.metadata = read_yaml_file(metadata_file_path)
+                logging.info(f"Model metadata loaded from {metadata_file_path}: threshold {self.metadata.get('threshold')}")
                 
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
-    def validate_input_data(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Validate and clean input data for prediction"""
+    def network_model(self) -> NetworkModel:
+        """The loaded model with its preprocessor and operating threshold"""
+        return NetworkModel(preprocessor=self.preprocessor, model=self.model, metadata=self.metadata)
+    
+    def start_rejects(self, rejected_file_path: str, header: bool = True):
+        """Point rejected rows at a new file; it is only created once a row is rejected"""
+        if os.path.exists(rejected_file_path):
+            os.remove(rejected_file_path)
+        self.rejected_file_path = rejected_file_path
+        self._rejects_header = header
+        self._rejects_started = False
+    
+    def write_rejects(self, rejected: pd.DataFrame):
+        """Append rejected rows with the columns that failed validation"""
+        try:
+            os.makedirs(os.path.dirname(self.rejected_file_path), exist_ok=True)
+            rejected.to_csv(
+                self.rejected_file_path,
+                index=False,
+                mode='a' if self._rejects_started else 'w',
+                header=self._rejects_header and not self._rejects_started
+            )
+            self._rejects_started = True
+            logging.warning(f"{len(rejected)} invalid records written to {self.rejected_file_path}")
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+    
+    def split_valid_rows(self, data: pd.DataFrame):
+        """
+        Validate input data against the schema in one vectorized pass.
+        Rows with a value the schema does not allow go to the reject file.
+        
+        :return: Tuple of (valid input rows, their int8 FeatureMatrix, validation result).
+        """
         try:
             logging.info("Validating input data for prediction")
             
             # Check if data is empty
             if data.empty:
-                raise NetworkSecurityException("Input data is empty", sys)
-            
-            # Remove target column if present
-            if TARGET_COLUMN in data.columns:
-                data = data.drop(columns=[TARGET_COLUMN])
-                logging.info(f"Removed target column '{TARGET_COLUMN}' from input data")
-            
-            # Check for missing values
-            missing_values = data.isnull().sum().sum()
-            if missing_values > 0:
-                logging.warning(f"Found {missing_values} missing values in input data")
-                # You can implement imputation strategy here if needed
-            
-            # Check data types and convert if necessary
-            for column in data.columns:
-                if data[column].dtype == 'object':
-                    try:
-                        data[column] = pd.to_numeric(data[column], errors='coerce')
-                        logging.info(f"Converted column '{column}' to numeric")
-                    except:
-                        logging.warning(f"Could not convert column '{column}' to numeric")
-            
-            logging.info(f"Data validation completed. Shape: {data.shape}")
-            return data
+                raise ValueError("Input data is empty")
+            
+            result = self.schema.validate_frame(data)
+            valid_rows = result.valid_rows
             
+            if result.column_missing:
+                logging.warning(f"Missing values per column: {result.column_missing}")
+            
+            if not valid_rows.all():
+                logging.warning(f"Schema violations per column: {result.column_violations}")
+                invalid_cells = result.invalid[~valid_rows]
+                columns = np.array(self.schema.feature_columns)
+                rejected = data[~valid_rows].copy()
+                rejected['rejection_reason'] = [";".join(columns[row]) for row in invalid_cells]
+                self.write_rejects(rejected)
+            
+            features = result.feature_matrix(valid_rows)
+            
+            logging.info(f"Data validation completed. Shape: {features.shape}")
+            return data[valid_rows], features, result
+            
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+    
+    def validate_input_data(self, data: pd.DataFrame) -> FeatureMatrix:
+        """Validate input data and return the int8 features of the rows that passed"""
+        try:
+            _, features, _ = self.split_valid_rows(data)
+            return features
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+    
+    def score_chunk(self, network_model: NetworkModel, data: pd.DataFrame, summary: PredictionSummary):
+        """
+        Validate and score one chunk, returning the valid rows, their predictions and their
+        positive-class scores, labels and scores from one pass through the model
+        """
+        try:
+            valid_data, features, result = self.split_valid_rows(data)
+            if len(features):
+                predictions, scores = network_model.predict_with_proba(features)
+            else:
+                predictions, scores = np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+            summary.update(valid_data, predictions, result.n_invalid_rows, result.column_violations)
+            return valid_data.copy(deep=False), predictions, scores
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
-    def predict_batch(self, data: pd.DataFrame) -> np.ndarray:
-        """Perform batch prediction on the input data"""
+    def predict_batch(self, data: FeatureMatrix) -> np.ndarray:
+        """Perform batch prediction on validated input features"""
         try:
             logging.info("Starting batch prediction")
             
-            # Validate input data
-            validated_data = self.validate_input_data(data)
-            
             # Create NetworkModel instance
-            network_model = NetworkModel(preprocessor=self.preprocessor, model=self.model)
+            network_model = self.network_model()
             
             # Perform predictions
-            predictions = network_model.predict(validated_data)
+            predictions = network_model.predict(data)
             
             logging.info(f"Batch prediction completed. Predictions shape: {predictions.shape}")
             return predictions
@@ -147,20 +351,28 @@ class BatchPrediction:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
-    def save_predictions(self, data: pd.DataFrame, predictions: np.ndarray) -> str:
-        """Save predictions to file along with input data"""
+    def save_predictions(self, data: pd.DataFrame, predictions: np.ndarray, append: bool = False,
+                         scores: Optional[np.ndarray] = None) -> str:
+        """Save predictions (and scores) to file along with input data, optionally appending to an existing file"""
         try:
             logging.info("Saving predictions to file")
             
             # Create prediction directory
             os.makedirs(self.batch_prediction_config.prediction_dir, exist_ok=True)
             
-            # Create results dataframe
-            results_df = data.copy()
+            # Shallow copy: adds the prediction column without duplicating the input data
+            results_df = data.copy(deep=False)
             results_df['predicted_result'] = predictions
+            if scores is not None:
+                results_df['predicted_score'] = scores
             
             # Save to CSV
-            results_df.to_csv(self.batch_prediction_config.prediction_file_path, index=False)
+            results_df.to_csv(
+                self.batch_prediction_config.prediction_file_path,
+                index=False,
+                mode='a' if append else 'w',
+                header=not append
+            )
             
             logging.info(f"Predictions saved to {self.batch_prediction_config.prediction_file_path}")
             return self.batch_prediction_config.prediction_file_path
@@ -168,18 +380,14 @@ class BatchPrediction:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
-    def log_prediction_summary(self, data: pd.DataFrame, predictions: np.ndarray):
-        """Log prediction summary statistics"""
+    def log_prediction_summary(self, summary: PredictionSummary):
+        """Log prediction summary statistics from the running counts"""
         try:
             logging.info("Creating prediction summary log")
             
             # Create prediction directory
             os.makedirs(self.batch_prediction_config.prediction_dir, exist_ok=True)
             
-            # Calculate summary statistics
-            unique_predictions, counts = np.unique(predictions, return_counts=True)
-            prediction_summary = dict(zip(unique_predictions, counts))
-            
             # Create log content
             log_content = f"""
             ========================================
@@ -188,13 +396,17 @@ class BatchPrediction:
             Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             
             Input Data:
-            - Total records: {len(data)}
-            - Features: {len(data.columns)}
-            - Shape: {data.shape}
+            - Total records: {summary.total_records}
+            - Features: {summary.n_features}
+            - Shape: {(summary.total_records, summary.n_features)}
+            - Chunks: {summary.n_chunks}
+            - Rejected records: {summary.rejected_records}
+            - Schema violations per column: {summary.column_violations}
             
             Predictions:
-            - Total predictions: {len(predictions)}
-            - Prediction distribution: {prediction_summary}
+            - Total predictions: {sum(summary.prediction_counts.values())}
+            - Prediction distribution: {summary.prediction_counts}
+            - Decision threshold: {(self.metadata or {}).get('threshold')}
             
             Files:
             - Predictions saved to: {self.batch_prediction_config.prediction_file_path}
@@ -217,15 +429,18 @@ class BatchPrediction:
             
             # Load model and preprocessor
             self.load_model_and_preprocessor()
+            self.start_rejects(self.batch_prediction_config.rejected_file_path)
+            network_model = self.network_model()
             
-            # Perform batch prediction
-            predictions = self.predict_batch(input_data)
+            # Validate and perform batch prediction
+            summary = PredictionSummary()
+            valid_data, predictions, scores = self.score_chunk(network_model, input_data, summary)
             
             # Save predictions
-            prediction_file_path = self.save_predictions(input_data, predictions)
+            prediction_file_path = self.save_predictions(valid_data, predictions, scores=scores)
             
             # Log prediction summary
-            self.log_prediction_summary(input_data, predictions)
+            self.log_prediction_summary(summary)
             
             # Create artifact
             batch_prediction_artifact = BatchPredictionArtifact(
@@ -240,6 +455,150 @@ class BatchPrediction:
             raise NetworkSecurityException(e, sys)
 
 
+    def initiate_streaming_batch_prediction(self, input_file_path: str,
+                                            chunk_size: int = BATCH_PREDICTION_CHUNK_SIZE) -> BatchPredictionArtifact:
+        """
+        Score a CSV file chunk by chunk, appending each scored chunk to the output file.
+        Memory use depends on chunk_size only, not on the size of the input file.
+        """
+        try:
+            logging.info(f"Starting streaming batch prediction with chunks of {chunk_size} rows")
+            
+            # Load model and preprocessor
+            self.load_model_and_preprocessor()
+            self.start_rejects(self.batch_prediction_config.rejected_file_path)
+            network_model = self.network_model()
+            
+            summary = PredictionSummary()
+            prediction_file_path = self.batch_prediction_config.prediction_file_path
+            for chunk in pd.read_csv(input_file_path, chunksize=chunk_size):
+                valid_data, predictions, scores = self.score_chunk(network_model, chunk, summary)
+                prediction_file_path = self.save_predictions(valid_data, predictions, append=summary.n_chunks > 1,
+                                                             scores=scores)
+                logging.info(f"Scored chunk {summary.n_chunks}, {summary.total_records} records so far")
+            
+            if summary.n_chunks == 0:
+                raise ValueError(f"Input file is empty: {input_file_path}")
+            
+            # Log prediction summary
+            self.log_prediction_summary(summary)
+            
+            batch_prediction_artifact = BatchPredictionArtifact(
+                prediction_file_path=prediction_file_path,
+                prediction_log_file_path=self.batch_prediction_config.prediction_log_file_path
+            )
+            
+            logging.info("Streaming batch prediction completed successfully")
+            return batch_prediction_artifact
+            
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+    def initiate_parallel_batch_prediction(self, input_file_paths: List[str], n_workers: Optional[int] = None,
+                                           chunk_size: int = BATCH_PREDICTION_CHUNK_SIZE) -> BatchPredictionArtifact:
+        """
+        Score CSV files on a process pool and merge the results in input order.
+        A single file is split into byte ranges, several files are scored one shard per file.
+        """
+        try:
+            n_workers = n_workers or os.cpu_count() or 1
+            logging.info(f"Starting parallel batch prediction on {n_workers} workers")
+            self.start_rejects(self.batch_prediction_config.rejected_file_path)
+            
+            shards = []
+            columns = None
+            for file_path in input_file_paths:
+                file_columns = pd.read_csv(file_path, nrows=0).columns.tolist()
+                if columns is None:
+                    columns = file_columns
+                elif file_columns != columns:
+                    raise ValueError(f"Columns of {file_path} do not match {input_file_paths[0]}")
+                n_shards = n_workers * BATCH_PREDICTION_SHARDS_PER_WORKER if len(input_file_paths) == 1 else 1
+                for start, end in split_csv_into_byte_ranges(file_path, n_shards):
+                    shards.append({
+                        "shard_index": len(shards),
+                        "file_path": file_path,
+                        "start": start,
+                        "end": end,
+                        "columns": columns,
+                        "chunk_size": chunk_size,
+                        "output_file_path": os.path.join(
+                            self.batch_prediction_config.shard_dir, f"part-{len(shards):05d}.csv"
+                        ),
+                        "rejected_file_path": os.path.join(
+                            self.batch_prediction_config.shard_dir, f"rejected-{len(shards):05d}.csv"
+                        ),
+                    })
+            if not shards:
+                raise ValueError("Input files are empty")
+            
+            os.makedirs(self.batch_prediction_config.shard_dir, exist_ok=True)
+            started = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_shard_worker,
+                                     initargs=(self.batch_prediction_config,)) as executor:
+                results = sorted(executor.map(_score_shard, shards), key=lambda result: result["shard_index"])
+            wall_seconds = time.perf_counter() - started
+            
+            # Merge the shard outputs in shard order, so the result does not depend on scheduling
+            prediction_file_path = self.batch_prediction_config.prediction_file_path
+            summary = PredictionSummary()
+            with open(prediction_file_path, 'w') as output:
+                output.write(",".join(columns + ['predicted_result', 'predicted_score']) + "\n")
+                for result in results:
+                    with open(result["output_file_path"], 'r') as part:
+                        shutil.copyfileobj(part, output)
+                    summary.merge(result["summary"])
+            rejected_parts = [result["rejected_file_path"] for result in results
+                              if os.path.exists(result["rejected_file_path"])]
+            if rejected_parts:
+                with open(self.batch_prediction_config.rejected_file_path, 'w') as output:
+                    output.write(",".join(columns + ['rejection_reason']) + "\n")
+                    for rejected_part in rejected_parts:
+                        with open(rejected_part, 'r') as part:
+                            shutil.copyfileobj(part, output)
+            shutil.rmtree(self.batch_prediction_config.shard_dir, ignore_errors=True)
+            
+            self.log_prediction_summary(summary)
+            self.write_throughput_report(results, wall_seconds)
+            
+            batch_prediction_artifact = BatchPredictionArtifact(
+                prediction_file_path=prediction_file_path,
+                prediction_log_file_path=self.batch_prediction_config.prediction_log_file_path
+            )
+            logging.info("Parallel batch prediction completed successfully")
+            return batch_prediction_artifact
+            
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+    
+    def write_throughput_report(self, results: List[dict], wall_seconds: float) -> dict:
+        """Write rows/sec per worker process and overall, to size batch nodes"""
+        try:
+            workers: Dict[int, dict] = {}
+            for result in results:
+                worker = workers.setdefault(result["pid"], {"shards": 0, "records": 0, "seconds": 0.0})
+                worker["shards"] += 1
+                worker["records"] += result["summary"].total_records
+                worker["seconds"] += result["seconds"]
+            for worker in workers.values():
+                worker["rows_per_second"] = worker["records"] / worker["seconds"] if worker["seconds"] else 0.0
+            
+            total_records = sum(result["summary"].total_records for result in results)
+            report = {
+                "workers": {f"pid_{pid}": worker for pid, worker in workers.items()},
+                "total_records": total_records,
+                "wall_seconds": wall_seconds,
+                "rows_per_second": total_records / wall_seconds if wall_seconds else 0.0,
+            }
+            with open(self.batch_prediction_config.throughput_report_file_path, 'w') as f:
+                yaml.dump(report, f)
+            logging.info(f"Throughput report written to {self.batch_prediction_config.throughput_report_file_path}")
+            return report
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
 class BatchPredictionPipeline:
     """High-level pipeline class for batch prediction"""
     
@@ -261,14 +620,19 @@ class BatchPredictionPipeline:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
-    def predict_from_file(self, input_file_path: str) -> BatchPredictionArtifact:
-        """Run batch prediction from a CSV file"""
+    def predict_from_file(self, input_file_path: str,
+                          chunk_size: Optional[int] = BATCH_PREDICTION_CHUNK_SIZE) -> BatchPredictionArtifact:
+        """Run batch prediction from a CSV file, streamed in chunks unless chunk_size is None"""
         try:
             logging.info(f"Loading input data from file: {input_file_path}")
             
             if not os.path.exists(input_file_path):
                 raise NetworkSecurityException(f"Input file not found: {input_file_path}", sys)
             
+            if chunk_size:
+                batch_prediction = BatchPrediction(self.batch_prediction_config)
+                return batch_prediction.initiate_streaming_batch_prediction(input_file_path, chunk_size)
+            
             # Load data from file
             input_data = pd.read_csv(input_file_path)
             
@@ -278,6 +642,22 @@ class BatchPredictionPipeline:
         except Exception as e:
             raise NetworkSecurityException(e, sys)
     
+    def predict_parallel(self, input_file_paths, n_workers: Optional[int] = None) -> BatchPredictionArtifact:
+        """Run batch prediction over one large CSV or a list of CSV shards on a process pool"""
+        try:
+            if isinstance(input_file_paths, str):
+                input_file_paths = [input_file_paths]
+            
+            for input_file_path in input_file_paths:
+                if not os.path.exists(input_file_path):
+                    raise FileNotFoundError(f"Input file not found: {input_file_path}")
+            
+            batch_prediction = BatchPrediction(self.batch_prediction_config)
+            return batch_prediction.initiate_parallel_batch_prediction(input_file_paths, n_workers)
+            
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+    
     def predict_from_dataframe(self, input_data: pd.DataFrame) -> BatchPredictionArtifact:
         """Run batch prediction from a pandas DataFrame"""
         try:
@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Type
+
+from networksecurity.constant.training_pipeline import TRAINING_PIPELINE_MAX_WORKERS
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.pipeline.stage_cache import artifact_file_paths, artifact_from_dict, artifact_to_dict
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+
+
+@dataclass
+class Stage:
+    """
+    One step of a pipeline DAG.
+    :param run: Called with the artifacts named in inputs as keyword arguments.
+    :param inputs: Names of the artifacts the stage needs, outputs of other stages or initial artifacts.
+    :param output: Name of the artifact the stage returns. If it returns None, the stages that
+                   need it are skipped.
+    :param artifact_cls: Dataclass of the output, to restore it from a checkpoint.
+    :param after: Stages that must finish first without passing their output.
+    """
+    name: str
+    run: Callable[..., object]
+    inputs: List[str] = field(default_factory=list)
+    output: Optional[str] = None
+    artifact_cls: Optional[Type] = None
+    after: List[str] = field(default_factory=list)
+
+
+class DagExecutor:
+    """
+    Runs stages as soon as their inputs are available, independent stages concurrently on a
+    thread pool. Every finished stage is recorded in the checkpoint file, so a run that failed
+    can be resumed from its last successful stages. The checkpoint is removed once all stages
+    have finished.
+    """
+
+    def __init__(self, stages: Iterable[Stage], checkpoint_file_path: Optional[str] = None,
+                 max_workers: int = TRAINING_PIPELINE_MAX_WORKERS):
+        try:
+            self.stages: Dict[str, Stage] = {}
+            for stage in stages:
+                if stage.name in self.stages:
+                    raise ValueError(f"Duplicate stage: {stage.name}")
+                self.stages[stage.name] = stage
+            self.producers = {stage.output: name for name, stage in self.stages.items() if stage.output}
+            self.checkpoint_file_path = checkpoint_file_path
+            self.max_workers = max_workers
+            self.timings: Dict[str, float] = {}
+            self.resumed: List[str] = []
+            self._check_acyclic()
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def dependencies(self, stage: Stage) -> List[str]:
+        return [self.producers[name] for name in stage.inputs if name in self.producers] + list(stage.after)
+
+    def _check_acyclic(self):
+        state = {}
+
+        def visit(name, path):
+            if name not in self.stages:
+                raise ValueError(f"Stage {path[-1]} depends on unknown stage {name}")
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.dependencies(self.stages[name]):
+                visit(dependency, path + [name])
+            state[name] = "done"
+
+        for name in self.stages:
+            visit(name, [])
+
+    def load_checkpoint(self, run_key) -> dict:
+        """Artifacts of the stages finished by an earlier run with the same run_key, if their files still exist"""
+        if self.checkpoint_file_path is None or not os.path.exists(self.checkpoint_file_path):
+            return {}
+        checkpoint = read_yaml_file(self.checkpoint_file_path) or {}
+        if checkpoint.get("run_key") != run_key:
+            logging.info("Pipeline checkpoint belongs to a different run, starting over")
+            return {}
+        finished = {}
+        for name, data in checkpoint.get("stages", {}).items():
+            stage = self.stages.get(name)
+            if stage is None or (stage.output and stage.artifact_cls is None):
+                continue
+            artifact = None
+            if data is not None and stage.artifact_cls is not None:
+                artifact = artifact_from_dict(stage.artifact_cls, data)
+                if not all(os.path.exists(path) for path in artifact_file_paths(artifact)):
+                    continue
+            finished[name] = artifact
+        return finished
+
+    def save_checkpoint(self, run_key, finished: dict):
+        if self.checkpoint_file_path is None:
+            return
+        stages = {name: artifact_to_dict(artifact) if artifact is not None and self.stages[name].artifact_cls else None
+                  for name, artifact in finished.items()}
+        write_yaml_file(self.checkpoint_file_path, replace=True,
+                        content={"run_key": run_key, "stages": stages, "timings": self.timings})
+
+    def run(self, artifacts: Optional[dict] = None, run_key=None, resume: bool = True) -> dict:
+        """
+        :param artifacts: Initial artifacts, by name.
+        :param run_key: Identifies the run a checkpoint can be resumed by, e.g. a fingerprint of the
+                        mode and the input data, see TrainingPipeline.run_key.
+        :return: Every artifact available at the end, by name.
+        """
+        try:
+            artifacts = dict(artifacts or {})
+            finished = self.load_checkpoint(run_key) if resume else {}
+            finished = {name: artifact for name, artifact in finished.items()
+                        if all(dependency in finished for dependency in self.dependencies(self.stages[name]))}
+            for name, artifact in finished.items():
+                if self.stages[name].output and artifact is not None:
+                    artifacts[self.stages[name].output] = artifact
+                logging.info(f"Stage {name} finished in an earlier run, resuming after it")
+            self.resumed = list(finished)
+
+            skipped = set()
+            running = {}
+            error = None
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+                while True:
+                    if error is None:
+                        for name, stage in self.stages.items():
+                            if name in finished or name in skipped or name in running.values():
+                                continue
+                            dependencies = self.dependencies(stage)
+                            if any(dependency in skipped for dependency in dependencies):
+                                skipped.add(name)
+                            elif all(dependency in finished for dependency in dependencies):
+                                if any(artifacts.get(input_name) is None for input_name in stage.inputs):
+                                    # an upstream stage returned None or an initial artifact is missing
+                                    logging.info(f"Skipping stage {name}, an input is not available")
+                                    skipped.add(name)
+                                    continue
+                                kwargs = {input_name: artifacts[input_name] for input_name in stage.inputs}
+                                running[executor.submit(self._run_stage, stage, kwargs)] = name
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        try:
+                            artifact = future.result()
+                        except Exception as e:
+                            logging.error(f"Stage {name} failed")
+                            error = error or e
+                            continue
+                        finished[name] = artifact
+                        if self.stages[name].output:
+                            artifacts[self.stages[name].output] = artifact
+                        self.save_checkpoint(run_key, finished)
+
+            if error is not None:
+                raise error
+            if self.checkpoint_file_path is not None and os.path.exists(self.checkpoint_file_path):
+                os.remove(self.checkpoint_file_path)
+            return artifacts
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _run_stage(self, stage: Stage, kwargs: dict):
+        logging.info(f"Stage {stage.name} started")
+        started = time.perf_counter()
+        artifact = stage.run(**kwargs)
+        self.timings[stage.name] = time.perf_counter() - started
+        logging.info(f"Stage {stage.name} finished in {self.timings[stage.name]:.2f}s")
+        return artifact
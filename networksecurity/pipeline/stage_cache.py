@@ -0,0 +1,197 @@
+import ast
+import dataclasses
+import hashlib
+import importlib.util
+import inspect
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Iterable, Optional, Type
+
+from networksecurity.constant import training_pipeline
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.utils.main_utils.utils import file_checksum, read_yaml_file, write_yaml_file
+
+
+def artifact_to_dict(artifact) -> dict:
+    return dataclasses.asdict(artifact)
+
+
+def artifact_from_dict(artifact_cls: Type, data: dict):
+    """Rebuilds an artifact dataclass, including nested artifact dataclasses"""
+    values = {}
+    for field in dataclasses.fields(artifact_cls):
+        if field.name not in data:
+            continue
+        value = data[field.name]
+        if dataclasses.is_dataclass(field.type) and isinstance(value, dict):
+            value = artifact_from_dict(field.type, value)
+        values[field.name] = value
+    return artifact_cls(**values)
+
+
+def artifact_file_paths(artifact) -> list:
+    """Every *_file_path field of an artifact and of its nested artifacts"""
+    paths = []
+    for field in dataclasses.fields(artifact):
+        value = getattr(artifact, field.name)
+        if dataclasses.is_dataclass(value):
+            paths.extend(artifact_file_paths(value))
+        elif field.name.endswith("file_path") and value:
+            paths.append(value)
+    return paths
+
+
+def path_checksum(path: str) -> str:
+    """sha256 of a file, or of the relative names and contents of every file below a directory"""
+    if os.path.isfile(path):
+        return file_checksum(path)
+    digest = hashlib.sha256()
+    for root, _, files in sorted(os.walk(path)):
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            digest.update(file_checksum(file_path).encode())
+    return digest.hexdigest()
+
+
+def stage_constants(prefixes: Iterable[str]) -> dict:
+    """Constants of constant/training_pipeline whose names start with one of prefixes"""
+    prefixes = tuple(prefixes)
+    return {name: repr(value) for name, value in sorted(vars(training_pipeline).items())
+            if name.isupper() and name.startswith(prefixes)}
+
+
+def _imported_names(source_file: str) -> list:
+    """Every module name imported by a source file, also inside functions, with the names imported from it"""
+    with open(source_file) as file_obj:
+        tree = ast.parse(file_obj.read(), filename=source_file)
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+            # from package import module
+            names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return names
+
+
+def _module_source_file(name: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError, AttributeError):
+        # a class or function imported from a module, not a module
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin
+
+
+def code_files(modules: Iterable) -> list:
+    """
+    Source files of modules (or of the modules defining the given classes) and of every module
+    of the same top-level package they import, directly or through other modules.
+    The constants module is left out, stages depend on it through constant_prefixes.
+    """
+    constants_file = inspect.getsourcefile(training_pipeline)
+    files = set()
+    stack = []
+    for module in modules:
+        module_name = module.__name__ if inspect.ismodule(module) else module.__module__
+        stack.append((inspect.getsourcefile(module), module_name.split(".")[0]))
+    while stack:
+        source_file, package = stack.pop()
+        if source_file in files or source_file == constants_file:
+            continue
+        files.add(source_file)
+        for name in _imported_names(source_file):
+            if name == package or name.startswith(package + "."):
+                imported_file = _module_source_file(name)
+                if imported_file is not None:
+                    stack.append((imported_file, package))
+    return sorted(files)
+
+
+def code_version(modules: Iterable) -> str:
+    """sha256 of the source files of modules and of the modules they import, see code_files"""
+    digest = hashlib.sha256()
+    for source_file in code_files(modules):
+        digest.update(file_checksum(source_file).encode())
+    return digest.hexdigest()
+
+
+class StageCache:
+    """
+    Content-addressed cache of stage artifacts.
+
+    A stage's fingerprint is the sha256 of its input files, the constants it depends on, the
+    source of its code and any extra values (e.g. the state of the source collection). The
+    artifact of a finished stage is indexed under its fingerprint in cache_dir, and a later run
+    with the same fingerprint gets that artifact back instead of recomputing it, as long as
+    every file it references still exists.
+    """
+
+    def __init__(self, cache_dir: str = training_pipeline.TRAINING_STAGE_CACHE_DIR,
+                 enabled: bool = training_pipeline.TRAINING_STAGE_CACHE_ENABLED):
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.hits = []
+
+    def fingerprint(self, stage_name: str, input_files: Iterable[str] = (), constant_prefixes: Iterable[str] = (),
+                    code_modules: Iterable = (), values: Iterable = ()) -> str:
+        digest = hashlib.sha256(stage_name.encode())
+        for path in input_files:
+            digest.update(path_checksum(path).encode())
+        for name, value in stage_constants(constant_prefixes).items():
+            digest.update(f"{name}={value}".encode())
+        digest.update(code_version(code_modules).encode())
+        for value in values:
+            digest.update(repr(value).encode())
+        return digest.hexdigest()
+
+    def _entry_path(self, stage_name: str, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, stage_name, f"{fingerprint}.yaml")
+
+    def lookup(self, stage_name: str, fingerprint: str, artifact_cls: Type):
+        entry_path = self._entry_path(stage_name, fingerprint)
+        if not self.enabled or not os.path.exists(entry_path):
+            return None
+        entry = read_yaml_file(entry_path)
+        if not all(os.path.exists(path) for path in entry.get("files", [])):
+            logging.info(f"Stage cache entry of {stage_name} points to deleted artifacts, recomputing")
+            return None
+        return artifact_from_dict(artifact_cls, entry["artifact"])
+
+    def store(self, stage_name: str, fingerprint: str, artifact):
+        if self.enabled:
+            write_yaml_file(self._entry_path(stage_name, fingerprint), replace=True, content={
+                "created_at": datetime.now().isoformat(),
+                "artifact": artifact_to_dict(artifact),
+                # files the stage wrote, a hit needs all of them
+                "files": [path for path in artifact_file_paths(artifact) if os.path.exists(path)],
+            })
+
+    def run(self, stage_name: str, artifact_cls: Type, compute: Callable[[], object],
+            on_hit: Optional[Callable[[object], None]] = None, **fingerprint_inputs):
+        """
+        Returns the cached artifact of stage_name for these inputs, or runs compute and caches its artifact.
+        :param on_hit: Called with a cached artifact, for side effects the stage would have had.
+        :param fingerprint_inputs: Keyword arguments of fingerprint.
+        """
+        try:
+            fingerprint = self.fingerprint(stage_name, **fingerprint_inputs) if self.enabled else None
+            artifact = self.lookup(stage_name, fingerprint, artifact_cls) if self.enabled else None
+            if artifact is not None:
+                logging.info(f"Stage {stage_name} unchanged (fingerprint {fingerprint[:12]}), reusing its artifacts")
+                self.hits.append(stage_name)
+                if on_hit is not None:
+                    on_hit(artifact)
+                return artifact
+            artifact = compute()
+            if artifact is not None and fingerprint is not None:
+                self.store(stage_name, fingerprint, artifact)
+            return artifact
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
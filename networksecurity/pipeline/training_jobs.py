@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from networksecurity.constant.training_pipeline import TRAINING_JOB_RESULT_POLL_SECONDS, TRAINING_JOBS_MAX_FINISHED
+from networksecurity.constant.training_pipeline import TRAINING_PIPELINE_CHECKPOINT_FILE_PATH
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+def run_training_pipeline():
+    """Entry point of the training worker process."""
+    from networksecurity.pipeline.training_pipeline import TrainingPipeline
+
+    TrainingPipeline().run_pipeline()
+
+
+def clear_training_checkpoint(checkpoint_file_path: str = TRAINING_PIPELINE_CHECKPOINT_FILE_PATH):
+    """Removes the checkpoint of a cancelled run, the next run starts from scratch."""
+    if os.path.exists(checkpoint_file_path):
+        os.remove(checkpoint_file_path)
+
+
+def _job_worker(target: Callable[[], None], conn):
+    try:
+        target()
+        conn.send((SUCCEEDED, None))
+    except BaseException as e:
+        conn.send((FAILED, str(e)))
+    finally:
+        conn.close()
+
+
+@dataclass
+class TrainingJob:
+    job_id: str
+    status: str = QUEUED
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TrainingJobManager:
+    """
+    Runs training jobs one at a time, each in its own worker process.
+
+    The API process only keeps the job queue and the job states, so a GridSearchCV that
+    runs for minutes never competes with request handling for the interpreter. A running
+    job is cancelled by terminating its worker process, then on_cancel is called, e.g. to drop
+    the checkpoint the terminated run left behind. Only the max_finished most recently finished
+    jobs are kept. Jobs are dispatched once start() was called.
+    """
+
+    def __init__(self, target: Callable[[], None] = run_training_pipeline,
+                 on_success: Optional[Callable[[], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None,
+                 start_method: str = "spawn",
+                 max_finished: int = TRAINING_JOBS_MAX_FINISHED,
+                 poll_interval: float = TRAINING_JOB_RESULT_POLL_SECONDS):
+        self.target = target
+        self.on_success = on_success
+        self.on_cancel = on_cancel
+        self.max_finished = max_finished
+        self.poll_interval = poll_interval
+        self._context = multiprocessing.get_context(start_method)
+        self._jobs: Dict[str, TrainingJob] = {}
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._process = None
+        self._running_job_id: Optional[str] = None
+        self._cancel_requested = False
+        self._dispatcher = None
+
+    def start(self):
+        """Starts the dispatcher thread, once"""
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="training-jobs", daemon=True)
+                self._dispatcher.start()
+
+    def submit(self) -> TrainingJob:
+        job = TrainingJob(job_id=uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.job_id] = job
+        self._queue.put(job.job_id)
+        logging.info(f"Training job {job.job_id} queued")
+        return job
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[TrainingJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """
+        Cancels a queued or running job. A running job turns to cancelled once its
+        worker process has exited. Finished jobs are returned unchanged.
+        :return: The job, or None if the id is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished_at = datetime.now().isoformat()
+                self._prune_finished()
+            elif job.status == RUNNING and self._running_job_id == job_id:
+                self._cancel_requested = True
+                self._process.terminate()
+            logging.info(f"Training job {job_id} is {job.status}")
+            return job
+
+    def _prune_finished(self):
+        """Drops the oldest finished jobs beyond max_finished, called with the lock held"""
+        finished = [job for job in self._jobs.values() if job.status in (SUCCEEDED, FAILED, CANCELLED)]
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.job_id]
+
+    def _wait_for_result(self, process, parent_conn) -> Optional[tuple]:
+        """
+        Reads the worker's result before joining it: a result larger than the pipe buffer
+        blocks the worker in send until it is read, so joining first would never return.
+        :return: The (status, error) tuple sent by the worker, None if it exited without one.
+        """
+        while True:
+            if parent_conn.poll(self.poll_interval):
+                try:
+                    return parent_conn.recv()
+                except EOFError:
+                    # the worker was terminated before it could report back
+                    return None
+            if not process.is_alive():
+                if parent_conn.poll(0):
+                    continue
+                return None
+
+    def _dispatch(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logging.error(NetworkSecurityException(e, sys))
+
+    def _run(self, job_id: str):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.status != QUEUED:
+                return
+            process = self._context.Process(target=_job_worker, args=(self.target, child_conn), daemon=True)
+            process.start()
+            self._process = process
+            self._running_job_id = job_id
+            self._cancel_requested = False
+            job.status = RUNNING
+            job.started_at = datetime.now().isoformat()
+        child_conn.close()
+        logging.info(f"Training job {job_id} started in process {process.pid}")
+
+        result = self._wait_for_result(process, parent_conn)
+        process.join()
+        parent_conn.close()
+        if self._cancel_requested and self.on_cancel is not None:
+            # before the job reports cancelled, a new run must not find what it left behind
+            self.on_cancel()
+
+        with self._lock:
+            self._process = None
+            self._running_job_id = None
+            job.finished_at = datetime.now().isoformat()
+            if self._cancel_requested:
+                job.status = CANCELLED
+            elif result is not None and result[0] == SUCCEEDED:
+                job.status = SUCCEEDED
+            else:
+                job.status = FAILED
+                job.error = result[1] if result is not None else f"Worker exited with code {process.exitcode}"
+            self._prune_finished()
+        logging.info(f"Training job {job_id} finished with status {job.status}")
+
+        if job.status == SUCCEEDED and self.on_success is not None:
+            self.on_success()
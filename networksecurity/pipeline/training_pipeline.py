@@ -8,6 +8,10 @@ from networksecurity.componenets.data_validation import DataValidation
 from networksecurity.componenets.data_ingestion import DataIngestion
 from networksecurity.componenets.data_transformation import DataTransformation
 from networksecurity.componenets.model_trainer import ModelTrainer
+from networksecurity.componenets import data_ingestion as data_ingestion_module
+from networksecurity.componenets import data_validation as data_validation_module
+from networksecurity.componenets import data_transformation as data_transformation_module
+from networksecurity.componenets import model_trainer as model_trainer_module
 from networksecurity.cloud.s3_syncer import S3Sync
 
 from networksecurity.entity.config_entity import(
@@ -27,7 +31,14 @@ from networksecurity.entity.artifact_entity import (
 
 from networksecurity.constant.training_pipeline import TRAINING_BUCKET_NAME
 #from networksecurity.cloud.s3_syncer import S3Sync
-from networksecurity.constant.training_pipeline import SAVED_MODEL_DIR
+from networksecurity.constant.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NAME
+from networksecurity.constant.training_pipeline import TRAINING_MODE_AUTO, TRAINING_MODE_FULL, TRAINING_MODE_INCREMENTAL
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH
+from networksecurity.pipeline.dag import DagExecutor, Stage
+from networksecurity.pipeline.stage_cache import StageCache
+from networksecurity.pipeline.training_state import TrainingState, decide_training_mode
+from networksecurity.utils.main_utils.utils import load_object, write_yaml_file
+from networksecurity.utils.model.estimator import supports_incremental_fit
 import sys
 
 
@@ -35,14 +46,24 @@ class TrainingPipeline:
     def __init__(self):
         self.training_pipeline_config=TrainingPipelineConfig()
         self.s3_sync = S3Sync()
-        
+        self.stage_cache = StageCache()
+        self.stage_timings = {}
 
-    def start_data_ingestion(self):
+    def start_data_ingestion(self, mode: str = TRAINING_MODE_FULL, watermark=None):
         try:
             self.data_ingestion_config=DataIngestionConfig(training_pipeline_config=self.training_pipeline_config)
             logging.info("Start data Ingestion")
             data_ingestion=DataIngestion(data_ingestion_config=self.data_ingestion_config)
-            data_ingestion_artifact=data_ingestion.initiate_data_ingestion()
+            if mode != TRAINING_MODE_FULL:
+                # an incremental run depends on the watermark and the feature store, it is never cached
+                return data_ingestion.initiate_data_ingestion(mode=mode, watermark=watermark)
+            data_ingestion_artifact=self.stage_cache.run(
+                "data_ingestion", ArtifactEntity,
+                lambda: data_ingestion.initiate_data_ingestion(mode=mode, watermark=watermark),
+                input_files=[SCHEMA_FILE_PATH], values=[data_ingestion.source_fingerprint()],
+                constant_prefixes=["DATA_INGESTION", "ARTIFACT", "TARGET_COLUMN"],
+                # the modules they import are hashed too, see code_files
+                code_modules=[data_ingestion_module])
             logging.info(f"Data Ingestion completed and artifact: {data_ingestion_artifact}")
             return data_ingestion_artifact
         
@@ -54,23 +75,40 @@ class TrainingPipeline:
             data_validation_config=DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
             data_validation=DataValidation(data_ingestion_artifact=data_ingestion_artifact,data_validation_config=data_validation_config)
             logging.info("Initiate the data Validation")
-            data_validation_artifact=data_validation.initiate_data_validation()
+            data_validation_artifact=self.stage_cache.run(
+                "data_validation", DataValidationArtifact, data_validation.initiate_data_validation,
+                input_files=[data_ingestion_artifact.train_file_path, data_ingestion_artifact.test_file_path,
+                             SCHEMA_FILE_PATH],
+                constant_prefixes=["DATA_VALIDATION", "ARTIFACT", "TARGET_COLUMN"],
+                code_modules=[data_validation_module])
             return data_validation_artifact
         except Exception as e:
             raise NetworkSecurityException(e,sys)
         
-    def start_data_transformation(self,data_validation_artifact:DataValidationArtifact):
+    def start_data_transformation(self,data_validation_artifact:DataValidationArtifact, mode: str = TRAINING_MODE_FULL):
         try:
             data_transformation_config = DataTransformationConfig(training_pipeline_config=self.training_pipeline_config)
             data_transformation = DataTransformation(data_validation_artifact=data_validation_artifact,
             data_transformation_config=data_transformation_config)
             
-            data_transformation_artifact = data_transformation.initiate_data_transformation()
+            input_files = [data_validation_artifact.valid_train_file_path, data_validation_artifact.valid_test_file_path]
+            if mode != TRAINING_MODE_FULL:
+                # reuses the published preprocessor and adds to the published reference profile
+                input_files.append(data_transformation_config.final_preprocessor_file_path)
+                if os.path.exists(data_transformation_config.final_reference_profile_file_path):
+                    input_files.append(data_transformation_config.final_reference_profile_file_path)
+            data_transformation_artifact = self.stage_cache.run(
+                "data_transformation", DataTransformationArtifact,
+                lambda: data_transformation.initiate_data_transformation(fit_preprocessor=mode == TRAINING_MODE_FULL),
+                input_files=input_files, values=[mode],
+                constant_prefixes=["DATA_TRANSFORMATION", "TARGET_COLUMN"],
+                code_modules=[data_transformation_module])
             return data_transformation_artifact
         except Exception as e:
             raise NetworkSecurityException(e,sys)
         
-    def start_model_trainer(self,data_transformation_artifact:DataTransformationArtifact)->ModelTrainerArtifact:
+    def start_model_trainer(self,data_transformation_artifact:DataTransformationArtifact,
+                            mode: str = TRAINING_MODE_FULL)->ModelTrainerArtifact:
         try:
             self.model_trainer_config: ModelTrainerConfig = ModelTrainerConfig(
                 training_pipeline_config=self.training_pipeline_config
@@ -81,7 +119,22 @@ class TrainingPipeline:
                 model_trainer_config=self.model_trainer_config,
             )
 
-            model_trainer_artifact = model_trainer.initiate_model_trainer()
+            input_files = [data_transformation_artifact.transformed_train_file_path,
+                           data_transformation_artifact.transformed_test_file_path,
+                           data_transformation_artifact.transformed_object_file_path]
+            if data_transformation_artifact.reference_profile_file_path:
+                input_files.append(data_transformation_artifact.reference_profile_file_path)
+            if mode == TRAINING_MODE_INCREMENTAL:
+                # warm-starts the published model
+                input_files.append(os.path.join(self.model_trainer_config.final_model_dir, MODEL_FILE_NAME))
+            model_trainer_artifact = self.stage_cache.run(
+                "model_trainer", ModelTrainerArtifact,
+                lambda: model_trainer.initiate_model_trainer(incremental=mode == TRAINING_MODE_INCREMENTAL),
+                # a cached model is published again, a later run may have replaced it
+                on_hit=model_trainer.republish,
+                input_files=input_files, values=[mode],
+                constant_prefixes=["MODEL_TRAINER"],
+                code_modules=[model_trainer_module])
 
             return model_trainer_artifact
 
@@ -107,18 +160,94 @@ class TrainingPipeline:
         
     
     
-    def run_pipeline(self):
+    def published_model_supports_incremental(self) -> bool:
+        model_file_path = os.path.join(self.training_pipeline_config.model_dir, MODEL_FILE_NAME)
+        return os.path.exists(model_file_path) and supports_incremental_fit(load_object(model_file_path))
+
+    def run_key(self, mode: str, state: TrainingState) -> str:
+        """
+        Identity of a run, a checkpoint is only resumed by a run with the same key: the mode, the
+        watermark, the state of the source collection, the schema, the constants of the stages and
+        the code of the pipeline and of every module it imports. A run that failed on older data
+        or older code starts over.
+        """
         try:
-            data_ingestion_artifact=self.start_data_ingestion()
-            data_validation_artifact=self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact=self.start_data_transformation(data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact=self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            
-            self.sync_artifact_dir_to_s3()
-            self.sync_saved_model_dir_to_s3()
-            
-            return model_trainer_artifact
+            data_ingestion = DataIngestion(
+                data_ingestion_config=DataIngestionConfig(training_pipeline_config=self.training_pipeline_config))
+            return self.stage_cache.fingerprint(
+                "training_pipeline", input_files=[SCHEMA_FILE_PATH],
+                constant_prefixes=["DATA_INGESTION", "DATA_VALIDATION", "DATA_TRANSFORMATION", "MODEL_TRAINER",
+                                   "ARTIFACT", "TARGET_COLUMN"],
+                code_modules=[sys.modules[__name__]],
+                values=[mode, state.watermark, data_ingestion.source_fingerprint()])
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def build_stages(self, mode: str, state: TrainingState) -> list:
+        """
+        Stages of a training run. Validation waits for ingestion, transformation and training run
+        in sequence, and the state update and the two S3 syncs run concurrently once the model is trained.
+        """
+        def data_ingestion():
+            data_ingestion_artifact=self.start_data_ingestion(mode=mode, watermark=state.watermark)
+            if mode == TRAINING_MODE_INCREMENTAL and data_ingestion_artifact.n_records == 0:
+                return None
+            if data_ingestion_artifact.drift_detected:
+                logging.info("New records drifted, switching to a full retrain")
+                data_ingestion_artifact=self.start_data_ingestion(mode=TRAINING_MODE_FULL)
+            return data_ingestion_artifact
+
+        def record_training_state(data_ingestion_artifact, model_trainer_artifact):
+            state.record_run(data_ingestion_artifact.mode, data_ingestion_artifact.watermark,
+                             data_ingestion_artifact.n_records)
+            state.save(self.training_pipeline_config.training_state_file_path)
+
+        return [
+            Stage("data_ingestion", data_ingestion, output="data_ingestion_artifact", artifact_cls=ArtifactEntity),
+            Stage("data_validation", self.start_data_validation, inputs=["data_ingestion_artifact"],
+                  output="data_validation_artifact", artifact_cls=DataValidationArtifact),
+            Stage("data_transformation",
+                  lambda data_validation_artifact, data_ingestion_artifact: self.start_data_transformation(
+                      data_validation_artifact=data_validation_artifact, mode=data_ingestion_artifact.mode),
+                  inputs=["data_validation_artifact", "data_ingestion_artifact"],
+                  output="data_transformation_artifact", artifact_cls=DataTransformationArtifact),
+            Stage("model_trainer",
+                  lambda data_transformation_artifact, data_ingestion_artifact: self.start_model_trainer(
+                      data_transformation_artifact=data_transformation_artifact, mode=data_ingestion_artifact.mode),
+                  inputs=["data_transformation_artifact", "data_ingestion_artifact"],
+                  output="model_trainer_artifact", artifact_cls=ModelTrainerArtifact),
+            Stage("record_training_state", record_training_state,
+                  inputs=["data_ingestion_artifact", "model_trainer_artifact"]),
+            Stage("sync_artifact_dir_to_s3", lambda model_trainer_artifact: self.sync_artifact_dir_to_s3(),
+                  inputs=["model_trainer_artifact"]),
+            Stage("sync_saved_model_dir_to_s3", lambda model_trainer_artifact: self.sync_saved_model_dir_to_s3(),
+                  inputs=["model_trainer_artifact"]),
+        ]
+
+    def run_pipeline(self, mode: str = TRAINING_MODE_AUTO, resume: bool = True):
+        """
+        :param mode: "full" retrains from the whole collection, "incremental" updates the published
+                     model with the documents added since the last run, "auto" picks incremental
+                     unless a full retrain is due (see decide_training_mode) or the new records drifted.
+        :param resume: Reuse the stages a failed run finished, if the source data, schema, constants
+                       and code are unchanged, see run_key and DagExecutor.
+        :return: ModelTrainerArtifact, or None if an incremental run found no new records.
+        """
+        try:
+            state = TrainingState.load(self.training_pipeline_config.training_state_file_path)
+            if mode != TRAINING_MODE_FULL:
+                mode = decide_training_mode(state, mode,
+                                            model_supports_incremental=self.published_model_supports_incremental())
+
+            executor = DagExecutor(self.build_stages(mode, state),
+                                   checkpoint_file_path=self.training_pipeline_config.checkpoint_file_path)
+            try:
+                artifacts = executor.run(run_key=self.run_key(mode, state), resume=resume)
+            finally:
+                self.stage_timings = executor.timings
+                if executor.timings:
+                    write_yaml_file(self.training_pipeline_config.stage_timings_file_path,
+                                    content=executor.timings, replace=True)
+            return artifacts.get("model_trainer_artifact")
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
-    
@@ -0,0 +1,80 @@
+import os
+import sys
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from networksecurity.constant.training_pipeline import (
+    TRAINING_FULL_RETRAIN_INTERVAL_DAYS,
+    TRAINING_MODE_AUTO,
+    TRAINING_MODE_FULL,
+    TRAINING_MODE_INCREMENTAL,
+)
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.utils.main_utils.utils import read_yaml_file, write_yaml_file
+
+
+@dataclass
+class TrainingState:
+    """What the previous training runs consumed, kept next to the persistent feature store."""
+    watermark: Optional[str] = None
+    n_records: int = 0
+    last_full_run_at: Optional[str] = None
+    last_run_at: Optional[str] = None
+    last_mode: Optional[str] = None
+
+    @classmethod
+    def load(cls, file_path: str) -> "TrainingState":
+        try:
+            if not os.path.exists(file_path):
+                return cls()
+            return cls(**(read_yaml_file(file_path) or {}))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def save(self, file_path: str):
+        write_yaml_file(file_path, content=asdict(self), replace=True)
+
+    def record_run(self, mode: str, watermark: Optional[str], n_records: int, now: Optional[datetime] = None):
+        now = (now or datetime.now()).isoformat()
+        self.watermark = watermark or self.watermark
+        self.n_records = n_records if mode == TRAINING_MODE_FULL else self.n_records + n_records
+        self.last_run_at = now
+        self.last_mode = mode
+        if mode == TRAINING_MODE_FULL:
+            self.last_full_run_at = now
+
+
+def decide_training_mode(state: TrainingState, requested_mode: str = TRAINING_MODE_AUTO,
+                         model_supports_incremental: bool = True,
+                         full_retrain_interval_days: float = TRAINING_FULL_RETRAIN_INTERVAL_DAYS,
+                         now: Optional[datetime] = None) -> str:
+    """
+    Resolves the auto mode. An incremental run needs a previous full run, a model that can be
+    warm-started and a full retrain less than full_retrain_interval_days ago. Drift in the new
+    records is checked during ingestion and switches an incremental run back to full.
+    :return: TRAINING_MODE_FULL or TRAINING_MODE_INCREMENTAL.
+    """
+    try:
+        if requested_mode not in (TRAINING_MODE_AUTO, TRAINING_MODE_FULL, TRAINING_MODE_INCREMENTAL):
+            raise ValueError(f"Unknown training mode: {requested_mode}")
+        if requested_mode == TRAINING_MODE_FULL:
+            return TRAINING_MODE_FULL
+
+        reason = None
+        if state.watermark is None or state.last_full_run_at is None:
+            reason = "no previous full run"
+        elif not model_supports_incremental:
+            reason = "the current model cannot be updated incrementally"
+        elif requested_mode == TRAINING_MODE_AUTO:
+            due = datetime.fromisoformat(state.last_full_run_at) + timedelta(days=full_retrain_interval_days)
+            if (now or datetime.now()) >= due:
+                reason = f"last full retrain is older than {full_retrain_interval_days} days"
+
+        if reason is not None:
+            logging.info(f"Running a full retrain: {reason}")
+            return TRAINING_MODE_FULL
+        return TRAINING_MODE_INCREMENTAL
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,135 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+MISSING_CODE = np.int8(-128)
+INT8_MIN = -127
+INT8_MAX = 127
+
+
+def is_int8_compatible(x: np.ndarray) -> bool:
+    """True if every value of x is an integer that fits in int8 (MISSING_CODE excluded)"""
+    if x.dtype == np.int8:
+        return True
+    if x.size == 0:
+        return True
+    if x.dtype.kind in "iub":
+        return bool(x.min() >= INT8_MIN and x.max() <= INT8_MAX)
+    if x.dtype.kind != "f":
+        return False
+    with np.errstate(invalid="ignore"):
+        return bool(np.all((x == np.round(x)) & (x >= INT8_MIN) & (x <= INT8_MAX)))
+
+
+def compact_array(x: np.ndarray) -> np.ndarray:
+    """Stores x as int8 when that is lossless, otherwise returns it unchanged"""
+    return x.astype(np.int8) if is_int8_compatible(x) else x
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcasts every column whose values all fit in int8, other columns are left as they are"""
+    compact = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype != np.int8 and values.dtype.kind in "iuf" and is_int8_compatible(values):
+            compact[column] = values.astype(np.int8)
+    return df.assign(**compact) if compact else df
+
+
+def read_compact_csv(file_path, **kwargs) -> pd.DataFrame:
+    """
+    Reads a CSV of small integer codes into int8 columns.
+    Columns are parsed with their natural dtype and only downcast after a range check
+    (see compact_frame); parsing with dtype=int8 would silently wrap 128 to MISSING_CODE
+    and 255 to -1. Columns that do not fit keep their parsed dtype.
+    """
+    return compact_frame(pd.read_csv(file_path, **kwargs))
+
+
+class FeatureMatrix:
+    """
+    Feature matrix of small integer codes stored as int8, one byte per value.
+
+    Missing values are stored as MISSING_CODE. The matrix is only widened to float (with
+    NaN for missing values) at the sklearn boundary, see to_float. For archival the ternary
+    features can be packed further into 2-bit codes, four values per byte.
+    """
+
+    def __init__(self, codes: np.ndarray, columns: Optional[List[str]] = None):
+        self.codes = np.ascontiguousarray(codes, dtype=np.int8)
+        self.columns = list(columns) if columns is not None else None
+
+    @classmethod
+    def from_values(cls, x: np.ndarray, columns: Optional[List[str]] = None) -> "FeatureMatrix":
+        """Builds the matrix from a numeric array, NaN becomes MISSING_CODE"""
+        x = np.asarray(x)
+        if x.dtype == np.int8:
+            return cls(x, columns)
+        missing = np.isnan(x) if x.dtype.kind == "f" else np.zeros(x.shape, dtype=bool)
+        filled = np.where(missing, 0, x)
+        if not is_int8_compatible(filled):
+            raise ValueError("Feature values must be integers between -127 and 127")
+        return cls(np.where(missing, MISSING_CODE, filled).astype(np.int8), columns)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Optional[List[str]] = None) -> "FeatureMatrix":
+        columns = list(columns) if columns is not None else df.columns.tolist()
+        frame = df[columns]
+        if all(dtype == np.int8 for dtype in frame.dtypes):
+            return cls(frame.to_numpy(), columns)
+        return cls.from_values(frame.to_numpy(dtype=np.float64), columns)
+
+    @property
+    def shape(self) -> tuple:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+    @property
+    def missing(self) -> np.ndarray:
+        return self.codes == MISSING_CODE
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, rows) -> "FeatureMatrix":
+        return FeatureMatrix(self.codes[rows], self.columns)
+
+    def to_float(self, dtype=np.float64) -> np.ndarray:
+        """Float copy for sklearn, NaN where a value is missing"""
+        x = self.codes.astype(dtype)
+        missing = self.missing
+        if missing.any():
+            x[missing] = np.nan
+        return x
+
+    def to_frame(self) -> pd.DataFrame:
+        """int8 DataFrame, or float with NaN if any value is missing"""
+        data = self.to_float() if self.missing.any() else self.codes
+        return pd.DataFrame(data, columns=self.columns)
+
+    def pack(self) -> np.ndarray:
+        """
+        Packs ternary codes (-1, 0, 1 and missing) into 2 bits each.
+        :return: uint8 array of shape (n_rows, ceil(n_columns / 4)).
+        """
+        missing = self.missing
+        if np.any(~missing & ((self.codes < -1) | (self.codes > 1))):
+            raise ValueError("Only ternary codes (-1, 0, 1) can be packed into 2 bits")
+        two_bit = np.where(missing, 3, self.codes + 1).astype(np.uint8)
+        n_rows, n_columns = two_bit.shape
+        padded = np.zeros((n_rows, -(-n_columns // 4) * 4), dtype=np.uint8)
+        padded[:, :n_columns] = two_bit
+        quads = padded.reshape(n_rows, -1, 4)
+        return quads[..., 0] | (quads[..., 1] << 2) | (quads[..., 2] << 4) | (quads[..., 3] << 6)
+
+    @classmethod
+    def unpack(cls, packed: np.ndarray, n_columns: int, columns: Optional[List[str]] = None) -> "FeatureMatrix":
+        shifts = np.array([0, 2, 4, 6], dtype=np.uint8)
+        two_bit = ((packed[..., None] >> shifts) & 3).reshape(len(packed), -1)[:, :n_columns]
+        codes = np.where(two_bit == 3, MISSING_CODE, two_bit.astype(np.int8) - 1).astype(np.int8)
+        return cls(codes, columns)
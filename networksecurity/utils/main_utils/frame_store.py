@@ -0,0 +1,119 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+from pyarrow import feather
+
+from networksecurity.constant.training_pipeline import ARTIFACT_FILE_FORMAT, ARTIFACT_COMPRESSION
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.main_utils.feature_matrix import compact_frame, read_compact_csv
+
+# Arrow IPC files are written with pandas' feather writer
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+
+def artifact_file_name(file_name: str, file_format: str = ARTIFACT_FILE_FORMAT) -> str:
+    """train.csv -> train.parquet for the configured artifact format"""
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unknown artifact format: {file_format}")
+    return os.path.splitext(file_name)[0] + FILE_EXTENSIONS[file_format]
+
+
+def file_format_of(file_path: str) -> str:
+    extension = os.path.splitext(file_path.rstrip(os.sep))[1]
+    for file_format, format_extension in FILE_EXTENSIONS.items():
+        if extension == format_extension:
+            return file_format
+    raise ValueError(f"Cannot tell the artifact format of {file_path}")
+
+
+def _write_file(data: pd.DataFrame, file_path: str, file_format: str):
+    if file_format == "parquet":
+        data.to_parquet(file_path, index=False, compression=ARTIFACT_COMPRESSION)
+    elif file_format == "arrow":
+        data.reset_index(drop=True).to_feather(file_path, compression=ARTIFACT_COMPRESSION)
+    else:
+        data.to_csv(file_path, index=False)
+
+
+def _read_file(file_path: str, file_format: str) -> pd.DataFrame:
+    if file_format == "parquet":
+        return pd.read_parquet(file_path)
+    if file_format == "arrow":
+        # memory-mapped, int8 columns without nulls are converted without a copy
+        return feather.read_table(file_path, memory_map=True).to_pandas()
+    return read_compact_csv(file_path)
+
+
+def _recover_part_conversion(file_path: str):
+    """
+    Completes a conversion of a file into a part directory (see append_frame) that was interrupted.
+    Once the file was moved into file_path.tmp the directory takes its place, before that it is dropped.
+    """
+    tmp_dir = file_path + ".tmp"
+    if not os.path.isdir(tmp_dir):
+        return
+    if os.path.exists(file_path):
+        shutil.rmtree(tmp_dir)
+    else:
+        os.replace(tmp_dir, file_path)
+
+
+def write_frame(data: pd.DataFrame, file_path: str) -> str:
+    """
+    Writes a DataFrame in the format given by the file extension (see artifact_file_name).
+    Parquet and Arrow keep the int8 column types, CSV is meant for exports.
+    """
+    try:
+        file_format = file_format_of(file_path)
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        _recover_part_conversion(file_path)
+        if os.path.isdir(file_path):
+            shutil.rmtree(file_path)
+        _write_file(data, file_path, file_format)
+        return file_path
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def append_frame(data: pd.DataFrame, file_path: str) -> str:
+    """
+    Appends rows to a frame written by write_frame. CSV files are appended in place. Columnar files
+    become a directory of part files that read_frame reads back in order. The file is moved into
+    the part directory before the directory replaces it, a crash in between is recovered by the
+    next append instead of starting a new frame.
+    """
+    try:
+        file_format = file_format_of(file_path)
+        _recover_part_conversion(file_path)
+        if not os.path.exists(file_path):
+            return write_frame(data, file_path)
+        if file_format == "csv":
+            columns = pd.read_csv(file_path, nrows=0).columns
+            data[columns].to_csv(file_path, mode="a", header=False, index=False)
+            return file_path
+
+        if os.path.isfile(file_path):
+            first_part = os.path.join(file_path + ".tmp", f"part-00000{FILE_EXTENSIONS[file_format]}")
+            os.makedirs(os.path.dirname(first_part))
+            os.replace(file_path, first_part)
+            os.replace(file_path + ".tmp", file_path)
+        n_parts = len(os.listdir(file_path))
+        part_file_path = os.path.join(file_path, f"part-{n_parts:05d}{FILE_EXTENSIONS[file_format]}")
+        _write_file(data, part_file_path, file_format)
+        return file_path
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def read_frame(file_path: str) -> pd.DataFrame:
+    """Reads a frame written by write_frame or append_frame, columns of small integers come back as int8"""
+    try:
+        file_format = file_format_of(file_path)
+        if os.path.isdir(file_path):
+            parts = [_read_file(os.path.join(file_path, part), file_format) for part in sorted(os.listdir(file_path))]
+            return compact_frame(pd.concat(parts, ignore_index=True))
+        return compact_frame(_read_file(file_path, file_format))
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
@@ -0,0 +1,177 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.main_utils.feature_matrix import MISSING_CODE, FeatureMatrix
+from networksecurity.utils.main_utils.utils import read_yaml_file
+
+
+
+@dataclass
+class SchemaValidationResult:
+    """Outcome of one validation pass over a batch of records"""
+    codes: np.ndarray
+    missing: np.ndarray
+    invalid: np.ndarray
+    feature_columns: List[str]
+
+    @property
+    def valid_rows(self) -> np.ndarray:
+        return ~self.invalid.any(axis=1)
+
+    @property
+    def n_invalid_rows(self) -> int:
+        return int(self.invalid.any(axis=1).sum())
+
+    @property
+    def column_violations(self) -> Dict[str, int]:
+        counts = self.invalid.sum(axis=0)
+        return {column: int(count) for column, count in zip(self.feature_columns, counts) if count}
+
+    @property
+    def column_missing(self) -> Dict[str, int]:
+        counts = self.missing.sum(axis=0)
+        return {column: int(count) for column, count in zip(self.feature_columns, counts) if count}
+
+    def feature_matrix(self, rows: np.ndarray = None) -> FeatureMatrix:
+        """int8 feature matrix of the given rows, missing values as MISSING_CODE"""
+        codes = self.codes if rows is None else self.codes[rows]
+        return FeatureMatrix(codes, self.feature_columns)
+
+
+class FeatureSchema:
+    """
+    Feature layout of data_schema/schema.yaml, prepared once for fast record checks.
+
+    Every feature is a small integer code, so the allowed values are kept as a lookup
+    table indexed by (column, value - min_code) and a whole batch is checked with one
+    fancy-indexing pass instead of a per-column loop.
+    """
+
+    def __init__(self, schema: dict):
+        try:
+            columns: Dict[str, dict] = schema["columns"]
+            self.label_column: str = schema.get("metadata", {}).get("label_column", TARGET_COLUMN)
+            self.feature_columns: List[str] = [column for column in columns if column != self.label_column]
+            self.column_index: Dict[str, int] = {column: i for i, column in enumerate(self.feature_columns)}
+
+            domains = [columns[column]["domain"] for column in self.feature_columns]
+            self.min_code: int = int(min(min(domain) for domain in domains))
+            max_code = int(max(max(domain) for domain in domains))
+            self.allowed = np.zeros((len(self.feature_columns), max_code - self.min_code + 1), dtype=bool)
+            for i, domain in enumerate(domains):
+                self.allowed[i, np.asarray(domain) - self.min_code] = True
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @classmethod
+    def from_yaml(cls, file_path: str = SCHEMA_FILE_PATH) -> "FeatureSchema":
+        return cls(read_yaml_file(file_path))
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_columns)
+
+    def to_codes(self, x: np.ndarray):
+        """
+        Converts a numeric matrix to int8 codes in one pass.
+        :return: Tuple of (int8 codes, missing mask, malformed mask). Missing and malformed
+                 cells (non-integral or outside the int8 range) hold MISSING_CODE.
+        """
+        if x.dtype == np.int8:
+            return x, x == MISSING_CODE, np.zeros(x.shape, dtype=bool)
+        if x.dtype.kind in "iu":
+            malformed = (x < -127) | (x > 127)
+            missing = np.zeros(x.shape, dtype=bool)
+        else:
+            missing = np.isnan(x)
+            with np.errstate(invalid="ignore"):
+                malformed = ~missing & ((x != np.round(x)) | (x < -127) | (x > 127))
+        codes = np.where(missing | malformed, MISSING_CODE, x).astype(np.int8)
+        return codes, missing, malformed
+
+    def invalid_cells(self, x: np.ndarray) -> np.ndarray:
+        """
+        Marks values outside the schema domain. Missing values (NaN) are not invalid,
+        the preprocessor imputes them.
+        :param x: 2-D array with the schema feature columns in order.
+        :return: Boolean array of the same shape, True where a value is not allowed.
+        """
+        codes, missing, malformed = self.to_codes(x)
+        return self._invalid_codes(codes, missing, malformed)
+
+    def _invalid_codes(self, codes: np.ndarray, missing: np.ndarray, malformed: np.ndarray) -> np.ndarray:
+        offsets = codes.astype(np.int16) - self.min_code
+        in_range = (offsets >= 0) & (offsets < self.allowed.shape[1])
+        columns = np.broadcast_to(np.arange(codes.shape[1]), codes.shape)
+        allowed = np.zeros(codes.shape, dtype=bool)
+        allowed[in_range] = self.allowed[columns[in_range], offsets[in_range]]
+        return malformed | ~(allowed | missing)
+
+    def validate_frame(self, data: pd.DataFrame) -> SchemaValidationResult:
+        """
+        Checks column presence, dtype and allowed values of a DataFrame in one vectorized pass.
+        Columns that are not schema features (e.g. the label) are ignored. Text that does not
+        parse as a number counts as a violation of its column, it is not coerced to missing.
+        """
+        missing_columns = [column for column in self.feature_columns if column not in data.columns]
+        if missing_columns:
+            raise ValueError(f"Input data is missing schema columns: {missing_columns}")
+
+        frame = data[self.feature_columns]
+        was_null = frame.isna().to_numpy()
+        non_numeric = [column for column, dtype in frame.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+        if non_numeric:
+            frame = frame.assign(**{column: pd.to_numeric(frame[column], errors="coerce") for column in non_numeric})
+        values = frame.to_numpy(dtype=np.float64)
+
+        codes, missing, malformed = self.to_codes(values)
+        malformed |= missing & ~was_null
+        missing &= was_null
+        invalid = self._invalid_codes(codes, missing, malformed)
+        return SchemaValidationResult(codes=codes, missing=missing, invalid=invalid,
+                                      feature_columns=self.feature_columns)
+
+    def check_array(self, x: np.ndarray) -> np.ndarray:
+        """
+        Raises ValueError naming the offending columns if x does not fit the schema.
+        :return: int8 codes of x, missing values as MISSING_CODE.
+        """
+        if x.ndim != 2 or x.shape[1] != self.n_features:
+            raise ValueError(f"Expected records with {self.n_features} features, got shape {x.shape}")
+        codes, missing, malformed = self.to_codes(x)
+        invalid = self._invalid_codes(codes, missing, malformed)
+        if invalid.any():
+            bad_columns = [self.feature_columns[i] for i in np.flatnonzero(invalid.any(axis=0))]
+            raise ValueError(f"Values outside the schema domain in columns: {bad_columns}")
+        return codes
+
+    def array_from_records(self, records: list) -> np.ndarray:
+        """
+        Builds the int8 feature codes from JSON records, either lists in schema column order
+        or objects keyed by column name. null becomes MISSING_CODE.
+        """
+        if not isinstance(records, list) or len(records) == 0:
+            raise ValueError("Expected a non-empty list of records")
+        rows = []
+        for record in records:
+            if isinstance(record, dict):
+                missing = [column for column in self.feature_columns if column not in record]
+                if missing:
+                    raise ValueError(f"Record is missing columns: {missing}")
+                record = [record[column] for column in self.feature_columns]
+            rows.append(record)
+        x = np.array(rows, dtype=np.float64)
+        return self.check_array(x)
+
+    def array_from_bytes(self, payload: bytes) -> np.ndarray:
+        """Builds the feature codes from a row-major buffer of int8 values, -128 meaning missing."""
+        if len(payload) == 0 or len(payload) % self.n_features != 0:
+            raise ValueError(f"Binary payload must hold a multiple of {self.n_features} int8 values")
+        x = np.frombuffer(payload, dtype=np.int8).reshape(-1, self.n_features)
+        return self.check_array(x)
@@ -5,9 +5,9 @@ import sys
 import os
 import dill
 import pickle
+import hashlib
+import tempfile
 import numpy as np
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import r2_score
 
 
 def read_yaml_file(file_path: str) -> dict:
@@ -61,24 +61,90 @@ def save_object(file_path: str, obj: object) -> None:
     """
     try:
         logger.info("Entered the save_object method of MainUtils class")
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'wb') as file_obj:
-            pickle.dump(obj, file_obj)
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        # write next to the target and rename, so readers never see a half-written pickle
+        fd, tmp_path = tempfile.mkstemp(dir=dir_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as file_obj:
+                pickle.dump(obj, file_obj)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
         logger.info("Exited the save_object method of MainUtils class")
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
     
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
     Loads a numpy array from a file.
     :param file_path: Path to the file from which the array will be loaded.
+    :param mmap_mode: Memory-map the file instead of reading it ("r" for read-only). Processes
+                      mapping the same file share its pages in the OS page cache.
     :return: Numpy array loaded from the file.
     """
     try:
+        if mmap_mode:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, 'rb') as file_obj:
             return np.load(file_obj)
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
+
+def save_feature_label_arrays(manifest_file_path: str, features: np.array, labels: np.array) -> dict:
+    """
+    Saves features and labels as separate .npy files next to a manifest with their
+    shape, dtype and sha256, so either can be memory-mapped on its own.
+    :param manifest_file_path: Path of the manifest, e.g. .../train_manifest.yaml.
+    :param features: 2-D feature array.
+    :param labels: 1-D label array.
+    :return: The manifest content.
+    """
+    try:
+        dir_path = os.path.dirname(manifest_file_path)
+        stem = os.path.basename(manifest_file_path).rsplit("_manifest", 1)[0]
+        manifest = {}
+        for name, array in (("features", features), ("labels", labels)):
+            file_name = f"{stem}_{name}.npy"
+            file_path = os.path.join(dir_path, file_name)
+            save_numpy_array_data(file_path, np.ascontiguousarray(array))
+            manifest[name] = {
+                "file_name": file_name,
+                "shape": list(array.shape),
+                "dtype": str(array.dtype),
+                "sha256": file_checksum(file_path),
+            }
+        write_yaml_file(manifest_file_path, content=manifest)
+        return manifest
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
+
+def load_feature_label_arrays(manifest_file_path: str, mmap_mode: str = "r", verify: bool = False) -> tuple:
+    """
+    Loads the features and labels written by save_feature_label_arrays.
+    :param manifest_file_path: Path of the manifest.
+    :param mmap_mode: Passed to load_numpy_array_data, None reads the arrays into memory.
+    :param verify: Also compare the sha256 of both files with the manifest.
+    :return: Tuple of (features, labels).
+    """
+    try:
+        manifest = read_yaml_file(manifest_file_path)
+        dir_path = os.path.dirname(manifest_file_path)
+        arrays = []
+        for name in ("features", "labels"):
+            entry = manifest[name]
+            file_path = os.path.join(dir_path, entry["file_name"])
+            if verify and file_checksum(file_path) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {file_path}")
+            array = load_numpy_array_data(file_path, mmap_mode=mmap_mode)
+            if list(array.shape) != entry["shape"] or str(array.dtype) != entry["dtype"]:
+                raise ValueError(f"{file_path} does not match its manifest entry {entry}")
+            arrays.append(array)
+        return arrays[0], arrays[1]
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
     
 def load_object(file_path: str) -> object:
     """
@@ -94,32 +160,111 @@ def load_object(file_path: str) -> object:
     except Exception as e:
         raise NetworkSecurityException(e, sys) from e
     
-def evaluate_models(X_train, y_train,X_test,y_test,models,param):
+def file_checksum(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the sha256 checksum of a file without reading it fully into memory.
+    :param file_path: Path to the file.
+    :param chunk_size: Number of bytes read per step.
+    :return: Hex digest of the file content.
+    """
     try:
-        report = {}
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except Exception as e:
+        raise NetworkSecurityException(e, sys) from e
 
-        for i in range(len(list(models))):
-            model = list(models.values())[i]
-            para=param[list(models.keys())[i]]
+def build_search(model, param_grid: dict, search_strategy: str = "grid", cv: int = 3,
+                 n_jobs: int = -1, n_iter: int = 20, scoring: str = None, random_state: int = 42):
+    """
+    Builds the hyperparameter search for one model.
+    :param search_strategy: "grid" (exhaustive), "random" (n_iter sampled candidates) or
+                            "halving" (successive halving, weak candidates stop after a few samples).
+    :param n_jobs: Folds and candidates are fitted in parallel, -1 uses all cores.
+    :param scoring: sklearn scoring name for the CV folds, None uses the estimator's score.
+    """
+    # imported here so that serving, which only loads models, does not import sklearn.model_selection
+    from sklearn.model_selection import GridSearchCV, ParameterGrid, RandomizedSearchCV
 
-            gs = GridSearchCV(model,para,cv=3)
-            gs.fit(X_train,y_train)
+    if search_strategy == "grid":
+        return GridSearchCV(model, param_grid, cv=cv, n_jobs=n_jobs, scoring=scoring)
+    if search_strategy == "random":
+        n_iter = min(n_iter, len(ParameterGrid(param_grid)))
+        return RandomizedSearchCV(model, param_grid, n_iter=n_iter, cv=cv, n_jobs=n_jobs,
+                                  scoring=scoring, random_state=random_state)
+    if search_strategy == "halving":
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+        return HalvingGridSearchCV(model, param_grid, cv=cv, n_jobs=n_jobs, scoring=scoring,
+                                   random_state=random_state)
+    raise ValueError(f"Unknown search strategy: {search_strategy}")
+
+def best_cv_candidate(candidates: list) -> dict:
+    """
+    Candidate row, among the best_estimator_ of each model, with the highest mean CV score
+    (sklearn scorers are greater-is-better). Ties keep the model order.
+    :param candidates: Candidate rows returned by evaluate_models.
+    """
+    try:
+        return max((row for row in candidates if row["best"]), key=lambda row: row["mean_test_score"])
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
 
-            model.set_params(**gs.best_params_)
-            model.fit(X_train,y_train)
 
-            #model.fit(X_train, y_train)  # Train model
+def evaluate_models(X_train, y_train,X_test,y_test,models,param,search_strategy="grid",cv=3,
+                    n_jobs=-1,n_iter=20,metric="f1_score",scorer=None,return_candidates=False):
+    """
+    Tunes every model with the chosen search strategy and scores its refitted best estimator.
+    The entries of models are replaced by their fitted best estimators.
+    :param metric: Metric of ClassificationMetricArtifact used for the CV folds and the report.
+    :param scorer: ModelScorer over the "train" and "test" splits, pass one in to reuse its
+                   cached predictions after model selection.
+    :return: Dict of model name to test metric, and with return_candidates=True also a list
+             with one row per evaluated candidate (params, fit and score times, CV scores,
+             whether it is the model's best_estimator_).
+    """
+    try:
+        from networksecurity.utils.ml_utils.metric.classification_metric import ModelScorer, SKLEARN_SCORING
+
+        if scorer is None:
+            scorer = ModelScorer({"train": (X_train, y_train), "test": (X_test, y_test)})
+        report = {}
+        candidates = []
 
-            y_train_pred = model.predict(X_train)
+        for name, model in list(models.items()):
+            para=param[name]
 
-            y_test_pred = model.predict(X_test)
+            gs = build_search(model,para,search_strategy=search_strategy,cv=cv,n_jobs=n_jobs,n_iter=n_iter,
+                              scoring=SKLEARN_SCORING[metric])
+            gs.fit(X_train,y_train)
 
-            train_model_score = r2_score(y_train, y_train_pred)
+            # refit=True already trained the best parameters on the full training data
+            models[name] = gs.best_estimator_
+            logger.info(f"{name}: best params {gs.best_params_}, cv score {gs.best_score_:.4f}, "
+                        f"{len(gs.cv_results_['params'])} candidates evaluated")
 
-            test_model_score = r2_score(y_test, y_test_pred)
+            results = gs.cv_results_
+            for i, params in enumerate(results["params"]):
+                candidates.append({
+                    "model": name,
+                    "params": params,
+                    "iteration": int(results["iter"][i]) if "iter" in results else 0,
+                    "n_resources": int(results["n_resources"][i]) if "n_resources" in results else len(y_train),
+                    "mean_fit_time": float(results["mean_fit_time"][i]),
+                    "mean_score_time": float(results["mean_score_time"][i]),
+                    "mean_test_score": float(results["mean_test_score"][i]),
+                    "std_test_score": float(results["std_test_score"][i]),
+                    "rank_test_score": int(results["rank_test_score"][i]),
+                    "best": i == gs.best_index_,
+                })
 
-            report[list(models.keys())[i]] = test_model_score
+            scorer.add_model(name, gs.best_estimator_)
+            report[name] = scorer.metric(name, "test", metric)
 
+        if return_candidates:
+            return report, candidates
         return report
 
     except Exception as e:
@@ -0,0 +1,401 @@
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.main_utils.feature_matrix import INT8_MAX, INT8_MIN, MISSING_CODE
+
+# integer columns spanning more values than this are binned by quantiles instead
+MAX_INTEGER_VALUES = 64
+QUANTILE_BINS = 10
+# values binned per bincount call, bounds the memory of the flattened bin indices
+CHUNK_VALUES = 1 << 22
+# added to every bin's proportion so empty bins do not make PSI or Jensen-Shannon infinite
+EPSILON = 1e-4
+DRIFT_P_VALUE = 0.05
+DRIFT_PSI_THRESHOLD = 0.1
+
+
+def _feature_values(data, columns: Optional[List[str]] = None) -> np.ndarray:
+    """int8 matrix if every column is int8, otherwise float64 with NaN for missing values"""
+    if isinstance(data, pd.DataFrame):
+        frame = data[columns] if columns is not None else data
+        if all(dtype == np.int8 for dtype in frame.dtypes):
+            return frame.to_numpy()
+        return frame.to_numpy(dtype=np.float64)
+    values = np.asarray(data)
+    return values if values.dtype == np.int8 else values.astype(np.float64)
+
+
+def _proportions(counts: np.ndarray) -> np.ndarray:
+    totals = np.maximum(counts.sum(axis=-1, keepdims=True), 1)
+    smoothed = counts / totals + EPSILON
+    return smoothed / smoothed.sum(axis=-1, keepdims=True)
+
+
+def population_stability_index(reference_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """PSI of every row of two (n_columns, n_bins) count matrices"""
+    p, q = _proportions(reference_counts), _proportions(current_counts)
+    return np.sum((q - p) * np.log(q / p), axis=-1)
+
+
+def jensen_shannon_divergence(reference_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """Jensen-Shannon divergence (base 2, between 0 and 1) of every row of two count matrices"""
+    p, q = _proportions(reference_counts), _proportions(current_counts)
+    m = (p + q) / 2
+    return 0.5 * np.sum(p * np.log2(p / m), axis=-1) + 0.5 * np.sum(q * np.log2(q / m), axis=-1)
+
+
+def chi_square_test(reference_counts: np.ndarray, current_counts: np.ndarray):
+    """
+    Chi-square test of homogeneity of every row of two count matrices, bins empty in both are ignored.
+    :return: Tuple of (statistics, p_values).
+    """
+    from scipy.stats import chi2
+
+    observed = np.stack([reference_counts, current_counts], axis=1).astype(np.float64)
+    bin_totals = observed.sum(axis=1)
+    sample_totals = observed.sum(axis=2)
+    total = sample_totals.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = sample_totals[:, :, None] * bin_totals[:, None, :] / total[:, None, None]
+        terms = np.where(expected > 0, (observed - expected) ** 2 / expected, 0.0)
+    statistics = terms.sum(axis=(1, 2))
+    dof = (bin_totals > 0).sum(axis=1) - 1
+    p_values = np.where((dof > 0) & (sample_totals.min(axis=1) > 0), chi2.sf(statistics, np.maximum(dof, 1)), 1.0)
+    return statistics, p_values
+
+
+def drift_report(reference_counts: np.ndarray, current_counts: np.ndarray, columns: List[str],
+                 p_value_threshold: float = DRIFT_P_VALUE, psi_threshold: float = DRIFT_PSI_THRESHOLD) -> pd.DataFrame:
+    """
+    Drift statistics per column. A column drifted if the chi-square test rejects homogeneity and the
+    PSI reaches psi_threshold, so that on millions of rows tiny but significant shifts are not flagged.
+    """
+    statistics, p_values = chi_square_test(reference_counts, current_counts)
+    psi = population_stability_index(reference_counts, current_counts)
+    return pd.DataFrame({
+        "psi": psi,
+        "js_divergence": jensen_shannon_divergence(reference_counts, current_counts),
+        "chi_square": statistics,
+        "p_value": p_values,
+        "drifted": (p_values < p_value_threshold) & (psi >= psi_threshold),
+    }, index=pd.Index(columns, name="column"))
+
+
+# every int8 value, in the order of its byte (uint8) representation
+BYTE_VALUES = np.arange(256, dtype=np.uint8).view(np.int8)
+BYTE_OF_MISSING_CODE = int(np.array(MISSING_CODE).view(np.uint8))
+# columns spanning fewer values are counted value by value, see byte_histogram
+SMALL_VALUE_RANGE = 16
+SMALL_BATCH_ROWS = 1024
+
+
+def _bincount_rows(codes_of, values: np.ndarray, n_bins: int) -> np.ndarray:
+    """
+    (n_columns, n_bins) counts of the bin codes of values, one np.bincount of the flattened
+    (column * n_bins + code) indices per chunk of rows.
+    """
+    n_columns = values.shape[1]
+    offsets = np.arange(n_columns, dtype=np.int32) * n_bins
+    counts = np.zeros(n_columns * n_bins, dtype=np.int64)
+    chunk_rows = max(1, CHUNK_VALUES // max(n_columns, 1))
+    for start in range(0, len(values), chunk_rows):
+        codes = codes_of(values[start:start + chunk_rows]) + offsets
+        counts += np.bincount(codes.ravel(), minlength=len(counts))
+    return counts.reshape(n_columns, n_bins)
+
+
+def byte_histogram(values: np.ndarray) -> np.ndarray:
+    """
+    (n_columns, 256) counts of every int8 value per column, indexed by the value's byte.
+    Columns spanning few values (the usual case) are counted one value at a time with SIMD
+    comparisons over the contiguous column, which is several times faster than np.bincount.
+    Small batches (e.g. online requests) take a single flattened bincount instead.
+    """
+    if len(values) < SMALL_BATCH_ROWS:
+        return _bincount_rows(lambda chunk: chunk.view(np.uint8).astype(np.int32), values, 256)
+    columns = np.asfortranarray(values)
+    counts = np.zeros((columns.shape[1], 256), dtype=np.int64)
+    if not len(columns):
+        return counts
+    lows, highs = columns.min(axis=0).astype(int), columns.max(axis=0).astype(int)
+    for j in range(columns.shape[1]):
+        column, low = columns[:, j], lows[j]
+        if low == MISSING_CODE:
+            n_missing = np.count_nonzero(column == MISSING_CODE)
+            counts[j, BYTE_OF_MISSING_CODE] = n_missing
+            if n_missing == len(column):
+                continue
+            low = int(column[column != MISSING_CODE].min())
+        if highs[j] - low < SMALL_VALUE_RANGE:
+            for value in range(low, highs[j] + 1):
+                counts[j, value & 0xFF] = np.count_nonzero(column == value)
+        else:
+            counts[j] = np.bincount(column.view(np.uint8), minlength=256)
+    return counts
+
+
+class DriftProfile:
+    """
+    Histograms of every feature column of a reference sample, computed in one vectorized pass.
+
+    Columns of small integer codes (the phishing features are -1/0/1) get one bin per value, other
+    numeric columns are binned by the reference quantiles. Every column also has an "other" bin for
+    values the reference never had and a "missing" bin. Values are turned into flat bin indices
+    (column * n_bins + bin) and counted with a single np.bincount per chunk of rows. The profile can
+    be stored as JSON and compared against the same histogram of new data, e.g. prediction traffic.
+    """
+
+    def __init__(self, columns: List[str], low: int, n_values: int, edges: Dict[str, List[float]],
+                 counts: Optional[np.ndarray] = None, n_rows: int = 0):
+        self.columns = list(columns)
+        self.low = int(low)
+        self.n_values = int(n_values)
+        self.edges = {column: np.asarray(column_edges, dtype=np.float64) for column, column_edges in edges.items()}
+        self.n_bins = self.n_values + 2
+        self.counts = counts if counts is not None else np.zeros((len(self.columns), self.n_bins), dtype=np.int64)
+        self.n_rows = int(n_rows)
+
+    @classmethod
+    def from_frame(cls, data, columns: Optional[List[str]] = None,
+                   quantile_bins: int = QUANTILE_BINS) -> "DriftProfile":
+        try:
+            if columns is None:
+                columns = [str(column) for column in data.columns] if isinstance(data, pd.DataFrame) \
+                    else [str(j) for j in range(np.shape(data)[1])]
+            values = _feature_values(data, list(columns))
+            byte_counts = None
+            if values.dtype == np.int8:
+                # value ranges come from the byte histogram, so the data is read once
+                byte_counts = byte_histogram(values)
+                seen = (byte_counts > 0) & (BYTE_VALUES != MISSING_CODE)
+                byte_values = BYTE_VALUES.astype(np.int64)
+                lows = np.where(seen.any(axis=1), np.where(seen, byte_values, INT8_MAX).min(axis=1), 0)
+                highs = np.where(seen.any(axis=1), np.where(seen, byte_values, INT8_MIN).max(axis=1), 0)
+                integer = np.ones(len(columns), dtype=bool)
+            else:
+                present = ~np.isnan(values)
+                as_float = np.where(present, values, 0.0)
+                integer = np.all((as_float == np.round(as_float)) & (as_float >= INT8_MIN) & (as_float <= INT8_MAX),
+                                 axis=0)
+                lows = np.where(present, as_float, np.inf).min(axis=0, initial=np.inf)
+                highs = np.where(present, as_float, -np.inf).max(axis=0, initial=-np.inf)
+                lows, highs = np.where(np.isfinite(lows), lows, 0), np.where(np.isfinite(highs), highs, 0)
+            # wide integer columns are binned by quantiles like continuous ones
+            integer &= highs - lows + 1 <= MAX_INTEGER_VALUES
+
+            low, n_values = 0, 0
+            if integer.any():
+                low = int(lows[integer].min())
+                n_values = int(highs[integer].max()) - low + 1
+
+            edges = {}
+            for j in np.flatnonzero(~integer):
+                column_values = values[:, j].astype(np.float64)
+                column_values = column_values[~np.isnan(column_values)]
+                if values.dtype == np.int8:
+                    column_values = column_values[column_values != MISSING_CODE]
+                quantiles = np.quantile(column_values, np.linspace(0, 1, quantile_bins + 1)[1:-1]) \
+                    if len(column_values) else []
+                edges[columns[j]] = np.unique(quantiles)
+                n_values = max(n_values, len(edges[columns[j]]) + 1)
+
+            profile = cls(columns, low, max(n_values, 1), edges)
+            profile.counts = profile.counts_from_bytes(byte_counts) if byte_counts is not None \
+                else profile.histogram(values)
+            profile.n_rows = len(values)
+            return profile
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def bin_codes(self, values: np.ndarray) -> np.ndarray:
+        """Bin index of every value of a (n_rows, n_columns) chunk"""
+        other, missing_bin = self.n_values, self.n_values + 1
+        if values.dtype == np.int8:
+            missing = values == MISSING_CODE
+            codes = values.astype(np.int32) - self.low
+        else:
+            missing = np.isnan(values)
+            filled = np.where(missing, self.low, values) - self.low
+            codes = np.clip(filled, -1, other).astype(np.int32)
+            codes[filled != np.round(filled)] = other
+        codes[(codes < 0) | (codes >= self.n_values)] = other
+        for column, column_edges in self.edges.items():
+            j = self.columns.index(column)
+            codes[:, j] = np.searchsorted(column_edges, values[:, j].astype(np.float64), side="right")
+        codes[missing] = missing_bin
+        return codes
+
+    def counts_from_bytes(self, byte_counts: np.ndarray) -> np.ndarray:
+        """Folds a (n_columns, 256) histogram of int8 values into this profile's bins"""
+        bins = self.bin_codes(np.tile(BYTE_VALUES, (len(self.columns), 1)).T).T
+        counts = np.zeros((len(self.columns), self.n_bins), dtype=np.int64)
+        np.add.at(counts, (np.arange(len(self.columns))[:, None], bins), byte_counts)
+        return counts
+
+    def histogram(self, data) -> np.ndarray:
+        """(n_columns, n_bins) counts of data binned like this profile"""
+        try:
+            values = _feature_values(data, self.columns if isinstance(data, pd.DataFrame) else None)
+            if values.dtype == np.int8:
+                return self.counts_from_bytes(byte_histogram(values))
+            return _bincount_rows(self.bin_codes, values, self.n_bins)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def compare(self, data, p_value_threshold: float = DRIFT_P_VALUE,
+                psi_threshold: float = DRIFT_PSI_THRESHOLD) -> pd.DataFrame:
+        """Drift report of data against this profile"""
+        return self.compare_counts(self.histogram(data), p_value_threshold, psi_threshold)
+
+    def compare_counts(self, current_counts: np.ndarray, p_value_threshold: float = DRIFT_P_VALUE,
+                       psi_threshold: float = DRIFT_PSI_THRESHOLD) -> pd.DataFrame:
+        """Drift report of a histogram computed with histogram, e.g. accumulated over prediction batches"""
+        return drift_report(self.counts, current_counts, self.columns, p_value_threshold, psi_threshold)
+
+    def update(self, data):
+        """Adds the rows of data to the reference histograms, binned like the existing ones"""
+        values = _feature_values(data, self.columns if isinstance(data, pd.DataFrame) else None)
+        self.counts = self.counts + self.histogram(values)
+        self.n_rows += len(values)
+
+    @property
+    def missing_rates(self) -> Dict[str, float]:
+        return {column: float(missing) / max(self.n_rows, 1) for column, missing in zip(self.columns, self.counts[:, -1])}
+
+    def to_dict(self) -> dict:
+        return {
+            "columns": self.columns,
+            "low": self.low,
+            "n_values": self.n_values,
+            "edges": {column: column_edges.tolist() for column, column_edges in self.edges.items()},
+            "counts": self.counts.tolist(),
+            "n_rows": self.n_rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DriftProfile":
+        return cls(data["columns"], data["low"], data["n_values"], data["edges"],
+                   np.asarray(data["counts"], dtype=np.int64), data["n_rows"])
+
+    def save(self, file_path: str):
+        try:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            with open(file_path, "w") as file:
+                json.dump(self.to_dict(), file)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @classmethod
+    def load(cls, file_path: str) -> "DriftProfile":
+        try:
+            with open(file_path) as file:
+                return cls.from_dict(json.load(file))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+class ReferenceProfile:
+    """
+    Compact summary of the data a model was trained on, published next to the model.
+
+    Holds the feature histograms (a DriftProfile, so value counts and missing rates) and the
+    label counts. New batches or a window of live traffic are compared against it in time
+    proportional to the new rows, the training data is never read again. The features are
+    small integer codes, so exact counts are as small as any sketch would be.
+    """
+
+    def __init__(self, features: DriftProfile, labels: List, label_counts: np.ndarray,
+                 created_at: Optional[str] = None):
+        self.features = features
+        self.labels = list(labels)
+        # one count per label, the last one counts labels that are not in labels
+        self.label_counts = np.asarray(label_counts, dtype=np.int64)
+        self.created_at = created_at or datetime.now().isoformat()
+
+    @classmethod
+    def from_training_data(cls, features, labels, columns: Optional[List[str]] = None) -> "ReferenceProfile":
+        try:
+            known_labels = sorted(np.unique(np.asarray(labels)).tolist())
+            profile = cls(DriftProfile.from_frame(features, columns), known_labels, np.zeros(len(known_labels) + 1))
+            profile.label_counts = profile.label_histogram(labels)
+            return profile
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def label_histogram(self, labels) -> np.ndarray:
+        labels = np.asarray(labels)
+        codes = np.full(len(labels), len(self.labels), dtype=np.int64)
+        for code, label in enumerate(self.labels):
+            codes[labels == label] = code
+        return np.bincount(codes, minlength=len(self.labels) + 1)
+
+    def update(self, features, labels):
+        """Adds a batch of training rows, e.g. the records of an incremental run"""
+        try:
+            self.features.update(features)
+            self.label_counts = self.label_counts + self.label_histogram(labels)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @property
+    def label_prior(self) -> Dict[str, float]:
+        total = max(int(self.label_counts.sum()), 1)
+        return {str(label): float(count) / total for label, count in zip(self.labels, self.label_counts)}
+
+    def compare_counts(self, feature_counts: np.ndarray, label_counts: Optional[np.ndarray] = None,
+                       p_value_threshold: float = DRIFT_P_VALUE, psi_threshold: float = DRIFT_PSI_THRESHOLD) -> dict:
+        """
+        :return: Dict with the per column drift report of the features and, if label_counts
+                 are given, a one row report of the labels.
+        """
+        report = {"features": self.features.compare_counts(feature_counts, p_value_threshold, psi_threshold)}
+        if label_counts is not None:
+            report["labels"] = drift_report(self.label_counts[None, :], np.asarray(label_counts)[None, :], ["label"],
+                                            p_value_threshold, psi_threshold)
+        return report
+
+    def compare(self, features, labels=None, p_value_threshold: float = DRIFT_P_VALUE,
+                psi_threshold: float = DRIFT_PSI_THRESHOLD) -> dict:
+        try:
+            label_counts = self.label_histogram(labels) if labels is not None else None
+            return self.compare_counts(self.features.histogram(features), label_counts, p_value_threshold, psi_threshold)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def to_dict(self) -> dict:
+        return {
+            "created_at": self.created_at,
+            "features": self.features.to_dict(),
+            "labels": self.labels,
+            "label_counts": self.label_counts.tolist(),
+            # derived, for people reading the file
+            "label_prior": self.label_prior,
+            "missing_rates": self.features.missing_rates,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ReferenceProfile":
+        return cls(DriftProfile.from_dict(data["features"]), data["labels"], data["label_counts"], data.get("created_at"))
+
+    def save(self, file_path: str):
+        try:
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            with open(file_path, "w") as file:
+                json.dump(self.to_dict(), file)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReferenceProfile":
+        try:
+            with open(file_path) as file:
+                return cls.from_dict(json.load(file))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
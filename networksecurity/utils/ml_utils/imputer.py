@@ -0,0 +1,196 @@
+import sys
+
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.main_utils.feature_matrix import MISSING_CODE, is_int8_compatible
+
+IMPUTER_STRATEGIES = ("knn", "mode")
+# distances computed per block of rows to impute, bounds the (rows, donors) distance matrix
+CHUNK_DISTANCES = 1 << 22
+
+
+class FastImputer(TransformerMixin, BaseEstimator):
+    """
+    Nearest-neighbour imputer following KNNImputer, whose transform cost does not grow with the training set.
+
+    Rows without missing values are passed through untouched. For the others the neighbours are
+    searched in a donor index built at fit time: the distinct training rows, missing values
+    included, with their multiplicities, at most max_donors of them (the most frequent ones).
+    Ternary features have few distinct rows, 5785 of the 11055 phishing rows, and the number stops
+    growing with the data. As in KNNImputer a missing value is the (uniform or distance weighted)
+    mean of the n_neighbors nearest training rows observed in its column, counting duplicates, by
+    the nan-euclidean distance over the columns observed in both rows:
+
+        d^2 = n_features / n_common * sum over the common columns of (q - x)^2
+
+    computed for all rows at once with matrix products, whatever their missing patterns are. A
+    value without any such neighbour gets the training mean of its column.
+
+    Rows at the same distance are the normal case on ternary data. Ties are broken towards the
+    donor whose values sort first (missing lowest), so results are deterministic; KNNImputer breaks
+    them in argpartition order instead, and the two differ whenever the n_neighbors-th nearest
+    row is tied. The "mode" strategy fills in the most frequent training value of each column instead.
+    """
+
+    def __init__(self, n_neighbors: int = 3, weights: str = "uniform", strategy: str = "knn",
+                 missing_values=np.nan, max_donors: int = 16_384):
+        self.n_neighbors = n_neighbors
+        self.weights = weights
+        self.strategy = strategy
+        self.missing_values = missing_values
+        self.max_donors = max_donors
+
+    def fit(self, X, y=None):
+        try:
+            if self.strategy not in IMPUTER_STRATEGIES:
+                raise ValueError(f"Unknown imputer strategy {self.strategy}, expected one of {IMPUTER_STRATEGIES}")
+            if self.weights not in ("uniform", "distance"):
+                raise ValueError(f"Unknown weights {self.weights}")
+            if not (isinstance(self.missing_values, float) and np.isnan(self.missing_values)):
+                raise ValueError("FastImputer only imputes NaN")
+            X = np.asarray(X, dtype=np.float64)
+            missing = np.isnan(X)
+            self.n_features_in_ = X.shape[1]
+            self.statistics_ = np.array([self._mode(X[~missing[:, j], j]) for j in range(X.shape[1])])
+            self.column_means_ = np.array([X[~missing[:, j], j].mean() if (~missing[:, j]).any() else 0.0
+                                           for j in range(X.shape[1])])
+
+            rows = X[~missing.all(axis=1)]
+            rows_missing = np.isnan(rows)
+            # ternary rows are indexed as int8 codes, a quarter of the memory of float64 rows
+            int8_codes = is_int8_compatible(rows[~rows_missing])
+            # missing values sort lowest
+            keys = np.where(rows_missing, MISSING_CODE if int8_codes else -np.inf, rows)
+            donors, counts = np.unique(keys.astype(np.int8) if int8_codes else keys, axis=0, return_counts=True)
+            if len(donors) > self.max_donors:
+                keep = np.sort(np.argsort(-counts, kind="stable")[:self.max_donors])
+                donors, counts = donors[keep], counts[keep]
+            if not int8_codes:
+                donors[np.isneginf(donors)] = np.nan
+            self.donors_, self.donor_counts_ = donors, counts
+            self._donor_values = None
+            return self
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @staticmethod
+    def _mode(values: np.ndarray) -> float:
+        if not len(values):
+            return 0.0
+        unique, counts = np.unique(values, return_counts=True)
+        return float(unique[counts.argmax()])
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_donor_values", None)
+        return state
+
+    def _donor_matrices(self):
+        """
+        Donors as float64 with 0 where missing, squared, their observed mask and the columns every
+        donor has, computed once per process
+        """
+        if getattr(self, "_donor_values", None) is None:
+            donors = self.donors_.astype(np.float64)
+            missing = self.donors_ == MISSING_CODE if self.donors_.dtype == np.int8 else np.isnan(donors)
+            donors[missing] = 0.0
+            self._donor_values = (donors, donors ** 2, (~missing).astype(np.float64), ~missing.any(axis=0))
+        return self._donor_values
+
+    def _distances(self, rows: np.ndarray, missing: np.ndarray) -> np.ndarray:
+        """Squared nan-euclidean distances of rows (NaN where missing) to the donors, inf without common columns"""
+        donors, donors_squared, donors_observed, complete_columns = self._donor_matrices()
+        observed = (~missing).astype(np.float64)
+        filled = np.where(missing, 0.0, rows)
+        if complete_columns.all():
+            # no missing donor values, the common columns are the observed columns of each row
+            squared = np.sum(filled ** 2, axis=1, keepdims=True) - 2.0 * filled @ donors.T + observed @ donors_squared.T
+            n_common = observed.sum(axis=1, keepdims=True)
+        else:
+            squared = (filled ** 2) @ donors_observed.T - 2.0 * filled @ donors.T + observed @ donors_squared.T
+            n_common = observed @ donors_observed.T
+        np.maximum(squared, 0.0, out=squared)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # multiplied before dividing, equal distances of different missing patterns stay equal
+            distances = squared * self.n_features_in_ / n_common
+        distances[np.broadcast_to(n_common == 0, distances.shape)] = np.inf
+        return distances
+
+    def _nearest(self, distances: np.ndarray):
+        """
+        The n_neighbors nearest donors of each row, counting duplicates, and their weights.
+        Donors at an infinite distance are never used. distances is overwritten.
+        :return: Tuple of (donor indices, weights summing to 1 per row, whether a row found any donor).
+        """
+        counts = self.donor_counts_
+        n_candidates = min(self.n_neighbors, len(counts))
+        # the n_candidates nearest distinct donors, nearest first; argmin takes the first of equal
+        # distances, so ties go to the donor that sorts first
+        nearest = np.empty((len(distances), n_candidates), dtype=np.intp)
+        nearest_distances = np.empty((len(distances), n_candidates))
+        row_index = np.arange(len(distances))
+        for k in range(n_candidates):
+            nearest[:, k] = np.argmin(distances, axis=1)
+            nearest_distances[:, k] = distances[row_index, nearest[:, k]]
+            distances[row_index, nearest[:, k]] = np.inf
+        nearest_distances = np.sqrt(nearest_distances)
+
+        # duplicates count as separate neighbours until n_neighbors are taken
+        multiplicity = np.where(np.isfinite(nearest_distances), counts[nearest], 0)
+        taken_before = np.cumsum(multiplicity, axis=1) - multiplicity
+        weights = np.clip(self.n_neighbors - taken_before, 0, multiplicity).astype(np.float64)
+        if self.weights == "distance":
+            exact = (nearest_distances == 0) & (weights > 0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                # exact matches take all the weight, as in KNNImputer
+                weights = np.where(exact.any(axis=1, keepdims=True), weights * exact, weights / nearest_distances)
+        total = weights.sum(axis=1, keepdims=True)
+        found = total[:, 0] > 0
+        weights = np.divide(weights, total, out=np.zeros_like(weights), where=total > 0)
+        return nearest, weights, found
+
+    def _impute_knn(self, rows: np.ndarray, missing: np.ndarray) -> np.ndarray:
+        """Imputes rows (NaN where missing) in place from their nearest donors observed in each column"""
+        donors, _, donors_observed, complete_columns = self._donor_matrices()
+        # models pickled before column means were kept
+        column_means = getattr(self, "column_means_", self.statistics_)
+        distances = self._distances(rows, missing)
+
+        # every donor has these columns, their neighbours are the same and searched once per row
+        shared = missing & complete_columns
+        receivers = np.flatnonzero(shared.any(axis=1))
+        if len(receivers):
+            nearest, weights, found = self._nearest(distances[receivers])
+            imputed = np.einsum("rk,rkc->rc", weights, donors[nearest])
+            imputed[~found] = column_means
+            rows[receivers] = np.where(shared[receivers], imputed, rows[receivers])
+
+        for j in np.flatnonzero((missing & ~shared).any(axis=0)):
+            receivers = np.flatnonzero(missing[:, j])
+            column_distances = np.where(donors_observed[:, j] > 0, distances[receivers], np.inf)
+            nearest, weights, found = self._nearest(column_distances)
+            rows[receivers, j] = np.where(found, np.einsum("rk,rk->r", weights, donors[nearest, j]), column_means[j])
+        return rows
+
+    def transform(self, X):
+        try:
+            X = np.array(X, dtype=np.float64)
+            if X.shape[1] != self.n_features_in_:
+                raise ValueError(f"X has {X.shape[1]} features, the imputer was fitted with {self.n_features_in_}")
+            missing = np.isnan(X)
+            rows_with_missing = np.flatnonzero(missing.any(axis=1))
+            if not len(rows_with_missing):
+                return X
+            if self.strategy == "mode":
+                X[missing] = np.broadcast_to(self.statistics_, X.shape)[missing]
+                return X
+
+            chunk_rows = max(1, CHUNK_DISTANCES // max(len(self.donors_), 1))
+            for start in range(0, len(rows_with_missing), chunk_rows):
+                rows = rows_with_missing[start:start + chunk_rows]
+                X[rows] = self._impute_knn(X[rows], missing[rows])
+            return X
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
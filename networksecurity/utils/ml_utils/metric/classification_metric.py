@@ -1,19 +1,180 @@
 from networksecurity.entity.artifact_entity import ClassificationMetricArtifact
 from networksecurity.exception.exceptions import NetworkSecurityException
-from sklearn.metrics import f1_score,precision_score,recall_score
+from sklearn.metrics import roc_auc_score
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import sys
 
-def get_classification_score(y_true,y_pred)->ClassificationMetricArtifact:
+POSITIVE_LABEL = 1
+LOG_LOSS_EPS = 1e-15
+
+# metrics where a lower value is better, everything else is ranked highest first
+LOWER_IS_BETTER = {"log_loss"}
+
+# name of the same metric for the scoring parameter of sklearn searches
+SKLEARN_SCORING = {
+    "f1_score": "f1",
+    "precision_score": "precision",
+    "recall_score": "recall",
+    "accuracy_score": "accuracy",
+    "roc_auc_score": "roc_auc",
+    "log_loss": "neg_log_loss",
+}
+
+
+def _safe_divide(numerator: float, denominator: float) -> float:
+    return float(numerator) / float(denominator) if denominator else 0.0
+
+
+def get_classification_score(y_true,y_pred,y_proba=None,pos_label=POSITIVE_LABEL)->ClassificationMetricArtifact:
+    """
+    Computes all metrics from one confusion-matrix pass over the labels.
+    :param y_proba: Optional probability of the positive class, adds ROC-AUC and log-loss.
+    """
     try:
-            
-        model_f1_score = f1_score(y_true, y_pred)
-        model_recall_score = recall_score(y_true, y_pred)
-        model_precision_score=precision_score(y_true,y_pred)
+        is_true = np.asarray(y_true) == pos_label
+        is_pred = np.asarray(y_pred) == pos_label
+        # cells: 0 = true negative, 1 = false positive, 2 = false negative, 3 = true positive
+        tn, fp, fn, tp = np.bincount(2 * is_true + is_pred, minlength=4)
+
+        model_precision_score = _safe_divide(tp, tp + fp)
+        model_recall_score = _safe_divide(tp, tp + fn)
+        model_f1_score = _safe_divide(2 * tp, 2 * tp + fp + fn)
+        model_accuracy_score = _safe_divide(tp + tn, len(is_true))
+
+        model_roc_auc_score = None
+        model_log_loss = None
+        if y_proba is not None:
+            y_proba = np.asarray(y_proba, dtype=np.float64)
+            if 0 < tp + fn < len(is_true):
+                model_roc_auc_score = float(roc_auc_score(is_true, y_proba))
+            p = np.clip(y_proba, LOG_LOSS_EPS, 1 - LOG_LOSS_EPS)
+            model_log_loss = float(-np.mean(np.where(is_true, np.log(p), np.log1p(-p))))
 
         classification_metric =  ClassificationMetricArtifact( 
                     f1_score=model_f1_score, 
                     precision_score=model_precision_score,
-                    recall_score=model_recall_score)
+                    recall_score=model_recall_score,
+                    accuracy_score=model_accuracy_score,
+                    roc_auc_score=model_roc_auc_score,
+                    log_loss=model_log_loss)
         return classification_metric
     except Exception as e:
-        raise NetworkSecurityException(e,sys)
\ No newline at end of file
+        raise NetworkSecurityException(e,sys)
+
+
+def choose_threshold(y_true, y_score, metric: str = "precision", target: float = 0.95,
+                     pos_label=POSITIVE_LABEL) -> Optional[dict]:
+    """
+    Operating threshold on the positive-class score (positive when score >= threshold) meeting
+    a precision or recall target, from one sort of the scores.
+    With metric="precision" the threshold with the highest recall whose precision reaches the
+    target is chosen, with metric="recall" the one with the highest precision whose recall does.
+    :return: Dict with threshold, metric, target and the precision and recall reached there,
+             None if no threshold reaches the target.
+    """
+    try:
+        if metric not in ("precision", "recall"):
+            raise ValueError(f"Threshold metric must be precision or recall, got {metric}")
+        y_score = np.asarray(y_score, dtype=np.float64)
+        order = np.argsort(-y_score, kind="stable")
+        scores = y_score[order]
+        is_true = np.asarray(y_true)[order] == pos_label
+        if not is_true.any():
+            return None
+        tp = np.cumsum(is_true)
+        fp = np.cumsum(~is_true)
+        # one candidate per distinct score, counting every row scored at least that high
+        last = np.r_[np.flatnonzero(np.diff(scores) != 0), len(scores) - 1]
+        thresholds, tp, fp = scores[last], tp[last], fp[last]
+        precision = tp / (tp + fp)
+        recall = tp / tp[-1]
+
+        reached = (precision if metric == "precision" else recall) >= target
+        if not reached.any():
+            return None
+        candidates = np.flatnonzero(reached)
+        other = recall if metric == "precision" else precision
+        # best other metric, then the higher threshold (fewer positives) among ties
+        best = candidates[np.lexsort((thresholds[candidates], other[candidates]))[-1]]
+        return {
+            "threshold": float(thresholds[best]),
+            "metric": metric,
+            "target": float(target),
+            "precision": float(precision[best]),
+            "recall": float(recall[best]),
+        }
+    except Exception as e:
+        raise NetworkSecurityException(e,sys)
+
+
+def precision_recall_at(y_true, y_score, threshold: float, pos_label=POSITIVE_LABEL) -> Tuple[float, float]:
+    """:return: Tuple of (precision, recall) when rows scored at least threshold are positive."""
+    try:
+        predicted = np.asarray(y_score, dtype=np.float64) >= threshold
+        is_true = np.asarray(y_true) == pos_label
+        true_positives = np.count_nonzero(predicted & is_true)
+        return (_safe_divide(true_positives, np.count_nonzero(predicted)),
+                _safe_divide(true_positives, np.count_nonzero(is_true)))
+    except Exception as e:
+        raise NetworkSecurityException(e,sys)
+
+
+class ModelScorer:
+    """
+    Scores fitted candidate models on named data splits.
+
+    Every candidate predicts each split once. Predictions, positive-class probabilities and
+    metrics are cached by (candidate, split), so ranking the candidates and reporting the
+    metrics of the winner do not run inference again.
+    """
+
+    def __init__(self, splits: Dict[str, Tuple[np.ndarray, np.ndarray]], pos_label=POSITIVE_LABEL):
+        self.splits = splits
+        self.pos_label = pos_label
+        self.models = {}
+        self._outputs = {}
+        self._metrics = {}
+
+    def add_model(self, name: str, model):
+        """Registers a fitted candidate, replacing the cached outputs of a previous one with that name."""
+        self.models[name] = model
+        for key in [key for key in self._outputs if key[0] == name]:
+            del self._outputs[key]
+            self._metrics.pop(key, None)
+
+    def outputs(self, name: str, split: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """:return: Tuple of (predicted labels, positive-class probability or None)."""
+        key = (name, split)
+        if key not in self._outputs:
+            model = self.models[name]
+            x = self.splits[split][0]
+            if hasattr(model, "predict_proba"):
+                proba = model.predict_proba(x)
+                classes = np.asarray(model.classes_)
+                y_pred = classes[np.argmax(proba, axis=1)]
+                positive = np.flatnonzero(classes == self.pos_label)
+                y_proba = proba[:, positive[0]] if len(positive) else np.zeros(len(x))
+            else:
+                y_pred, y_proba = model.predict(x), None
+            self._outputs[key] = (y_pred, y_proba)
+        return self._outputs[key]
+
+    def score(self, name: str, split: str) -> ClassificationMetricArtifact:
+        key = (name, split)
+        if key not in self._metrics:
+            y_pred, y_proba = self.outputs(name, split)
+            self._metrics[key] = get_classification_score(self.splits[split][1], y_pred, y_proba,
+                                                          pos_label=self.pos_label)
+        return self._metrics[key]
+
+    def metric(self, name: str, split: str, metric: str) -> float:
+        value = getattr(self.score(name, split), metric)
+        if value is None:
+            return np.inf if metric in LOWER_IS_BETTER else -np.inf
+        return value
+
+    def rank(self, metric: str = "f1_score", split: str = "test") -> List[str]:
+        """Candidate names, best first. Ties keep the registration order."""
+        reverse = metric not in LOWER_IS_BETTER
+        return sorted(self.models, key=lambda name: self.metric(name, split, metric), reverse=reverse)
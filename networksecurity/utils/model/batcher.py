@@ -0,0 +1,169 @@
+import asyncio
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from networksecurity.constant.training_pipeline import (
+    MICRO_BATCH_MAX_QUEUE_DEPTH,
+    MICRO_BATCH_MAX_SIZE,
+    MICRO_BATCH_MAX_WAIT_MS,
+)
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+
+
+class _PendingRequest:
+    __slots__ = ("x", "future")
+
+    def __init__(self, x: np.ndarray, future: asyncio.Future):
+        self.x = x
+        self.future = future
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent scoring requests into one model call.
+
+    Requests are queued on the event loop. A single flusher collects them until either
+    max_batch_size rows are waiting or max_wait_ms passed since the first one arrived,
+    runs predict_fn once on the stacked rows in a worker thread and hands every caller
+    its own slice of the outputs. While a batch is being scored new requests keep
+    queueing, so batches grow with load.
+
+    predict_fn takes a 2-D array and returns a tuple of arrays aligned on its rows.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], Tuple[np.ndarray, ...]],
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE,
+                 max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS,
+                 max_queue_depth: int = MICRO_BATCH_MAX_QUEUE_DEPTH,
+                 executor: Optional[Executor] = None):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_depth = max_queue_depth
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batch")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.records = 0
+        self.batches = 0
+        self.rejected = 0
+        self.last_batch_size = 0
+        self.max_observed_batch_size = 0
+        self.busy_seconds = 0.0
+
+    async def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+    async def submit(self, x: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Queues the rows of x for the next batch and waits for their outputs.
+        :param x: 2-D feature array.
+        :return: Tuple of output arrays for the rows of x.
+        """
+        try:
+            if self._queue is None:
+                raise RuntimeError("MicroBatcher is not started")
+            future = asyncio.get_running_loop().create_future()
+            self._queue.put_nowait(_PendingRequest(x, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+        self.requests += 1
+        return await future
+
+    async def _collect(self, pending: list):
+        """Appends queued requests to pending until the batch is full or max_wait_ms passed"""
+        loop = asyncio.get_running_loop()
+        pending.append(await self._queue.get())
+        rows = len(pending[0].x)
+        deadline = loop.time() + self.max_wait_ms / 1000.0
+        while rows < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            pending.append(item)
+            rows += len(item.x)
+
+    async def _flush(self, pending: list):
+        loop = asyncio.get_running_loop()
+        pending = [request for request in pending if not request.future.done()]
+        if not pending:
+            return
+        x = pending[0].x if len(pending) == 1 else np.concatenate([request.x for request in pending])
+
+        started = time.perf_counter()
+        try:
+            outputs = await loop.run_in_executor(self.executor, self.predict_fn, x)
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+        self.batches += 1
+        self.records += len(x)
+        self.last_batch_size = len(x)
+        self.max_observed_batch_size = max(self.max_observed_batch_size, len(x))
+
+        offset = 0
+        results = []
+        for request in pending:
+            n_rows = len(request.x)
+            results.append(tuple(output[offset:offset + n_rows] for output in outputs))
+            offset += n_rows
+        for request, result in zip(pending, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def _run(self):
+        while True:
+            pending = []
+            try:
+                await self._collect(pending)
+                await self._flush(pending)
+            except Exception as e:
+                # only this batch fails, e.g. rows of different widths; the flusher keeps serving
+                logging.error(f"Micro-batch of {len(pending)} requests failed: {e}")
+                for request in pending:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def metrics(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "requests": self.requests,
+            "records": self.records,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "last_batch_size": self.last_batch_size,
+            "max_observed_batch_size": self.max_observed_batch_size,
+            "mean_batch_size": self.records / self.batches if self.batches else 0.0,
+            "busy_seconds": self.busy_seconds,
+        }
@@ -0,0 +1,100 @@
+import sys
+import threading
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from networksecurity.constant.training_pipeline import SERVING_DRIFT_MIN_ROWS, SERVING_DRIFT_WINDOW_ROWS
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.ml_utils.drift import ReferenceProfile
+
+
+class DriftMonitor:
+    """
+    Compares a rolling window of scored traffic with the reference profile of the serving model.
+
+    Every scored batch is reduced to its feature histogram and predicted label counts, which are
+    added to running window totals. The oldest batches are subtracted once the window holds more
+    than window_rows rows, so observing costs time proportional to the batch and a report only
+    compares the totals with the profile. The window restarts when the model's profile changes.
+    Windows of fewer than min_rows rows are not compared, a few rows differ from any profile.
+    """
+
+    def __init__(self, window_rows: int = SERVING_DRIFT_WINDOW_ROWS, min_rows: int = SERVING_DRIFT_MIN_ROWS):
+        self.window_rows = window_rows
+        self.min_rows = min_rows
+        self.profile: Optional[ReferenceProfile] = None
+        self._batches = deque()
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, profile: Optional[ReferenceProfile]):
+        self.profile = profile
+        self._batches.clear()
+        self.n_rows = 0
+        self.feature_counts = np.zeros_like(profile.features.counts) if profile is not None else None
+        self.label_counts = np.zeros_like(profile.label_counts) if profile is not None else None
+
+    def observe(self, profile: Optional[ReferenceProfile], x: np.ndarray, labels: np.ndarray):
+        """
+        :param profile: Reference profile of the model that scored the batch, None skips the batch.
+        :param x: int8 feature codes in schema column order.
+        :param labels: Predicted labels.
+        """
+        try:
+            if profile is None:
+                return
+            feature_counts = profile.features.histogram(x)
+            label_counts = profile.label_histogram(labels)
+            with self._lock:
+                if profile is not self.profile:
+                    self._reset(profile)
+                self._batches.append((len(x), feature_counts, label_counts))
+                self.n_rows += len(x)
+                self.feature_counts += feature_counts
+                self.label_counts += label_counts
+                while len(self._batches) > 1 and self.n_rows - self._batches[0][0] >= self.window_rows:
+                    n_rows, old_feature_counts, old_label_counts = self._batches.popleft()
+                    self.n_rows -= n_rows
+                    self.feature_counts -= old_feature_counts
+                    self.label_counts -= old_label_counts
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def report(self) -> Optional[dict]:
+        """
+        Drift of the current window, None if no batch scored by a model with a profile was observed.
+        Below min_rows rows the status is "insufficient_data" and no column is flagged.
+        """
+        with self._lock:
+            if self.profile is None:
+                return None
+            profile, n_rows = self.profile, self.n_rows
+            feature_counts, label_counts = self.feature_counts.copy(), self.label_counts.copy()
+        if n_rows < self.min_rows:
+            return {
+                "status": "insufficient_data",
+                "window_rows": n_rows,
+                "min_rows": self.min_rows,
+                "reference_rows": profile.features.n_rows,
+                "reference_created_at": profile.created_at,
+                "drifted_columns": [],
+                "label_drifted": False,
+            }
+        comparison = profile.compare_counts(feature_counts, label_counts)
+        features, labels = comparison["features"], comparison["labels"]
+        return {
+            "status": "ok",
+            "window_rows": n_rows,
+            "min_rows": self.min_rows,
+            "reference_rows": profile.features.n_rows,
+            "reference_created_at": profile.created_at,
+            "drifted_columns": features.index[features["drifted"]].tolist(),
+            "label_drifted": bool(labels["drifted"].iloc[0]),
+            "label_prior": profile.label_prior,
+            "label_rates": {str(label): float(count) / max(n_rows, 1)
+                            for label, count in zip(profile.labels, label_counts)},
+            "columns": {column: {name: float(value) for name, value in row.items() if name != "drifted"}
+                        for column, row in features.to_dict(orient="index").items()},
+        }
@@ -5,19 +5,164 @@ import sys
 
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logging
+from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix
+from networksecurity.utils.model.tree_engine import CompiledTreeEnsemble, compile_tree_engine
+
+import numpy as np
+from typing import Optional
 
 class NetworkModel:
-    def __init__(self,preprocessor,model):
+    def __init__(self,preprocessor,model,engine:CompiledTreeEnsemble=None,metadata:Optional[dict]=None):
+        """
+        :param engine: Compiled copy of a tree model, e.g. the one published next to it.
+                       Compiled from model if not given; models that are not trees have none.
+        :param metadata: Published with the model, e.g. the operating "threshold" chosen at training
+                         time (see choose_threshold). Without one the model's own decision is used.
+        """
         try:
             self.preprocessor = preprocessor
             self.model = model
+            self.metadata = dict(metadata or {})
+            if engine is None:
+                try:
+                    engine = compile_tree_engine(model)
+                except NetworkSecurityException as e:
+                    logging.warning(f"Could not compile {type(model).__name__}, predicting with sklearn: {e}")
+            self.engine = engine
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    @property
+    def threshold(self) -> Optional[float]:
+        """Positive-class probability from which a row is labelled positive, None for argmax"""
+        # models pickled before the metadata existed have no metadata attribute
+        threshold = getattr(self, "metadata", {}).get("threshold")
+        if threshold is None or len(self.model.classes_) != 2:
+            return None
+        return float(threshold)
+
+    def estimator_for(self,n_rows:int):
+        """The compiled engine when it is faster for a batch of n_rows, the sklearn model otherwise"""
+        # models pickled before the engine existed have no engine attribute
+        engine = getattr(self, "engine", None)
+        if engine is not None and engine.handles(n_rows):
+            return engine
+        return self.model
+
+    @staticmethod
+    def to_model_input(x):
+        """int8 feature codes are widened to float (NaN for missing) only here, at the sklearn boundary"""
+        if isinstance(x, FeatureMatrix):
+            return x.to_float()
+        if isinstance(x, np.ndarray) and x.dtype == np.int8:
+            return FeatureMatrix(x).to_float()
+        return x
+
+    def transform(self,x):
+        """
+        Preprocesses x for the model. A preprocessor that only imputes leaves complete rows
+        unchanged, so only the rows with missing values go through it.
+        """
+        try:
+            x = self.to_model_input(x)
+            if not is_imputer_only(self.preprocessor):
+                return self.preprocessor.transform(x)
+            x = np.asarray(x, dtype=np.float64)
+            rows_with_missing = np.flatnonzero(np.isnan(x).any(axis=1))
+            if not len(rows_with_missing):
+                return x
+            x = x.copy()
+            x[rows_with_missing] = self.preprocessor.transform(x[rows_with_missing])
+            return x
         except Exception as e:
             raise NetworkSecurityException(e,sys)
     
     def predict(self,x):
         try:
-            x_transform = self.preprocessor.transform(x)
-            y_hat = self.model.predict(x_transform)
+            if self.threshold is not None:
+                return self.predict_with_proba(x)[0]
+            x_transform = self.transform(x)
+            y_hat = self.estimator_for(len(x_transform)).predict(x_transform)
             return y_hat
         except Exception as e:
-            raise NetworkSecurityException(e,sys)
\ No newline at end of file
+            raise NetworkSecurityException(e,sys)
+
+    def predict_proba(self,x):
+        try:
+            x_transform = self.transform(x)
+            return self.estimator_for(len(x_transform)).predict_proba(x_transform)
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def predict_with_proba(self,x):
+        """
+        Labels and positive-class probabilities from a single pass through the model.
+
+        :param x: Feature matrix in schema column order.
+        :return: Tuple of (labels, probabilities of the positive class). Labels are positive where
+                 the probability reaches the operating threshold, if the model has one.
+        """
+        try:
+            proba = self.predict_proba(x)
+            threshold = self.threshold
+            if threshold is None:
+                labels = self.model.classes_[proba.argmax(axis=1)]
+            else:
+                labels = self.model.classes_[(proba[:, -1] >= threshold).astype(np.intp)]
+            return labels, proba[:, -1]
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    def score(self,x) -> dict:
+        """
+        Batch scoring for triage: scores, labels and the threshold that turned one into the other.
+        :return: Dict with "scores" (positive-class probabilities), "labels" and "threshold"
+                 (None when labels are the model's argmax decision).
+        """
+        try:
+            labels, scores = self.predict_with_proba(x)
+            return {"scores": scores, "labels": labels, "threshold": self.threshold}
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+
+def is_imputer_only(preprocessor) -> bool:
+    """True for an imputer, or a Pipeline of imputers, that keeps the columns of its input"""
+    from sklearn.impute import KNNImputer, SimpleImputer
+    from sklearn.pipeline import Pipeline
+    from networksecurity.utils.ml_utils.imputer import FastImputer
+
+    if isinstance(preprocessor, Pipeline):
+        return all(is_imputer_only(step) for _, step in preprocessor.steps)
+    if isinstance(preprocessor, (SimpleImputer, KNNImputer)):
+        # missing indicators add columns, columns empty at fit are dropped
+        return len(preprocessor.get_feature_names_out()) == preprocessor.n_features_in_
+    return isinstance(preprocessor, FastImputer)
+
+
+def supports_incremental_fit(model) -> bool:
+    """True for estimators with partial_fit or a warm-startable ensemble (RandomForest, GradientBoosting, ...)"""
+    if hasattr(model, "partial_fit"):
+        return True
+    params = model.get_params() if hasattr(model, "get_params") else {}
+    return "warm_start" in params and "n_estimators" in params
+
+
+def incremental_fit(model, x, y, n_estimators: int):
+    """
+    Updates a fitted model with new records only.
+    Warm-startable ensembles keep their fitted members and grow n_estimators new ones on x,
+    estimators with partial_fit take one more pass over x.
+    :return: The updated model (the same object).
+    """
+    try:
+        if hasattr(model, "partial_fit"):
+            return model.partial_fit(x, y)
+        if not supports_incremental_fit(model):
+            raise TypeError(f"{type(model).__name__} cannot be updated incrementally")
+        model.set_params(warm_start=True, n_estimators=model.get_params()["n_estimators"] + n_estimators)
+        model.fit(x, y)
+        logging.info(f"Warm-started {type(model).__name__} to {model.get_params()['n_estimators']} estimators")
+        return model
+    except Exception as e:
+        raise NetworkSecurityException(e,sys)
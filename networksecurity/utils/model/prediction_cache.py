@@ -0,0 +1,153 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from networksecurity.constant.training_pipeline import SERVING_PREDICTION_CACHE_MAX_ENTRIES
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.utils.main_utils.feature_matrix import MISSING_CODE
+
+# 2 bits per feature (-1, 0, 1 and missing) in a uint64 key
+MAX_KEY_FEATURES = 32
+
+
+def pack_keys(x: np.ndarray) -> Optional[np.ndarray]:
+    """
+    One uint64 key per row of int8 feature codes, the 2-bit codes of FeatureMatrix.pack side by side.
+    :return: None if x has more than MAX_KEY_FEATURES columns or codes other than -1, 0, 1 and missing.
+    """
+    x = np.asarray(x)
+    if x.dtype != np.int8 or x.ndim != 2 or x.shape[1] > MAX_KEY_FEATURES:
+        return None
+    missing = x == MISSING_CODE
+    if np.any(~missing & ((x < -1) | (x > 1))):
+        return None
+    two_bit = np.where(missing, 3, x + 1).astype(np.uint64)
+    shifts = (2 * np.arange(x.shape[1])).astype(np.uint64)
+    return np.bitwise_or.reduce(two_bit << shifts, axis=1)
+
+
+class PredictionCache:
+    """
+    LRU cache of (label, probability) per distinct feature vector, in front of a NetworkModel.
+
+    The phishing features are ternary, so a row packs into a 64-bit key (see pack_keys) and
+    traffic repeats the same vectors over and over. A batch is answered from the cache where
+    possible and only its distinct unseen vectors go through the imputer and the model. At most
+    max_entries vectors are kept, the least recently used are evicted first. The cache restarts
+    empty when the serving model changes; prewarm fills it with the most frequent vectors of a
+    sample such as the training data. Rows that do not pack (non-ternary codes) bypass the cache.
+    """
+
+    def __init__(self, max_entries: int = SERVING_PREDICTION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.model = None
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.prewarmed = 0
+
+    def _reset(self, model):
+        self.model = model
+        self._entries.clear()
+        self.hits = self.misses = self.bypassed = self.evictions = self.prewarmed = 0
+
+    def _store(self, model, keys: np.ndarray, labels: np.ndarray, probabilities: np.ndarray):
+        with self._lock:
+            if model is not self.model:
+                # the model was swapped while these rows were scored
+                return
+            for key, label, probability in zip(keys.tolist(), labels.tolist(), probabilities.tolist()):
+                self._entries[key] = (label, probability)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def predict_with_proba(self, model, x: np.ndarray):
+        """
+        Same result as model.predict_with_proba(x), computed for the rows missing from the cache only.
+        :param x: int8 feature codes in schema column order.
+        """
+        try:
+            keys = pack_keys(x) if self.max_entries > 0 else None
+            if keys is None:
+                with self._lock:
+                    self.bypassed += len(x)
+                return model.predict_with_proba(x)
+
+            cached = [None] * len(keys)
+            with self._lock:
+                if model is not self.model:
+                    self._reset(model)
+                for i, key in enumerate(keys.tolist()):
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        cached[i] = entry
+                miss_rows = [i for i, entry in enumerate(cached) if entry is None]
+                self.hits += len(keys) - len(miss_rows)
+                self.misses += len(miss_rows)
+
+            miss_rows = np.array(miss_rows, dtype=np.intp)
+            new_keys, first_rows, inverse = np.unique(keys[miss_rows], return_index=True, return_inverse=True)
+            if len(new_keys):
+                new_labels, new_probabilities = model.predict_with_proba(x[miss_rows[first_rows]])
+                self._store(model, new_keys, new_labels, new_probabilities)
+
+            labels = np.empty(len(keys), dtype=np.asarray(model.model.classes_).dtype)
+            probabilities = np.empty(len(keys), dtype=np.float64)
+            hit_rows = [i for i, entry in enumerate(cached) if entry is not None]
+            if hit_rows:
+                labels[hit_rows] = [cached[i][0] for i in hit_rows]
+                probabilities[hit_rows] = [cached[i][1] for i in hit_rows]
+            if len(new_keys):
+                labels[miss_rows] = new_labels[inverse]
+                probabilities[miss_rows] = new_probabilities[inverse]
+            return labels, probabilities
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def prewarm(self, model, x: np.ndarray, max_rows: Optional[int] = None) -> int:
+        """
+        Scores the most frequent distinct vectors of x with model and caches them.
+        :param max_rows: Number of vectors to cache, at most max_entries.
+        :return: Number of vectors cached.
+        """
+        try:
+            keys = pack_keys(x)
+            if keys is None or self.max_entries <= 0:
+                return 0
+            max_rows = min(max_rows or self.max_entries, self.max_entries)
+            unique_keys, first_rows, counts = np.unique(keys, return_index=True, return_counts=True)
+            # least frequent first, so the most frequent vectors end up most recently used
+            top = np.argsort(counts, kind="stable")[-max_rows:]
+            labels, probabilities = model.predict_with_proba(x[first_rows[top]])
+            with self._lock:
+                if model is not self.model:
+                    self._reset(model)
+            self._store(model, unique_keys[top], labels, probabilities)
+            with self._lock:
+                self.prewarmed += len(top)
+            return len(top)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "max_entries": self.max_entries,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "prewarmed": self.prewarmed,
+            }
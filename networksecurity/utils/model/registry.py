@@ -0,0 +1,240 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from typing import Optional
+
+import yaml
+
+from networksecurity.constant.training_pipeline import (
+    FINAL_MODEL_DIR,
+    FINAL_MODEL_ENGINE_FILE_NAME,
+    FINAL_MODEL_METADATA_FILE_NAME,
+    FINAL_PREPROCESSOR_FILE_NAME,
+    FINAL_REFERENCE_PROFILE_FILE_NAME,
+    MODEL_FILE_NAME,
+    MODEL_REGISTRY_MANIFEST_FILE_NAME,
+    MODEL_REGISTRY_POLL_INTERVAL_SECONDS,
+)
+from networksecurity.exception.exceptions import NetworkSecurityException
+from networksecurity.logging.logger import logging
+from networksecurity.utils.main_utils.utils import file_checksum, read_yaml_file
+from networksecurity.utils.ml_utils.drift import ReferenceProfile
+from networksecurity.utils.model.estimator import NetworkModel
+
+
+def write_model_manifest(model_dir: str = FINAL_MODEL_DIR) -> str:
+    """
+    Publishes the checksums of the final model files once they are completely written.
+    The registry only swaps in a model whose files match the manifest.
+    :param model_dir: Directory holding model.pkl, preprocessor.pkl and optionally model_engine.pkl,
+                      model_metadata.yaml and reference_profile.json.
+    :return: Path of the written manifest.
+    """
+    try:
+        file_names = [FINAL_PREPROCESSOR_FILE_NAME, MODEL_FILE_NAME]
+        for optional_file_name in (FINAL_MODEL_ENGINE_FILE_NAME, FINAL_MODEL_METADATA_FILE_NAME,
+                                   FINAL_REFERENCE_PROFILE_FILE_NAME):
+            if os.path.exists(os.path.join(model_dir, optional_file_name)):
+                file_names.append(optional_file_name)
+        manifest = {
+            "created_at": datetime.now().isoformat(),
+            "files": {file_name: file_checksum(os.path.join(model_dir, file_name)) for file_name in file_names},
+        }
+        manifest_file_path = os.path.join(model_dir, MODEL_REGISTRY_MANIFEST_FILE_NAME)
+        fd, tmp_path = tempfile.mkstemp(dir=model_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file_obj:
+            yaml.dump(manifest, file_obj)
+        os.replace(tmp_path, manifest_file_path)
+        logging.info(f"Model manifest written to {manifest_file_path}")
+        return manifest_file_path
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+def write_legacy_model_manifest(model_dir: str = FINAL_MODEL_DIR) -> Optional[str]:
+    """
+    Migrates a model published before manifests existed (by an older trainer, or shipped in
+    the image) so the registry serves it: the manifest is written for the files on disk once
+    the model and preprocessor both unpickle. Meant for startup, before any trainer publishes;
+    a directory that already has a manifest is left alone.
+    :return: Path of the written manifest, None if there was nothing to migrate.
+    """
+    try:
+        if os.path.exists(os.path.join(model_dir, MODEL_REGISTRY_MANIFEST_FILE_NAME)):
+            return None
+        for file_name in (FINAL_PREPROCESSOR_FILE_NAME, MODEL_FILE_NAME):
+            file_path = os.path.join(model_dir, file_name)
+            if not os.path.exists(file_path):
+                return None
+            try:
+                with open(file_path, "rb") as file_obj:
+                    pickle.load(file_obj)
+            except Exception as e:
+                logging.warning(f"Not migrating {model_dir}, {file_name} does not load: {e}")
+                return None
+        logging.warning(f"Model in {model_dir} was published without a manifest, writing one for its current files")
+        return write_model_manifest(model_dir)
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
+
+
+class ModelRegistry:
+    """
+    Process-wide holder of the serving NetworkModel.
+
+    The model is unpickled once and kept in memory. Once start() was called a background
+    thread checks the files in the model directory every poll_interval seconds (by mtime and
+    size), loads a changed model next to the current one and swaps it in with a single
+    reference assignment. Requests only read that reference: they never wait for a load, and
+    those already holding the old model finish with it undisturbed.
+    """
+
+    def __init__(self, model_dir: str = FINAL_MODEL_DIR,
+                 poll_interval: float = MODEL_REGISTRY_POLL_INTERVAL_SECONDS):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self.preprocessor_file_path = os.path.join(model_dir, FINAL_PREPROCESSOR_FILE_NAME)
+        self.model_file_path = os.path.join(model_dir, MODEL_FILE_NAME)
+        self.manifest_file_path = os.path.join(model_dir, MODEL_REGISTRY_MANIFEST_FILE_NAME)
+        # (NetworkModel, version, ReferenceProfile or None), swapped as one reference
+        self._current = (None, 0, None)
+        self._signature = None
+        self._lock = threading.Lock()
+        self._poller = None
+        self._stop = threading.Event()
+
+    @property
+    def version(self) -> int:
+        return self._current[1]
+
+    @property
+    def reference_profile(self):
+        """ReferenceProfile of the loaded model, None for models published without one"""
+        return self._current[2]
+
+    def _file_signature(self) -> tuple:
+        signature = []
+        for file_path in (self.preprocessor_file_path, self.model_file_path, self.manifest_file_path):
+            try:
+                stat = os.stat(file_path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _read_published_files(self) -> dict:
+        """
+        Reads every file listed in the manifest once and checks its sha256 on the bytes read,
+        so what is unpickled is exactly what the manifest describes even if a publish starts
+        meanwhile.
+        :return: Dict of file name to bytes, None if the manifest is missing, lacks the model
+                 or preprocessor, or a file does not match it (a publish in progress).
+        """
+        if not os.path.exists(self.manifest_file_path):
+            logging.warning(f"No model manifest in {self.model_dir}, refusing to load unverified model files")
+            return None
+        expected = (read_yaml_file(self.manifest_file_path) or {}).get("files", {})
+        if FINAL_PREPROCESSOR_FILE_NAME not in expected or MODEL_FILE_NAME not in expected:
+            logging.warning(f"Model manifest in {self.model_dir} does not list the model and preprocessor")
+            return None
+        contents = {}
+        for file_name, checksum in expected.items():
+            try:
+                with open(os.path.join(self.model_dir, file_name), "rb") as file_obj:
+                    content = file_obj.read()
+            except FileNotFoundError:
+                return None
+            if hashlib.sha256(content).hexdigest() != checksum:
+                return None
+            contents[file_name] = content
+        return contents
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reloads the model if the files on disk changed since the last load.
+        Only files listed in the manifest are loaded, from the same bytes their checksums were
+        verified on; without a matching manifest the current model is kept.
+        :param force: Reload even if the file signature is unchanged.
+        :return: True if a new model was swapped in.
+        """
+        try:
+            with self._lock:
+                signature = self._file_signature()
+                if not force and signature == self._signature:
+                    return False
+                if signature[0] is None or signature[1] is None:
+                    logging.warning(f"No complete model found in {self.model_dir}")
+                    return False
+                contents = self._read_published_files()
+                if contents is None:
+                    logging.warning("Model files do not match the manifest yet, keeping the current model")
+                    return False
+
+                preprocessor = pickle.loads(contents[FINAL_PREPROCESSOR_FILE_NAME])
+                model = pickle.loads(contents[MODEL_FILE_NAME])
+                # the published engine is compiled from this model
+                engine = pickle.loads(contents[FINAL_MODEL_ENGINE_FILE_NAME]) \
+                    if FINAL_MODEL_ENGINE_FILE_NAME in contents else None
+                metadata = yaml.safe_load(contents[FINAL_MODEL_METADATA_FILE_NAME]) \
+                    if FINAL_MODEL_METADATA_FILE_NAME in contents else None
+                reference_profile = ReferenceProfile.from_dict(json.loads(contents[FINAL_REFERENCE_PROFILE_FILE_NAME])) \
+                    if FINAL_REFERENCE_PROFILE_FILE_NAME in contents else None
+                network_model = NetworkModel(preprocessor=preprocessor, model=model, engine=engine, metadata=metadata)
+                self._current = (network_model, self.version + 1, reference_profile)
+                self._signature = signature
+                logging.info(f"Model registry loaded version {self.version} from {self.model_dir}")
+                return True
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def start(self):
+        """Starts the thread that polls the model directory, once"""
+        with self._lock:
+            if self._poller is None:
+                self._stop.clear()
+                self._poller = threading.Thread(target=self._poll, name="model-registry", daemon=True)
+                self._poller.start()
+
+    def stop(self):
+        poller, self._poller = self._poller, None
+        if poller is not None:
+            self._stop.set()
+            poller.join()
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except NetworkSecurityException as e:
+                # the previously loaded model keeps serving
+                logging.error(f"Model reload failed: {e}")
+
+    def get_current(self) -> tuple:
+        """
+        Returns the current (NetworkModel, version, reference profile) read together. Never loads
+        a model, newly pushed models are picked up by the poller thread (see start) or refresh.
+        """
+        try:
+            current = self._current
+            if current[0] is None:
+                raise FileNotFoundError(f"No model available in {self.model_dir}")
+            return current
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def get_model(self) -> NetworkModel:
+        """Returns the current NetworkModel, see get_current"""
+        return self.get_current()[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes the manifest of a model published without one")
+    parser.add_argument("--model-dir", default=FINAL_MODEL_DIR)
+    manifest_file_path = write_legacy_model_manifest(parser.parse_args().model_dir)
+    print(manifest_file_path or "Nothing to migrate")
@@ -0,0 +1,265 @@
+import sys
+from typing import Optional
+
+import numpy as np
+
+from networksecurity.constant.training_pipeline import TREE_ENGINE_MAX_PAIRS
+from networksecurity.exception.exceptions import NetworkSecurityException
+
+# sklearn trees mark leaves with TREE_LEAF in children_left/children_right
+TREE_LEAF = -1
+ENGINE_KINDS = ("mean", "gradient_boosting", "samme")
+
+
+def _softmax(x: np.ndarray) -> np.ndarray:
+    """sklearn.utils.extmath.softmax, step by step, so the probabilities match to the bit"""
+    x = x - x.max(axis=1).reshape(-1, 1)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1).reshape(-1, 1)
+    return x
+
+
+class CompiledTreeEnsemble:
+    """
+    Inference-only copy of a fitted sklearn tree model, evaluated with NumPy alone.
+
+    The nodes of all trees are flattened into contiguous arrays (feature, threshold, children,
+    missing-value direction). All (row, tree) pairs descend one level per step with a few
+    vectorized gathers, and pairs that reached a leaf drop out of the descending set, so a batch costs max_depth NumPy steps instead of one sklearn call (and thread dispatch)
+    per tree. Every tree adds its leaf vector to the output in the ensemble's order, then the
+    ensemble's own link turns the sum into probabilities:
+
+    - "mean": DecisionTree, RandomForest and ExtraTrees, the mean of the per-tree class fractions.
+    - "gradient_boosting": learning_rate * leaf value added to the init raw prediction, expit or softmax.
+    - "samme": AdaBoost, the weighted vote of every tree's class, softmax of the decision.
+
+    Inputs are cast to float32 and compared with the float64 thresholds, and the sums are done in
+    the same order as sklearn, so predictions and probabilities are bit-identical. Build it with
+    compile_tree_engine.
+    """
+
+    def __init__(self, kind: str, classes: np.ndarray, n_features: int, roots: np.ndarray,
+                 feature: np.ndarray, threshold: np.ndarray, children: np.ndarray,
+                 missing_go_to_left: np.ndarray, leaf_values: np.ndarray,
+                 init: Optional[np.ndarray] = None, scale: float = 1.0):
+        """
+        :param roots: Index of the root node of every tree, in the ensemble's order.
+        :param children: (n_nodes, 2) left and right child of every node, the leaf's own index for leaves.
+        :param leaf_values: (n_nodes, n_outputs) what each leaf adds to the output.
+        :param init: Output before the first tree, gradient boosting's init raw prediction.
+        :param scale: Divisor of the summed output, the number of trees for "mean",
+                      the sum of the estimator weights for "samme".
+        """
+        try:
+            if kind not in ENGINE_KINDS:
+                raise ValueError(f"Unknown engine kind {kind}, expected one of {ENGINE_KINDS}")
+            self.kind = kind
+            self.classes_ = classes
+            self.n_features_in_ = n_features
+            self.feature = feature
+            self.threshold = threshold
+            self.missing_go_to_left = missing_go_to_left
+            # leaves are referred to as ~node, negative, so the descent spots them by sign
+            is_leaf = children[:, 0] == np.arange(len(children))
+            self.roots = np.where(is_leaf[roots], ~roots, roots)
+            # left and right child interleaved
+            self.child = np.where(is_leaf[children], ~children, children).ravel()
+            self.leaf_values = leaf_values
+            self.init = init
+            self.scale = scale
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def handles(self, n_rows: int) -> bool:
+        """
+        True if the engine is the faster choice for a batch of n_rows. The descent costs NumPy
+        work per (row, tree) pair, sklearn's compiled loops win on large batches of forests and
+        boosted trees. AdaBoost calls every tree separately in sklearn, the engine always wins.
+        """
+        return self.kind == "samme" or n_rows * self.n_trees <= TREE_ENGINE_MAX_PAIRS
+
+    def apply(self, x: np.ndarray) -> np.ndarray:
+        """Leaf reached by every row in every tree, as (n_trees, n_rows) node indices"""
+        n_rows = len(x)
+        flat_x = x.ravel()
+        check_missing = bool(np.isnan(flat_x).any())
+        leaves = np.empty(self.n_trees * n_rows, dtype=np.int64)
+        # state of the (tree, row) pairs still descending: position in leaves, node, row offset in flat_x
+        position = np.arange(self.n_trees * n_rows)
+        nodes = np.repeat(self.roots, n_rows)
+        row_offsets = np.tile(np.arange(n_rows, dtype=np.int64) * self.n_features_in_, self.n_trees)
+        while True:
+            reached = nodes < 0
+            if reached.any():
+                leaves[position[reached]] = ~nodes[reached]
+                descending = ~reached
+                position, nodes, row_offsets = position[descending], nodes[descending], row_offsets[descending]
+            if not len(nodes):
+                break
+            values = flat_x[row_offsets + self.feature[nodes]]
+            go_right = ~(values <= self.threshold[nodes])
+            if check_missing:
+                go_right &= ~(np.isnan(values) & self.missing_go_to_left[nodes])
+            nodes = self.child[2 * nodes + go_right]
+        return leaves.reshape(self.n_trees, n_rows)
+
+    def raw_predict(self, x) -> np.ndarray:
+        """Sum of the leaf values over the trees, divided by scale"""
+        try:
+            # sklearn compares float32 inputs, widened back to float64 exactly for the float64 thresholds
+            x = np.ascontiguousarray(x, dtype=np.float32).astype(np.float64)
+            if x.ndim != 2 or x.shape[1] != self.n_features_in_:
+                raise ValueError(f"Expected {self.n_features_in_} features, got shape {x.shape}")
+            contributions = self.leaf_values[self.apply(x)]
+            if self.init is not None:
+                contributions[0] = self.init + contributions[0]
+            # a running sum adds the trees one after the other, in sklearn's order (a reduction may
+            # switch to pairwise summation)
+            raw = np.cumsum(contributions, axis=0, out=contributions)[-1]
+            if self.kind != "gradient_boosting":
+                raw /= self.scale
+            return raw
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def _decision(self, raw: np.ndarray) -> np.ndarray:
+        if self.kind == "samme" and len(self.classes_) == 2:
+            raw[:, 0] *= -1
+            return raw.sum(axis=1)
+        if self.kind == "gradient_boosting" and raw.shape[1] == 1:
+            return raw.ravel()
+        return raw
+
+    def predict_proba(self, x) -> np.ndarray:
+        try:
+            raw = self.raw_predict(x)
+            if self.kind == "mean":
+                return raw
+            decision = self._decision(raw)
+            if self.kind == "gradient_boosting":
+                if decision.ndim == 1:
+                    from scipy.special import expit
+
+                    proba = np.empty((len(decision), 2), dtype=decision.dtype)
+                    proba[:, 1] = expit(decision)
+                    proba[:, 0] = 1 - proba[:, 1]
+                    return proba
+                return _softmax(decision)
+            if decision.ndim == 1:
+                return _softmax(np.vstack([-decision, decision]).T / 2)
+            return _softmax(decision / (len(self.classes_) - 1))
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+    def predict(self, x) -> np.ndarray:
+        try:
+            raw = self.raw_predict(x)
+            if self.kind == "mean":
+                return self.classes_.take(np.argmax(raw, axis=1), axis=0)
+            decision = self._decision(raw)
+            if decision.ndim == 2:
+                return self.classes_.take(np.argmax(decision, axis=1), axis=0)
+            # gradient boosting breaks a zero decision towards the positive class, AdaBoost the other way
+            positive = decision >= 0 if self.kind == "gradient_boosting" else decision > 0
+            return self.classes_.take(positive.astype(np.intp), axis=0)
+        except Exception as e:
+            raise NetworkSecurityException(e, sys)
+
+
+def _class_fractions(tree, n_classes: int) -> np.ndarray:
+    """Leaf values of a classification tree normalized as in DecisionTreeClassifier.predict_proba"""
+    proba = tree.value[:, 0, :n_classes].copy()
+    normalizer = proba.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    proba /= normalizer
+    return proba
+
+
+def _flatten(trees, leaf_values) -> dict:
+    """Concatenates the node arrays of sklearn Tree objects, node indices shifted per tree"""
+    roots, feature, threshold, children, missing_left = [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        node_ids = np.arange(tree.node_count)
+        leaf = tree.children_left == TREE_LEAF
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        children.append(np.column_stack([np.where(leaf, node_ids, tree.children_left),
+                                         np.where(leaf, node_ids, tree.children_right)]) + offset)
+        missing_left.append(tree.missing_go_to_left.astype(bool))
+        offset += tree.node_count
+    return {
+        "roots": np.array(roots, dtype=np.int64),
+        "feature": np.concatenate(feature).astype(np.int64),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "children": np.concatenate(children).astype(np.int64),
+        "missing_go_to_left": np.concatenate(missing_left),
+        "leaf_values": np.concatenate(leaf_values).astype(np.float64),
+    }
+
+
+def compile_tree_engine(model) -> Optional[CompiledTreeEnsemble]:
+    """
+    Compiles a fitted single-output classifier made of trees: DecisionTree, RandomForest,
+    ExtraTrees, GradientBoosting (default init) and AdaBoost over trees.
+    :return: The compiled engine, None for any other model, which keeps using sklearn.
+    """
+    try:
+        from sklearn.dummy import DummyClassifier
+        from sklearn.ensemble import AdaBoostClassifier, ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
+
+        single_tree = (DecisionTreeClassifier, ExtraTreeClassifier)
+        if not hasattr(model, "classes_") or getattr(model, "n_outputs_", 1) != 1:
+            return None
+        classes = np.asarray(model.classes_)
+        n_classes = len(classes)
+        n_features = model.n_features_in_
+
+        if isinstance(model, single_tree):
+            arrays = _flatten([model.tree_], [_class_fractions(model.tree_, n_classes)])
+            return CompiledTreeEnsemble("mean", classes, n_features, scale=1.0, **arrays)
+
+        if isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            arrays = _flatten(trees, [_class_fractions(tree, n_classes) for tree in trees])
+            return CompiledTreeEnsemble("mean", classes, n_features, scale=float(len(trees)), **arrays)
+
+        if isinstance(model, GradientBoostingClassifier):
+            if not (isinstance(model.init_, DummyClassifier) or model.init_ == "zero"):
+                return None
+            # the default init estimator predicts the class prior, the same raw value for every row
+            init = model._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0]
+            stages = model.estimators_
+            trees = [stages[i, k].tree_ for i in range(stages.shape[0]) for k in range(stages.shape[1])]
+            leaf_values = []
+            for i in range(stages.shape[0]):
+                for k in range(stages.shape[1]):
+                    values = np.zeros((stages[i, k].tree_.node_count, stages.shape[1]))
+                    values[:, k] = model.learning_rate * stages[i, k].tree_.value[:, 0, 0]
+                    leaf_values.append(values)
+            arrays = _flatten(trees, leaf_values)
+            return CompiledTreeEnsemble("gradient_boosting", classes, n_features, init=init, **arrays)
+
+        if isinstance(model, AdaBoostClassifier):
+            if n_classes < 2 or not all(isinstance(estimator, single_tree) and np.array_equal(estimator.classes_, classes)
+                                        for estimator in model.estimators_):
+                return None
+            leaf_values = []
+            for estimator, weight in zip(model.estimators_, model.estimator_weights_):
+                # every leaf votes for its tree's predicted class, as in AdaBoostClassifier.decision_function
+                votes = np.argmax(estimator.tree_.value[:, 0, :], axis=1)
+                values = np.full((estimator.tree_.node_count, n_classes), -1 / (n_classes - 1) * weight)
+                values[np.arange(len(votes)), votes] = weight
+                leaf_values.append(values)
+            arrays = _flatten([estimator.tree_ for estimator in model.estimators_], leaf_values)
+            return CompiledTreeEnsemble("samme", classes, n_features,
+                                        scale=float(model.estimator_weights_.sum()), **arrays)
+        return None
+    except Exception as e:
+        raise NetworkSecurityException(e, sys)
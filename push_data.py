@@ -1,12 +1,14 @@
 import os
 import sys
-import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from dotenv import load_dotenv
 load_dotenv()
 
-MONGO_DB_URL=os.getenv("MONGO_DB_URL")
-print(MONGO_DB_URL)
+MONGO_DB_URL=os.getenv("MONGO_DB_URL") or os.getenv("MONGODB_URL")
 
 import certifi
 ca=certifi.where()
@@ -14,49 +16,219 @@ ca=certifi.where()
 import pandas as pd
 import numpy as np
 import pymongo
+from pymongo import UpdateOne
+from pymongo.errors import AutoReconnect, BulkWriteError, NetworkTimeout
+from networksecurity.constant.training_pipeline import DATA_INGESTION_COLLECTION_NAME, DATA_INGESTION_DATABASE_NAME
 from networksecurity.exception.exceptions import NetworkSecurityException
 from networksecurity.logging.logger import logging
 
+ROW_HASH_FIELD = "row_hash"
+DUPLICATE_KEY_ERROR = 11000
+CHUNK_SIZE = 100_000
+BATCH_SIZE = 5_000
+WORKERS = 4
+MAX_RETRIES = 5
+
+
+MISSING_VALUE = "\x00"
+
+
+def canonical_column(series: pd.Series) -> list:
+    """
+    Text form of every value of a column that does not depend on the dtype pandas inferred for
+    the chunk: integral numbers are written as integers (1, 1.0 and "1" agree), other floats
+    with repr, missing values as MISSING_VALUE and everything else with str.
+    """
+    values = series.to_numpy()
+    if values.dtype.kind in "iub":
+        return values.astype(np.int64).astype(str).tolist()
+    if values.dtype.kind == "f":
+        missing = np.isnan(values)
+        integral = ~missing & (values == np.round(values)) & (np.abs(values) < 2 ** 63)
+        text = np.array([repr(value) for value in values.tolist()], dtype=object)
+        text[integral] = values[integral].astype(np.int64).astype(str)
+        text[missing] = MISSING_VALUE
+        return text.tolist()
+    text = []
+    for value in values.tolist():
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            text.append(MISSING_VALUE)
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool) \
+                and float(value).is_integer():
+            text.append(str(int(value)))
+        else:
+            text.append(str(value))
+    return text
+
+
+def row_hashes(data: pd.DataFrame, occurrences: dict = None) -> list:
+    """
+    Stable id of every row from its values only: a hash of the canonical text of each column
+    (see canonical_column, columns in name order) and of how many identical rows came before it.
+    Identical rows (the phishing data has many) stay separate documents, and the ids do not
+    depend on chunk boundaries, dtypes or the position of unrelated rows.
+    :param occurrences: Count of every value hash seen so far, updated; pass the same dict for
+                        every chunk of a file.
+    """
+    occurrences = {} if occurrences is None else occurrences
+    columns = sorted(data.columns, key=str)
+    texts = [canonical_column(data[column]) for column in columns]
+    names = [str(column) for column in columns]
+    hashes = []
+    for row in zip(*texts):
+        key = "\x1f".join(f"{name}\x1e{value}" for name, value in zip(names, row)).encode()
+        value_hash = hashlib.blake2b(key, digest_size=16).hexdigest()
+        occurrence = occurrences.get(value_hash, 0)
+        occurrences[value_hash] = occurrence + 1
+        hashes.append(f"{value_hash}-{occurrence}")
+    return hashes
+
+
+def documents_from_frame(data: pd.DataFrame, occurrences: dict = None) -> list:
+    """Builds one document per row straight from the NumPy values, NaN becomes null"""
+    columns = [str(column) for column in data.columns]
+    values = data.to_numpy()
+    hashes = row_hashes(data, occurrences)
+    if values.dtype == object or (values.dtype.kind == "f" and np.isnan(values).any()):
+        rows = data.astype(object).where(data.notna(), None).to_numpy().tolist()
+    else:
+        rows = values.tolist()
+    documents = [dict(zip(columns, row)) for row in rows]
+    for document, row_hash in zip(documents, hashes):
+        document[ROW_HASH_FIELD] = row_hash
+    return documents
+
+
 class NetworkDataExtract():
-    def __init__(self):
+    """
+    Loads the CSV into MongoDB.
+
+    The file is read in chunks and every chunk is sent as unordered bulk_write batches of
+    upserts keyed on row_hash on a thread pool, so a reload (or a retried batch) leaves the
+    rows that are already stored untouched. The unique row_hash index serves the upsert
+    lookups; new documents still get an ObjectId _id in insertion order.
+    """
+    def __init__(self, mongo_db_url: str = None):
         try:
-            pass
+            self.mongo_db_url = mongo_db_url or MONGO_DB_URL
+            self.mongo_client = None
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
+
+    def get_collection(self, database, collection):
+        if self.mongo_client is None:
+            self.mongo_client = pymongo.MongoClient(self.mongo_db_url)
+        return self.mongo_client[database][collection]
+
     def csv_to_json_convertor(self,file_path):
         try:
             data=pd.read_csv(file_path)
             data.reset_index(drop=True,inplace=True)
-            records=list(json.loads(data.T.to_json()).values())
-            return records
+            return documents_from_frame(data)
+        except Exception as e:
+            raise NetworkSecurityException(e,sys)
+
+    @staticmethod
+    def upsert_batch(collection, documents: list, max_retries: int = MAX_RETRIES) -> tuple:
+        """
+        Upserts one batch unordered, keyed on row_hash, retrying on connection errors with
+        exponential backoff. Stored documents are left as they are ($setOnInsert).
+        :return: Tuple of (inserted, already stored) document counts.
+        """
+        requests = [UpdateOne({ROW_HASH_FIELD: document[ROW_HASH_FIELD]}, {"$setOnInsert": document}, upsert=True)
+                    for document in documents]
+        for attempt in range(max_retries + 1):
+            try:
+                result = collection.bulk_write(requests, ordered=False)
+                return result.upserted_count, len(documents) - result.upserted_count
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                # two concurrent upserts of the same row, the other one stored it
+                if all(error.get("code") == DUPLICATE_KEY_ERROR for error in errors):
+                    inserted = e.details.get("nUpserted", 0)
+                    return inserted, len(documents) - inserted
+                raise
+            except (AutoReconnect, NetworkTimeout) as e:
+                if attempt == max_retries:
+                    raise
+                delay = 0.5 * 2 ** attempt
+                logging.warning(f"Upsert of {len(documents)} documents failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+
+    def bulk_load(self, file_path, database, collection, chunk_size: int = CHUNK_SIZE,
+                  batch_size: int = BATCH_SIZE, workers: int = WORKERS, max_retries: int = MAX_RETRIES) -> dict:
+        """
+        Streams the CSV into the collection.
+        :return: Dict with inserted, skipped (already stored) and read counts, seconds and docs_per_second.
+        """
+        try:
+            collection = self.get_collection(database, collection) if isinstance(collection, str) else collection
+            collection.create_index(ROW_HASH_FIELD, unique=True)
+
+            stats = {"read": 0, "inserted": 0, "skipped": 0}
+            occurrences = {}
+            started = time.perf_counter()
+            pending = set()
+
+            def collect(done):
+                for future in done:
+                    inserted, skipped = future.result()
+                    stats["inserted"] += inserted
+                    stats["skipped"] += skipped
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-load") as executor:
+                for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+                    documents = documents_from_frame(chunk, occurrences)
+                    stats["read"] += len(documents)
+                    for start in range(0, len(documents), batch_size):
+                        # keeps at most two batches per worker in memory
+                        if len(pending) >= 2 * workers:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            collect(done)
+                        pending.add(executor.submit(self.upsert_batch, collection,
+                                                    documents[start:start + batch_size], max_retries))
+                    elapsed = time.perf_counter() - started
+                    logging.info(f"Read {stats['read']} rows, {stats['read'] / elapsed:.0f} docs/sec")
+                collect(wait(pending)[0])
+
+            stats["seconds"] = time.perf_counter() - started
+            stats["docs_per_second"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+            logging.info(f"Bulk load finished: {stats}")
+            return stats
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
+
     def insert_data_mongodb(self,records,database,collection):
         try:
             self.database=database
             self.collection=collection
             self.records=records
 
-            self.mongo_client=pymongo.MongoClient(MONGO_DB_URL)
-            self.database = self.mongo_client[self.database]
-            
-            self.collection=self.database[self.collection]
-            self.collection.insert_many(self.records)
-            return(len(self.records))
+            self.collection=self.get_collection(self.database, self.collection)
+            inserted, _ = self.upsert_batch(self.collection, self.records)
+            return inserted
         except Exception as e:
             raise NetworkSecurityException(e,sys)
-        
-if __name__=='__main__':
-    FILE_PATH=r"Network_Data\phisingData.csv"
-    DATABASE="PhisingData"
-    Collection="network_security"
-    networkobj=NetworkDataExtract()
-    records=networkobj.csv_to_json_convertor(file_path=FILE_PATH)
-    print(records)
-    no_of_records=networkobj.insert_data_mongodb(records,DATABASE,Collection)
-    print(no_of_records)
-        
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load a CSV into MongoDB")
+    parser.add_argument("file_path", nargs="?", default=os.path.join("Network_Data", "phisingData.csv"))
+    parser.add_argument("--database", default=DATA_INGESTION_DATABASE_NAME)
+    parser.add_argument("--collection", default=DATA_INGESTION_COLLECTION_NAME)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows read from the CSV at a time")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="upserts per bulk_write")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="concurrent bulk_write calls")
+    parser.add_argument("--max-retries", type=int, default=MAX_RETRIES)
+    args = parser.parse_args(argv)
+
+    stats = NetworkDataExtract().bulk_load(args.file_path, args.database, args.collection,
+                                           chunk_size=args.chunk_size, batch_size=args.batch_size,
+                                           workers=args.workers, max_retries=args.max_retries)
+    print(f"Inserted {stats['inserted']} documents, {stats['skipped']} already stored, "
+          f"{stats['docs_per_second']:.0f} docs/sec")
+    return stats
+
+
+if __name__=='__main__':
+    main()
@@ -35,3 +35,1330 @@ def test_sync_folder_from_s3_command(monkeypatch):
     syncer.sync_folder_from_s3(folder, bucket_url)
     assert called['cmd'] == f"aws s3 sync {bucket_url} {folder} "
 
+
+def test_model_registry_swaps_model_only_after_manifest(tmp_path):
+    import time
+    from networksecurity.utils.main_utils.utils import save_object
+    from networksecurity.utils.model.registry import ModelRegistry, write_legacy_model_manifest, write_model_manifest
+
+    model_dir = str(tmp_path)
+    save_object(os.path.join(model_dir, "preprocessor.pkl"), {"name": "preprocessor-v1"})
+    save_object(os.path.join(model_dir, "model.pkl"), {"name": "model-v1"})
+    registry = ModelRegistry(model_dir=model_dir, poll_interval=0.01)
+    # files without a manifest are never loaded
+    assert not registry.refresh(force=True) and registry.version == 0
+
+    write_model_manifest(model_dir)
+    assert registry.refresh()
+    first = registry.get_model()
+    assert first.model == {"name": "model-v1"}
+    assert not registry.refresh() and registry.get_model() is first
+
+    # a new model.pkl without an updated manifest is a push in progress
+    save_object(os.path.join(model_dir, "model.pkl"), {"name": "model-v2"})
+    assert not registry.refresh() and registry.get_model() is first
+
+    # the poller thread swaps in the published model, requests never load one
+    registry.start()
+    try:
+        with registry._lock:
+            write_model_manifest(model_dir)
+            time.sleep(0.1)
+            assert registry.get_model() is first
+        deadline = time.time() + 5
+        while registry.version < 2:
+            assert time.time() < deadline
+            time.sleep(0.01)
+    finally:
+        registry.stop()
+    assert registry.get_model().model == {"name": "model-v2"}
+
+    # a manifest that no longer matches the files keeps the current model
+    save_object(os.path.join(model_dir, "preprocessor.pkl"), {"name": "preprocessor-v3"})
+    assert not registry.refresh(force=True) and registry.get_model().preprocessor == {"name": "preprocessor-v1"}
+
+    # a model published before manifests existed is migrated once, a broken one is not
+    legacy_dir = tmp_path / "legacy"
+    legacy_dir.mkdir()
+    save_object(str(legacy_dir / "preprocessor.pkl"), {"name": "preprocessor-v0"})
+    (legacy_dir / "model.pkl").write_bytes(b"truncated")
+    assert write_legacy_model_manifest(str(legacy_dir)) is None
+    save_object(str(legacy_dir / "model.pkl"), {"name": "model-v0"})
+    assert write_legacy_model_manifest(str(legacy_dir)) is not None
+    assert write_legacy_model_manifest(str(legacy_dir)) is None
+    legacy_registry = ModelRegistry(model_dir=str(legacy_dir))
+    assert legacy_registry.refresh(force=True) and legacy_registry.get_model().model == {"name": "model-v0"}
+
+
+def test_feature_schema_parses_and_checks_records():
+    import numpy as np
+    from networksecurity.utils.main_utils.schema import FeatureSchema
+
+    schema = FeatureSchema.from_yaml()
+    assert schema.n_features == 30
+    assert "Result" not in schema.feature_columns
+
+    row = [1] * schema.n_features
+    x = schema.array_from_records([row, dict(zip(schema.feature_columns, row))])
+    assert x.shape == (2, 30)
+
+    packed = schema.array_from_bytes(np.array([row, row], dtype=np.int8).tobytes())
+    assert packed.dtype == np.int8 and packed.shape == (2, 30)
+
+    # Redirect only allows 0 and 1
+    bad = list(row)
+    bad[schema.column_index["Redirect"]] = -1
+    with pytest.raises(ValueError, match="Redirect"):
+        schema.array_from_records([bad])
+    with pytest.raises(ValueError):
+        schema.array_from_bytes(b"\x01" * 31)
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    import asyncio
+    import numpy as np
+    from networksecurity.utils.model.batcher import MicroBatcher
+
+    calls = []
+
+    def predict_fn(x):
+        calls.append(len(x))
+        return x.sum(axis=1), x[:, 0]
+
+    async def run():
+        batcher = MicroBatcher(predict_fn, max_batch_size=64, max_wait_ms=50, max_queue_depth=100)
+        await batcher.start()
+        requests = [np.full((2, 3), i, dtype=float) for i in range(10)]
+        results = await asyncio.gather(*(batcher.submit(x) for x in requests))
+        await batcher.stop()
+        return requests, results, batcher.metrics()
+
+    requests, results, metrics = asyncio.run(run())
+    assert calls == [20]
+    for x, (sums, first) in zip(requests, results):
+        assert np.array_equal(sums, x.sum(axis=1))
+        assert np.array_equal(first, x[:, 0])
+    assert metrics["batches"] == 1 and metrics["records"] == 20 and metrics["requests"] == 10
+
+
+def _succeeding_training_target():
+    pass
+
+
+def _slow_training_target():
+    import time
+    time.sleep(60)
+
+
+def _failing_training_target():
+    # larger than the pipe buffer, the worker blocks in send until the result is read
+    raise RuntimeError("x" * (8 << 20))
+
+
+def _wait_for_job(manager, job_id, statuses, timeout=60):
+    import time
+    deadline = time.time() + timeout
+    while manager.get(job_id).status not in statuses:
+        assert time.time() < deadline, manager.get(job_id)
+        time.sleep(0.05)
+    return manager.get(job_id)
+
+
+def test_training_job_manager_runs_and_cancels_jobs():
+    from networksecurity.pipeline.training_jobs import TrainingJobManager
+
+    reloaded, cleared = [], []
+    manager = TrainingJobManager(target=_succeeding_training_target, on_success=lambda: reloaded.append(True),
+                                 on_cancel=lambda: cleared.append(True))
+    manager.start()
+    job = manager.submit()
+    assert _wait_for_job(manager, job.job_id, {"succeeded", "failed"}).status == "succeeded"
+    assert reloaded == [True]
+
+    manager.target = _slow_training_target
+    running = manager.submit()
+    queued = manager.submit()
+    _wait_for_job(manager, running.job_id, {"running"})
+    assert manager.cancel(queued.job_id).status == "cancelled"
+    manager.cancel(running.job_id)
+    assert _wait_for_job(manager, running.job_id, {"cancelled"}).finished_at is not None
+    assert manager.get(queued.job_id).started_at is None
+    # only the terminated run left a checkpoint behind
+    assert cleared == [True]
+
+
+def test_training_job_manager_reads_large_results_and_keeps_recent_jobs():
+    from networksecurity.pipeline.training_jobs import TrainingJobManager
+
+    manager = TrainingJobManager(target=_failing_training_target, max_finished=2, poll_interval=0.1)
+    job = manager.submit()
+    assert manager.get(job.job_id).status == "queued"
+    manager.start()
+    failed = _wait_for_job(manager, job.job_id, {"succeeded", "failed"})
+    assert failed.status == "failed" and len(failed.error) == 8 << 20
+
+    manager.target = _succeeding_training_target
+    later = [manager.submit() for _ in range(2)]
+    _wait_for_job(manager, later[-1].job_id, {"succeeded"})
+    assert manager.get(job.job_id) is None
+    assert [job.job_id for job in manager.list_jobs()] == [job.job_id for job in later]
+
+
+def _batch_prediction_fixture(tmp_path, n_rows=50):
+    import numpy as np
+    import pandas as pd
+    from sklearn.impute import KNNImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.entity.config_entity import TrainingPipelineConfig
+    from networksecurity.pipeline.batch_prediction import BatchPredictionConfig
+    from networksecurity.utils.main_utils.schema import FeatureSchema
+    from networksecurity.utils.main_utils.utils import save_object
+
+    schema = FeatureSchema.from_yaml()
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame({
+        column: rng.choice(np.flatnonzero(schema.allowed[i]) + schema.min_code, size=n_rows)
+        for i, column in enumerate(schema.feature_columns)
+    })
+    labels = (features.iloc[:, 0] > 0).astype(int)
+    preprocessor = Pipeline([("imputer", KNNImputer(n_neighbors=3))]).fit(features.to_numpy(dtype=float))
+    model = DecisionTreeClassifier(random_state=0).fit(preprocessor.transform(features.to_numpy(dtype=float)), labels)
+
+    config = BatchPredictionConfig(TrainingPipelineConfig())
+    config.model_file_path = str(tmp_path / "model.pkl")
+    config.preprocessor_file_path = str(tmp_path / "preprocessor.pkl")
+    config.prediction_dir = str(tmp_path / "batch_prediction")
+    config.prediction_file_path = os.path.join(config.prediction_dir, "predictions.csv")
+    config.prediction_log_file_path = os.path.join(config.prediction_dir, "prediction_log.txt")
+    config.shard_dir = os.path.join(config.prediction_dir, "shards")
+    config.throughput_report_file_path = os.path.join(config.prediction_dir, "throughput_report.yaml")
+    config.rejected_file_path = os.path.join(config.prediction_dir, "rejected.csv")
+    config.model_metadata_file_path = str(tmp_path / "model_metadata.yaml")
+    save_object(config.model_file_path, model)
+    save_object(config.preprocessor_file_path, preprocessor)
+
+    input_file_path = str(tmp_path / "input.csv")
+    features.to_csv(input_file_path, index=False)
+    return config, input_file_path
+
+
+def test_streaming_batch_prediction_matches_in_memory(tmp_path):
+    import pandas as pd
+    from networksecurity.pipeline.batch_prediction import BatchPrediction
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path)
+    in_memory = BatchPrediction(config).initiate_batch_prediction(pd.read_csv(input_file_path))
+    expected = pd.read_csv(in_memory.prediction_file_path)
+
+    streamed = BatchPrediction(config).initiate_streaming_batch_prediction(input_file_path, chunk_size=7)
+    pd.testing.assert_frame_equal(pd.read_csv(streamed.prediction_file_path), expected)
+    with open(streamed.prediction_log_file_path) as f:
+        log_content = f.read()
+    assert "Total records: 50" in log_content and "Chunks: 8" in log_content
+
+
+def test_parallel_batch_prediction_merges_shards_in_order(tmp_path):
+    import pandas as pd
+    import yaml
+    from networksecurity.pipeline.batch_prediction import BatchPrediction, split_csv_into_byte_ranges
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path, n_rows=200)
+    expected = pd.read_csv(BatchPrediction(config).initiate_batch_prediction(pd.read_csv(input_file_path)).prediction_file_path)
+
+    ranges = split_csv_into_byte_ranges(input_file_path, 4)
+    assert len(ranges) == 4 and ranges[-1][1] == os.path.getsize(input_file_path)
+
+    artifact = BatchPrediction(config).initiate_parallel_batch_prediction([input_file_path], n_workers=2, chunk_size=16)
+    pd.testing.assert_frame_equal(pd.read_csv(artifact.prediction_file_path), expected)
+    with open(config.throughput_report_file_path) as f:
+        report = yaml.safe_load(f)
+    assert report["total_records"] == 200
+    assert sum(worker["records"] for worker in report["workers"].values()) == 200
+
+
+def test_batch_prediction_routes_invalid_rows_to_reject_file(tmp_path):
+    import pandas as pd
+    from networksecurity.pipeline.batch_prediction import BatchPrediction
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path, n_rows=40)
+    data = pd.read_csv(input_file_path).astype(object)
+    data.loc[3, "Redirect"] = -1
+    data.loc[5, "URL_Length"] = "abc"
+    data.loc[7, "URL_Length"] = None
+    data.to_csv(input_file_path, index=False)
+
+    artifact = BatchPrediction(config).initiate_streaming_batch_prediction(input_file_path, chunk_size=6)
+    predictions = pd.read_csv(artifact.prediction_file_path)
+    rejected = pd.read_csv(config.rejected_file_path)
+    assert len(predictions) == 38
+    assert rejected["rejection_reason"].tolist() == ["Redirect", "URL_Length"]
+
+    BatchPrediction(config).initiate_parallel_batch_prediction([input_file_path], n_workers=2)
+    pd.testing.assert_frame_equal(pd.read_csv(config.rejected_file_path), rejected)
+    with open(config.prediction_log_file_path) as f:
+        assert "Rejected records: 2" in f.read()
+
+
+def test_feature_matrix_keeps_int8_codes_until_sklearn():
+    import numpy as np
+    from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix, compact_array, MISSING_CODE
+
+    x = np.array([[-1, 0, 1, np.nan, 1], [1, 1, -1, 0, np.nan]])
+    matrix = FeatureMatrix.from_values(x)
+    assert matrix.codes.dtype == np.int8 and matrix.codes[0, 3] == MISSING_CODE
+    np.testing.assert_array_equal(matrix.to_float(), x)
+
+    packed = matrix.pack()
+    assert packed.shape == (2, 2) and packed.dtype == np.uint8
+    np.testing.assert_array_equal(FeatureMatrix.unpack(packed, 5).codes, matrix.codes)
+
+    assert compact_array(np.array([[1.0, -1.0]])).dtype == np.int8
+    assert compact_array(np.array([[0.5, -1.0]])).dtype == np.float64
+
+
+def test_feature_label_arrays_are_memory_mapped_with_manifest(tmp_path):
+    import numpy as np
+    from networksecurity.exception.exceptions import NetworkSecurityException
+    from networksecurity.utils.main_utils.utils import save_feature_label_arrays, load_feature_label_arrays
+
+    features = np.array([[-1, 0, 1], [1, 1, -1]], dtype=np.int8)
+    labels = np.array([1, -1], dtype=np.int8)
+    manifest_file_path = str(tmp_path / "train_manifest.yaml")
+    manifest = save_feature_label_arrays(manifest_file_path, features, labels)
+    assert manifest["features"]["shape"] == [2, 3] and manifest["labels"]["dtype"] == "int8"
+
+    x, y = load_feature_label_arrays(manifest_file_path, verify=True)
+    assert isinstance(x, np.memmap) and not x.flags.writeable
+    np.testing.assert_array_equal(x, features)
+    np.testing.assert_array_equal(y, labels)
+
+    np.save(tmp_path / "train_labels.npy", np.array([1, 1], dtype=np.int8))
+    with pytest.raises(NetworkSecurityException):
+        load_feature_label_arrays(manifest_file_path, verify=True)
+
+
+@pytest.mark.parametrize("search_strategy", ["grid", "random", "halving"])
+def test_evaluate_models_reuses_refit_estimators(search_strategy):
+    import numpy as np
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.utils.main_utils.utils import best_cv_candidate, evaluate_models
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(300, 5)).astype(np.float64)
+    y = np.where(x[:, 0] + x[:, 1] > 0, 1, -1)
+    models = {"Decision Tree": DecisionTreeClassifier(random_state=0), "Logistic Regression": LogisticRegression()}
+    params = {"Decision Tree": {"max_depth": [1, 2, 4, 8]}, "Logistic Regression": {}}
+
+    report, candidates = evaluate_models(x[:200], y[:200], x[200:], y[200:], models, params,
+                                         search_strategy=search_strategy, n_jobs=2, n_iter=3,
+                                         return_candidates=True)
+    assert set(report) == set(models)
+    assert models["Decision Tree"].get_depth() <= 8
+    models["Logistic Regression"].predict(x)
+    tree_rows = [row for row in candidates if row["model"] == "Decision Tree"]
+    assert len(tree_rows) >= 3 and all(row["mean_fit_time"] >= 0 for row in tree_rows)
+    assert min(row["rank_test_score"] for row in tree_rows) == 1
+    assert sum(row["best"] for row in tree_rows) == 1
+
+    # the winner is picked on CV scores, whatever the test split says
+    rows = [{"model": "a", "best": True, "mean_test_score": 0.8}, {"model": "b", "best": False, "mean_test_score": 0.95},
+            {"model": "b", "best": True, "mean_test_score": 0.9}, {"model": "c", "best": True, "mean_test_score": 0.9}]
+    assert best_cv_candidate(rows)["model"] == "b"
+
+
+def test_model_scorer_predicts_each_split_once_and_matches_sklearn():
+    import numpy as np
+    from sklearn import metrics
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.utils.ml_utils.metric.classification_metric import ModelScorer
+
+    rng = np.random.default_rng(1)
+    x = rng.integers(-1, 2, size=(200, 4)).astype(np.float64)
+    y = np.where(x[:, 0] + 0.5 * rng.standard_normal(200) > 0, 1, -1)
+
+    calls = []
+
+    class CountingModel(LogisticRegression):
+        def predict_proba(self, X):
+            calls.append(len(X))
+            return super().predict_proba(X)
+
+    scorer = ModelScorer({"train": (x[:150], y[:150]), "test": (x[150:], y[150:])})
+    scorer.add_model("lr", CountingModel().fit(x[:150], y[:150]))
+    scorer.add_model("stump", DecisionTreeClassifier(max_depth=1).fit(x[:150], y[:150]))
+    ranking = scorer.rank("log_loss")
+    scorer.rank("f1_score")
+    score = scorer.score("lr", "test")
+    assert calls == [50]
+    assert set(ranking) == {"lr", "stump"}
+
+    model = scorer.models["lr"]
+    y_pred = model.predict(x[150:])
+    proba = model.predict_proba(x[150:])[:, 1]
+    assert score.f1_score == pytest.approx(metrics.f1_score(y[150:], y_pred))
+    assert score.precision_score == pytest.approx(metrics.precision_score(y[150:], y_pred))
+    assert score.recall_score == pytest.approx(metrics.recall_score(y[150:], y_pred))
+    assert score.accuracy_score == pytest.approx(metrics.accuracy_score(y[150:], y_pred))
+    assert score.roc_auc_score == pytest.approx(metrics.roc_auc_score(y[150:], proba))
+    assert score.log_loss == pytest.approx(metrics.log_loss(y[150:], proba))
+
+
+def test_training_mode_and_warm_start_update(tmp_path):
+    from datetime import datetime, timedelta
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.pipeline.training_state import TrainingState, decide_training_mode
+    from networksecurity.utils.model.estimator import incremental_fit, supports_incremental_fit
+
+    state_file_path = str(tmp_path / "training_state.yaml")
+    state = TrainingState.load(state_file_path)
+    assert decide_training_mode(state) == "full"
+
+    now = datetime(2026, 1, 10)
+    state.record_run("full", "65a000000000000000000001", 100, now=now)
+    state.save(state_file_path)
+    state = TrainingState.load(state_file_path)
+    assert decide_training_mode(state, now=now + timedelta(days=1)) == "incremental"
+    assert decide_training_mode(state, now=now + timedelta(days=8)) == "full"
+    assert decide_training_mode(state, model_supports_incremental=False, now=now) == "full"
+    state.record_run("incremental", "65a000000000000000000002", 20, now=now)
+    assert state.n_records == 120 and state.last_full_run_at == now.isoformat()
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(200, 4)).astype(np.float64)
+    y = (x[:, 0] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=4, random_state=0).fit(x[:100], y[:100])
+    first_trees = list(model.estimators_)
+    incremental_fit(model, x[100:], y[100:], n_estimators=3)
+    assert len(model.estimators_) == 7 and model.estimators_[:4] == first_trees
+    assert not supports_incremental_fit(DecisionTreeClassifier())
+
+
+def test_incremental_update_is_published_only_if_it_does_not_degrade(tmp_path):
+    import numpy as np
+    from types import SimpleNamespace
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.impute import SimpleImputer
+    from networksecurity.componenets.model_trainer import ModelTrainer
+    from networksecurity.entity.artifact_entity import DataTransformationArtifact
+    from networksecurity.utils.main_utils.utils import load_object
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(1200, 4)).astype(np.float64)
+    y = (x[:, 0] + x[:, 1] > 0).astype(int)
+    final_model_dir = tmp_path / "final_model"
+    trainer = ModelTrainer.__new__(ModelTrainer)
+    trainer.model_trainer_config = SimpleNamespace(
+        final_model_dir=str(final_model_dir), trained_model_file_path=str(tmp_path / "trained" / "model.pkl"),
+        selection_metric="f1_score", warm_start_n_estimators=32, warm_start_tolerance=0.01,
+        threshold_metric=None, threshold_target=None, search_cv=3, search_n_jobs=1)
+    trainer.data_transformation_artifact = DataTransformationArtifact(
+        str(final_model_dir / "preprocessor.pkl"), "", "")
+    trainer.track_model = lambda model, classification_metric: None
+    trainer.push_model(SimpleImputer().fit(x), RandomForestClassifier(n_estimators=8, random_state=0).fit(x[:400], y[:400]))
+    published = (final_model_dir / "model.pkl").read_bytes()
+
+    # new records with flipped labels would make the published model worse, it is kept
+    artifact = trainer.update_model(x[400:800], 1 - y[400:800], x[1000:], y[1000:])
+    assert (final_model_dir / "model.pkl").read_bytes() == published
+    assert len(load_object(artifact.trained_model_file_path).model.estimators_) == 8
+
+    artifact = trainer.update_model(x[400:800], y[400:800], x[1000:], y[1000:])
+    assert len(load_object(str(final_model_dir / "model.pkl")).estimators_) == 40
+    assert artifact.test_metric_artifact.f1_score >= 0.9
+
+
+class _FakeCollection:
+    """Minimal stand-in for a pymongo collection: _id range queries, projections and cursor batches"""
+
+    def __init__(self, documents):
+        self.documents = sorted(documents, key=lambda document: document["_id"])
+        self.batch_sizes = []
+
+    def _matches(self, document, query):
+        id_range = query.get("_id", {})
+        return all(op(document["_id"], id_range[key]) for key, op in
+                   (("$gt", lambda a, b: a > b), ("$gte", lambda a, b: a >= b), ("$lt", lambda a, b: a < b))
+                   if key in id_range)
+
+    def count_documents(self, query):
+        return sum(self._matches(document, query) for document in self.documents)
+
+    def estimated_document_count(self):
+        return len(self.documents)
+
+    def find(self, query=None, projection=None, batch_size=0, **kwargs):
+        self.batch_sizes.append(batch_size)
+        return _FakeCursor([{key: value for key, value in document.items()
+                             if projection is None or key in projection or key == "_id"}
+                            for document in self.documents if self._matches(document, query or {})])
+
+    def aggregate(self, pipeline):
+        query, size = pipeline[0]["$match"], pipeline[1]["$sample"]["size"]
+        matching = [document for document in self.documents if self._matches(document, query)]
+        return [{"_id": document["_id"]} for document in matching[::max(1, len(matching) // size)]]
+
+
+class _FakeCursor(list):
+    def skip(self, n):
+        return _FakeCursor(self[n:])
+
+    def limit(self, n):
+        return _FakeCursor(self[:n])
+
+
+def _data_ingestion_with_documents(monkeypatch, tmp_path, documents, backend="fake"):
+    monkeypatch.setenv("MONGODB_URL", "mongodb://localhost:27017")
+    from networksecurity.componenets.data_ingestion import DataIngestion
+    from networksecurity.entity.config_entity import DataIngestionConfig, TrainingPipelineConfig
+
+    config = DataIngestionConfig(TrainingPipelineConfig())
+    config.cursor_batch_size = 7
+    config.persistent_feature_store_file_path = str(tmp_path / "feature_store" / "phisingData.csv")
+    data_ingestion = DataIngestion(config)
+    if backend == "mongomock":
+        mongomock = pytest.importorskip("mongomock")
+        data_ingestion.mongo_client = mongomock.MongoClient()
+        collection = data_ingestion.mongo_client[config.database_name][config.collection_name]
+        collection.insert_many([dict(document) for document in documents])
+    else:
+        collection = _FakeCollection(documents)
+        data_ingestion.mongo_client = {config.database_name: {config.collection_name: collection}}
+    return data_ingestion, collection
+
+
+def test_streaming_export_projects_schema_columns_into_int8(monkeypatch, tmp_path):
+    import numpy as np
+    from bson import ObjectId
+    from networksecurity.utils.main_utils.utils import read_yaml_file
+
+    columns = list(read_yaml_file("data_schema/schema.yaml")["columns"])
+    rng = np.random.default_rng(0)
+    documents = [dict(zip(columns, map(int, rng.choice([-1, 1], size=len(columns)))), _id=ObjectId(), extra="x" * 100)
+                 for _ in range(30)]
+    del documents[4][columns[3]]
+
+    data_ingestion, collection = _data_ingestion_with_documents(monkeypatch, tmp_path, documents)
+    df = data_ingestion.export_collection_as_dataframe()
+    assert df.columns.tolist() == columns and len(df) == 29
+    assert all(dtype == np.int8 for dtype in df.dtypes)
+    assert df.iloc[4].tolist() == [documents[5][column] for column in columns]
+    assert data_ingestion.watermark == str(documents[-1]["_id"]) and collection.batch_sizes == [7]
+
+    newer = data_ingestion.export_collection_as_dataframe(after_watermark=str(documents[24]["_id"]))
+    assert len(newer) == 5
+
+
+@pytest.mark.parametrize("backend", ["fake", "mongomock"])
+@pytest.mark.parametrize("split_strategy", ["skip", "sample"])
+def test_partitioned_export_matches_sequential_export(monkeypatch, tmp_path, backend, split_strategy):
+    import numpy as np
+    from bson import ObjectId
+    from networksecurity.utils.main_utils.utils import read_yaml_file
+
+    columns = list(read_yaml_file("data_schema/schema.yaml")["columns"])
+    rng = np.random.default_rng(1)
+    documents = [dict(zip(columns, map(int, rng.choice([-1, 0, 1], size=len(columns)))), _id=ObjectId())
+                 for _ in range(200)]
+    data_ingestion, _ = _data_ingestion_with_documents(monkeypatch, tmp_path, documents, backend)
+    config = data_ingestion.data_ingestion_config
+
+    config.read_partitions = 1
+    sequential = data_ingestion.export_collection_as_dataframe()
+
+    config.read_partitions, config.read_concurrency, config.min_partition_size = 5, 3, 10
+    config.split_strategy = split_strategy
+    collection = data_ingestion.mongo_client[config.database_name][config.collection_name]
+    assert len(data_ingestion.compute_split_points(collection, {}, 5)) == 4
+    partitioned = data_ingestion.export_collection_as_dataframe()
+    assert data_ingestion.watermark == str(documents[-1]["_id"])
+    assert partitioned.equals(sequential) and len(partitioned) == 200
+
+    newer = data_ingestion.export_collection_as_dataframe(after_watermark=str(documents[149]["_id"]))
+    assert newer.equals(sequential.iloc[150:].reset_index(drop=True))
+
+
+class _FakeUpsertCollection:
+    """bulk_write of row_hash upserts with a unique row_hash index, the first call fails with a dropped connection"""
+
+    def __init__(self):
+        self.documents = {}
+        self.calls = 0
+
+    def create_index(self, key, unique=False):
+        self.index = (key, unique)
+
+    def bulk_write(self, requests, ordered=True):
+        from types import SimpleNamespace
+        from bson import ObjectId
+        from pymongo.errors import AutoReconnect
+
+        self.calls += 1
+        if self.calls == 1:
+            raise AutoReconnect("connection reset")
+        upserted = 0
+        for request in requests:
+            assert request._upsert and set(request._doc) == {"$setOnInsert"}
+            row_hash = request._filter["row_hash"]
+            if row_hash not in self.documents:
+                self.documents[row_hash] = dict(request._doc["$setOnInsert"], _id=ObjectId())
+                upserted += 1
+        return SimpleNamespace(upserted_count=upserted)
+
+
+def test_bulk_loader_is_idempotent_and_keeps_duplicate_rows(tmp_path, monkeypatch):
+    import pandas as pd
+    import push_data
+
+    monkeypatch.setattr(push_data.time, "sleep", lambda seconds: None)
+    file_path = tmp_path / "data.csv"
+    pd.DataFrame({"a": [1, 1, -1, 0, 1] * 5, "Result": [1, 1, -1, -1, 1] * 5}).to_csv(file_path, index=False)
+    collection = _FakeUpsertCollection()
+    loader = push_data.NetworkDataExtract()
+
+    stats = loader.bulk_load(file_path, "db", collection, chunk_size=7, batch_size=3, workers=2)
+    assert stats["read"] == 25 and stats["inserted"] == 25 and stats["skipped"] == 0
+    assert collection.index == ("row_hash", True)
+    assert sorted(document["a"] for document in collection.documents.values()) == sorted([1, 1, -1, 0, 1] * 5)
+
+    stats = loader.bulk_load(file_path, "db", collection, chunk_size=10, batch_size=4, workers=3)
+    assert stats["inserted"] == 0 and stats["skipped"] == 25 and len(collection.documents) == 25
+    assert stats["docs_per_second"] > 0
+
+
+def test_bulk_loader_row_hashes_ignore_chunk_dtypes_and_row_positions(tmp_path, monkeypatch):
+    import pandas as pd
+    import push_data
+
+    monkeypatch.setattr(push_data.time, "sleep", lambda seconds: None)
+    # a NaN makes some chunks float64, the text column makes others object
+    data = pd.DataFrame({"a": [1, None, -1, 0, 1, 1, 0, -1], "b": ["x", "y", "x", "x", "y", "x", "x", "x"],
+                         "Result": [1, 1, -1, -1, 1, 1, -1, 1]})
+    file_path = tmp_path / "data.csv"
+    data.to_csv(file_path, index=False)
+    collection = _FakeUpsertCollection()
+    loader = push_data.NetworkDataExtract()
+    assert loader.bulk_load(file_path, "db", collection, chunk_size=3, batch_size=2, workers=2)["inserted"] == 8
+
+    stats = loader.bulk_load(file_path, "db", collection, chunk_size=8, batch_size=5, workers=1)
+    assert stats["inserted"] == 0 and len(collection.documents) == 8
+
+    # a row inserted at the top leaves the ids of every other row unchanged
+    pd.concat([data.iloc[[2]], data]).to_csv(file_path, index=False)
+    stats = loader.bulk_load(file_path, "db", collection, chunk_size=4, batch_size=3, workers=2)
+    assert stats["inserted"] == 1 and stats["skipped"] == 8 and len(collection.documents) == 9
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow", "csv"])
+def test_frame_store_round_trips_and_appends_int8_frames(tmp_path, file_format):
+    import numpy as np
+    import pandas as pd
+    from networksecurity.utils.main_utils.frame_store import append_frame, artifact_file_name, read_frame, write_frame
+
+    file_path = str(tmp_path / artifact_file_name("train.csv", file_format))
+    assert file_path.endswith({"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}[file_format])
+    data = pd.DataFrame({"a": [-1, 0, 1], "Result": [1, -1, 1]}, dtype=np.int8)
+    write_frame(data.iloc[1:], file_path)
+    pd.testing.assert_frame_equal(read_frame(file_path), data.iloc[1:].reset_index(drop=True))
+
+    write_frame(data, file_path)
+    append_frame(data[["Result", "a"]], file_path)
+    append_frame(data, file_path)
+    stored = read_frame(file_path)
+    assert all(dtype == np.int8 for dtype in stored.dtypes)
+    pd.testing.assert_frame_equal(stored[["a", "Result"]], pd.concat([data] * 3, ignore_index=True))
+
+
+def test_frame_store_recovers_interrupted_conversion_to_parts(tmp_path, monkeypatch):
+    import numpy as np
+    import pandas as pd
+    from networksecurity.exception.exceptions import NetworkSecurityException
+    from networksecurity.utils.main_utils.frame_store import append_frame, read_frame, write_frame
+
+    data = pd.DataFrame({"a": [-1, 0, 1], "Result": [1, -1, 1]}, dtype=np.int8)
+    file_path = str(tmp_path / "feature_store.parquet")
+    write_frame(data, file_path)
+    replace = os.replace
+
+    def crash_after_moving_the_file(source, destination):
+        replace(source, destination)
+        if os.path.basename(destination).startswith("part-"):
+            raise OSError("crashed before the part directory replaced the file")
+
+    monkeypatch.setattr(os, "replace", crash_after_moving_the_file)
+    with pytest.raises(NetworkSecurityException):
+        append_frame(data, file_path)
+    monkeypatch.undo()
+    assert not os.path.exists(file_path) and os.path.isdir(file_path + ".tmp")
+
+    # the history moved into the .tmp directory is kept, not replaced by a new frame
+    append_frame(data, file_path)
+    pd.testing.assert_frame_equal(read_frame(file_path), pd.concat([data] * 2, ignore_index=True))
+    assert not os.path.exists(file_path + ".tmp")
+
+    # crashed before the file was moved, the empty directory is dropped
+    other_file_path = str(tmp_path / "other.parquet")
+    write_frame(data, other_file_path)
+    os.makedirs(other_file_path + ".tmp")
+    append_frame(data, other_file_path)
+    pd.testing.assert_frame_equal(read_frame(other_file_path), pd.concat([data] * 2, ignore_index=True))
+
+
+def test_stage_cache_reuses_artifacts_until_inputs_change(tmp_path, monkeypatch):
+    from networksecurity.constant import training_pipeline
+    from networksecurity.entity.artifact_entity import DataValidationArtifact
+    from networksecurity.pipeline.stage_cache import StageCache
+
+    input_file = tmp_path / "train.csv"
+    input_file.write_text("a,Result\n1,1\n")
+    output_file = tmp_path / "valid.csv"
+    runs = []
+
+    def compute():
+        runs.append(1)
+        output_file.write_text(input_file.read_text())
+        return DataValidationArtifact(str(output_file), str(output_file), None, None, str(output_file))
+
+    cache = StageCache(cache_dir=str(tmp_path / "cache"))
+    run = lambda: cache.run("data_validation", DataValidationArtifact, compute, input_files=[str(input_file)],
+                            constant_prefixes=["DATA_VALIDATION"], code_modules=[StageCache])
+    assert run() == run() and len(runs) == 1 and cache.hits == ["data_validation"]
+
+    input_file.write_text("a,Result\n0,1\n")
+    run()
+    monkeypatch.setattr(training_pipeline, "DATA_VALIDATION_DRIFT_REPORT_FILE_NAME", "other.yaml")
+    run()
+    assert len(runs) == 3
+
+    run()
+    output_file.unlink()
+    run()
+    assert len(runs) == 4 and cache.hits == ["data_validation"] * 2
+
+
+def test_dag_executor_runs_independent_stages_concurrently_and_resumes(tmp_path):
+    import threading
+    from networksecurity.entity.artifact_entity import DataValidationArtifact
+    from networksecurity.exception.exceptions import NetworkSecurityException
+    from networksecurity.pipeline.dag import DagExecutor, Stage
+
+    calls = []
+    barrier = threading.Barrier(2, timeout=5)
+    fail = {"train": True}
+
+    def validate():
+        calls.append("validate")
+        return DataValidationArtifact(None, None, None, None, None)
+
+    def train(validation):
+        calls.append("train")
+        if fail["train"]:
+            raise RuntimeError("training failed")
+        return "model"
+
+    def sync(name):
+        def run(model):
+            barrier.wait()  # both syncs must be running at the same time
+            calls.append(name)
+        return run
+
+    stages = [
+        Stage("validate", validate, output="validation", artifact_cls=DataValidationArtifact),
+        Stage("train", train, inputs=["validation"], output="model", artifact_cls=None),
+        Stage("sync_a", sync("sync_a"), inputs=["model"]),
+        Stage("sync_b", sync("sync_b"), inputs=["model"]),
+        Stage("skipped", lambda nothing: calls.append("skipped"), inputs=["nothing"]),
+    ]
+    checkpoint = str(tmp_path / "checkpoint.yaml")
+    with pytest.raises(NetworkSecurityException):
+        DagExecutor(stages, checkpoint_file_path=checkpoint).run(run_key="full")
+    assert calls == ["validate", "train"] and os.path.exists(checkpoint)
+
+    fail["train"] = False
+    executor = DagExecutor(stages, checkpoint_file_path=checkpoint)
+    artifacts = executor.run(run_key="full")
+    assert executor.resumed == ["validate"] and calls.count("validate") == 1
+    assert artifacts["model"] == "model" and sorted(calls[-2:]) == ["sync_a", "sync_b"]
+    assert set(executor.timings) == {"train", "sync_a", "sync_b"} and not os.path.exists(checkpoint)
+
+    with pytest.raises(NetworkSecurityException):
+        DagExecutor(stages + [Stage("cycle", lambda: None, after=["cycle"])])
+
+
+def test_drift_profile_histograms_match_scipy_and_flag_shifted_columns(tmp_path):
+    import numpy as np
+    import pandas as pd
+    from scipy.stats import chi2_contingency
+    from networksecurity.utils.main_utils.feature_matrix import MISSING_CODE
+    from networksecurity.utils.ml_utils.drift import DriftProfile
+
+    rng = np.random.default_rng(0)
+    columns = ["a", "b", "c"]
+    reference = pd.DataFrame(rng.integers(-1, 2, size=(5000, 3)), columns=columns).astype(np.int8)
+    reference.loc[::50, "c"] = MISSING_CODE
+    current = pd.DataFrame(rng.integers(-1, 2, size=(2000, 3)), columns=columns).astype(np.int8)
+    current["b"] = rng.choice([-1, 0, 1], p=[0.7, 0.2, 0.1], size=2000).astype(np.int8)
+    current.loc[::50, "c"] = MISSING_CODE
+
+    profile = DriftProfile.from_frame(reference)
+    with_nan = reference.astype(np.float64).replace(float(MISSING_CODE), np.nan)
+    np.testing.assert_array_equal(DriftProfile.from_frame(with_nan).counts, profile.counts)
+    assert profile.counts[2, -1] == 100 and profile.counts.sum() == reference.size
+
+    report = profile.compare(current)
+    assert report["drifted"].tolist() == [False, True, False]
+    histogram = profile.histogram(current)
+    observed = np.stack([profile.counts[1], histogram[1]])
+    expected_statistic, expected_p_value = chi2_contingency(observed[:, observed.sum(axis=0) > 0])[:2]
+    assert np.isclose(report.loc["b", "chi_square"], expected_statistic)
+    assert np.isclose(report.loc["b", "p_value"], expected_p_value)
+    assert 0 < report.loc["b", "js_divergence"] < 1 and report.loc["b", "psi"] > report.loc["a", "psi"]
+
+    profile.save(str(tmp_path / "profile.json"))
+    restored = DriftProfile.load(str(tmp_path / "profile.json"))
+    pd.testing.assert_frame_equal(restored.compare_counts(histogram), report)
+
+
+def test_reference_profile_is_published_with_model_and_monitors_traffic(tmp_path):
+    import numpy as np
+    from sklearn.dummy import DummyClassifier
+    from sklearn.impute import SimpleImputer
+    from networksecurity.utils.main_utils.utils import save_object
+    from networksecurity.utils.ml_utils.drift import ReferenceProfile
+    from networksecurity.utils.model.drift_monitor import DriftMonitor
+    from networksecurity.utils.model.registry import ModelRegistry, write_model_manifest
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(3000, 4)).astype(np.int8)
+    y = rng.choice([0, 1], p=[0.4, 0.6], size=3000)
+    profile = ReferenceProfile.from_training_data(x[:2000], y[:2000], columns=list("abcd"))
+    profile.update(x[2000:], y[2000:])
+    assert profile.features.n_rows == 3000 and profile.label_counts.tolist() == [(y == 0).sum(), (y == 1).sum(), 0]
+    assert abs(profile.label_prior["1"] - 0.6) < 0.05 and profile.features.missing_rates["a"] == 0
+
+    model_dir = tmp_path / "final_model"
+    model_dir.mkdir()
+    save_object(str(model_dir / "preprocessor.pkl"), SimpleImputer().fit(x))
+    save_object(str(model_dir / "model.pkl"), DummyClassifier().fit(x, y))
+    profile.save(str(model_dir / "reference_profile.json"))
+    write_model_manifest(str(model_dir))
+    registry = ModelRegistry(model_dir=str(model_dir))
+    assert registry.refresh(force=True)
+    served_profile = registry.reference_profile
+    assert served_profile.features.counts.tolist() == profile.features.counts.tolist()
+
+    monitor = DriftMonitor(window_rows=1000, min_rows=500)
+    assert monitor.report() is None
+    # a handful of rows is never reported as drift
+    monitor.observe(served_profile, np.ones((27, x.shape[1]), dtype=x.dtype), np.ones(27, dtype=int))
+    report = monitor.report()
+    assert report["status"] == "insufficient_data" and report["window_rows"] == 27
+    assert report["drifted_columns"] == [] and not report["label_drifted"]
+    for start in range(0, 2000, 250):
+        monitor.observe(served_profile, x[start:start + 250], y[start:start + 250])
+    report = monitor.report()
+    assert report["status"] == "ok" and report["window_rows"] == 1000
+    assert report["drifted_columns"] == [] and not report["label_drifted"]
+
+    shifted = x[:1000].copy()
+    shifted[:, 2] = 1
+    for start in range(0, 1000, 250):
+        monitor.observe(served_profile, shifted[start:start + 250], np.ones(250, dtype=int))
+    report = monitor.report()
+    assert report["window_rows"] == 1000 and report["drifted_columns"] == ["c"] and report["label_drifted"]
+    assert report["label_rates"]["1"] == 1.0
+
+
+def test_fast_imputer_matches_knn_imputer_and_skips_complete_rows():
+    import pickle
+    import numpy as np
+    from sklearn.impute import KNNImputer
+    from sklearn.pipeline import Pipeline
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.utils.ml_utils.imputer import FastImputer
+    from networksecurity.utils.model.estimator import NetworkModel
+
+    rng = np.random.default_rng(0)
+    # continuous features have no ties between neighbours, duplicated rows count separately and
+    # training rows with missing values are donors for the columns they have
+    train = rng.normal(size=(400, 6))
+    train[rng.random(train.shape) < 0.1] = np.nan
+    train = np.vstack([train, train[:100]])
+    query = rng.normal(size=(60, 6))
+    query[rng.random(query.shape) < 0.2] = np.nan
+    for weights in ("uniform", "distance"):
+        expected = KNNImputer(n_neighbors=3, weights=weights).fit(train).transform(query)
+        np.testing.assert_allclose(FastImputer(n_neighbors=3, weights=weights).fit(train).transform(query), expected)
+
+    # ternary rows tie all the time: the donor that sorts first wins, duplicates fill up the neighbours
+    train = np.array([[0, 1, 1], [0, -1, -1], [0, -1, 1], [0, -1, 1], [np.nan, 1, 1], [1, np.nan, 0]])
+    imputer = FastImputer(n_neighbors=1).fit(train)
+    assert imputer.transform([[0, 0, np.nan]]).tolist() == [[0, 0, -1]]
+    assert FastImputer(n_neighbors=2).fit(train).transform([[0, 0, np.nan]]).tolist() == [[0, 0, 0]]
+    # distances only count the columns observed in both rows
+    assert imputer.transform([[1, 0, np.nan]]).tolist() == [[1, 0, 0]]
+
+    def imputed_by_rule(train, query, n_neighbors):
+        n_features = train.shape[1]
+        donors, counts = np.unique(np.where(np.isnan(train), -128, train), axis=0, return_counts=True)
+        donors = np.where(donors == -128, np.nan, donors)
+        expected = query.copy()
+        for i, j in zip(*np.nonzero(np.isnan(query))):
+            neighbours = []
+            for d, (donor, count) in enumerate(zip(donors, counts)):
+                common = ~np.isnan(query[i]) & ~np.isnan(donor)
+                if not np.isnan(donor[j]) and common.any():
+                    distance = ((query[i, common] - donor[common]) ** 2).sum() * n_features / common.sum()
+                    neighbours.append((distance, d, donor[j], count))
+            values = [value for _, _, value, count in sorted(neighbours) for _ in range(count)]
+            expected[i, j] = np.mean(values[:n_neighbors])
+        return expected
+
+    train = rng.integers(-1, 2, size=(300, 8)).astype(float)
+    train[rng.random(train.shape) < 0.05] = np.nan
+    query = rng.integers(-1, 2, size=(100, 8)).astype(float)
+    query[rng.random(query.shape) < 0.1] = np.nan
+    np.testing.assert_array_equal(FastImputer(n_neighbors=3).fit(train).transform(query),
+                                  imputed_by_rule(train, query, 3))
+
+    codes = rng.integers(-1, 2, size=(2000, 8)).astype(float)
+    codes[:, 0] = 1
+    imputer = FastImputer(strategy="mode").fit(codes)
+    row = np.full((1, 8), np.nan)
+    assert imputer.transform(row)[0, 0] == 1
+    assert len(pickle.dumps(FastImputer().fit(codes))) < len(pickle.dumps(KNNImputer().fit(codes))) / 4
+
+    preprocessor = Pipeline([("imputer", FastImputer())]).fit(codes)
+    model = NetworkModel(preprocessor, DecisionTreeClassifier(random_state=0).fit(codes, codes[:, 1] > 0))
+    batch = codes[:5].copy()
+    batch[2, 3] = np.nan
+    calls = []
+    original_transform = FastImputer.transform
+    FastImputer.transform = lambda self, x: calls.append(len(x)) or original_transform(self, x)
+    try:
+        transformed = model.transform(batch)
+    finally:
+        FastImputer.transform = original_transform
+    assert calls == [1]
+    np.testing.assert_array_equal(transformed[[0, 1, 3, 4]], codes[[0, 1, 3, 4]])
+    assert not np.isnan(transformed).any()
+
+
+def test_compiled_tree_engine_is_bit_identical_and_published_with_model(tmp_path):
+    import numpy as np
+    from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression
+    from networksecurity.utils.main_utils.utils import save_object
+    from networksecurity.utils.model.registry import ModelRegistry, write_model_manifest
+    from networksecurity.utils.model.tree_engine import compile_tree_engine
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(1500, 10)).astype(float)
+    y = (x[:, :3].sum(axis=1) + rng.normal(size=1500) > 0).astype(int)
+    y3 = y + (x[:, 4] > 0)
+    models = [RandomForestClassifier(n_estimators=16, random_state=0).fit(x, y3),
+              GradientBoostingClassifier(n_estimators=16, subsample=0.8, random_state=0).fit(x, y),
+              GradientBoostingClassifier(n_estimators=8, random_state=0).fit(x, y3),
+              AdaBoostClassifier(n_estimators=16, random_state=0).fit(x, y)]
+    for model in models:
+        engine = compile_tree_engine(model)
+        for batch in (x[:1], x[100:164], x):
+            assert np.array_equal(engine.predict_proba(batch), model.predict_proba(batch))
+            assert np.array_equal(engine.predict(batch), model.predict(batch))
+    assert compile_tree_engine(LogisticRegression().fit(x, y)) is None
+
+    model_dir = tmp_path / "final_model"
+    model_dir.mkdir()
+    save_object(str(model_dir / "preprocessor.pkl"), SimpleImputer().fit(x))
+    save_object(str(model_dir / "model.pkl"), models[0])
+    save_object(str(model_dir / "model_engine.pkl"), compile_tree_engine(models[0]))
+    write_model_manifest(str(model_dir))
+    registry = ModelRegistry(model_dir=str(model_dir))
+    assert registry.refresh(force=True)
+    network_model = registry.get_model()
+    assert network_model.estimator_for(1) is network_model.engine
+    assert network_model.estimator_for(100_000) is network_model.model
+    assert np.array_equal(network_model.predict(x[:5]), models[0].predict(x[:5]))
+
+
+def test_prediction_cache_matches_model_and_evicts_least_recently_used():
+    import numpy as np
+    from sklearn.impute import SimpleImputer
+    from sklearn.tree import DecisionTreeClassifier
+    from networksecurity.utils.model.estimator import NetworkModel
+    from networksecurity.utils.model.prediction_cache import PredictionCache, pack_keys
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(500, 6)).astype(np.int8)
+    y = (x[:, 0] + x[:, 1] > 0).astype(int)
+    model = NetworkModel(SimpleImputer().fit(x.astype(float)), DecisionTreeClassifier(random_state=0).fit(x, y))
+    keys = pack_keys(x)
+    assert len(np.unique(keys)) == len(np.unique(x, axis=0))
+    assert pack_keys(np.full((1, 6), 5, dtype=np.int8)) is None
+
+    cache = PredictionCache(max_entries=50)
+    assert cache.prewarm(model, x, max_rows=20) == 20
+    batch = x[:40].copy()
+    batch[3, 2] = -128
+    for _ in range(2):
+        labels, probabilities = cache.predict_with_proba(model, batch)
+        expected_labels, expected_probabilities = model.predict_with_proba(batch)
+        assert np.array_equal(labels, expected_labels) and np.array_equal(probabilities, expected_probabilities)
+    metrics = cache.metrics()
+    assert metrics["entries"] <= 50 and metrics["evictions"] > 0
+    assert metrics["hits"] >= 40 and metrics["hits"] + metrics["misses"] == 80
+
+    other_model = NetworkModel(model.preprocessor, DecisionTreeClassifier(max_depth=1).fit(x, 1 - y))
+    labels, _ = cache.predict_with_proba(other_model, x[:5])
+    assert np.array_equal(labels, other_model.predict(x[:5]))
+    assert cache.metrics()["hits"] == 0 and cache.metrics()["prewarmed"] == 0
+
+
+def test_operating_threshold_is_chosen_at_training_and_served_with_scores(tmp_path):
+    import numpy as np
+    from types import SimpleNamespace
+    from sklearn.impute import SimpleImputer
+    from sklearn.linear_model import LogisticRegression
+    from networksecurity.componenets.model_trainer import ModelTrainer
+    from networksecurity.utils.ml_utils.metric.classification_metric import choose_threshold
+    from networksecurity.utils.model.registry import ModelRegistry
+
+    rng = np.random.default_rng(0)
+    x = rng.integers(-1, 2, size=(2000, 6)).astype(float)
+    y = (x[:, :2].sum(axis=1) + rng.normal(scale=1.5, size=2000) > 0).astype(int)
+    model = LogisticRegression().fit(x, y)
+    scores = model.predict_proba(x)[:, 1]
+
+    for metric, target in (("precision", 0.85), ("recall", 0.9)):
+        point = choose_threshold(y, scores, metric=metric, target=target)
+        predicted = scores >= point["threshold"]
+        precision, recall = y[predicted].mean(), predicted[y == 1].mean()
+        assert (precision if metric == "precision" else recall) >= target
+        assert np.isclose(precision, point["precision"]) and np.isclose(recall, point["recall"])
+    assert choose_threshold(y, scores, metric="precision", target=1.01) is None
+
+    trainer = ModelTrainer.__new__(ModelTrainer)
+    trainer.model_trainer_config = SimpleNamespace(final_model_dir=str(tmp_path / "final_model"),
+                                                   threshold_metric="precision", threshold_target=0.85,
+                                                   search_cv=3, search_n_jobs=1)
+    # the threshold is chosen out of fold on the training rows and reported on the test rows
+    x_train, y_train, y_test = x[:1500], y[:1500], y[1500:]
+    validation_proba = trainer.out_of_fold_proba(model, x_train, y_train)
+    assert validation_proba.shape == (1500,) and not np.allclose(validation_proba, scores[:1500])
+    metadata = trainer.model_metadata(model, y_train, validation_proba, y_test, scores[1500:])
+    assert metadata["model"] == "LogisticRegression" and metadata["validation_precision"] >= 0.85
+    point = choose_threshold(y_train, validation_proba, metric="precision", target=0.85)
+    assert metadata["threshold"] == point["threshold"]
+    predicted = scores[1500:] >= metadata["threshold"]
+    assert np.isclose(metadata["test_precision"], y_test[predicted].mean())
+    assert np.isclose(metadata["test_recall"], predicted[y_test == 1].mean())
+    trainer.push_model(SimpleImputer().fit(x), model, metadata=metadata)
+
+    registry = ModelRegistry(model_dir=str(tmp_path / "final_model"))
+    assert registry.refresh(force=True)
+    network_model = registry.get_model()
+    assert network_model.threshold == metadata["threshold"]
+    result = network_model.score(x)
+    assert result["threshold"] == metadata["threshold"]
+    assert np.array_equal(result["scores"], scores)
+    assert np.array_equal(result["labels"], (scores >= metadata["threshold"]).astype(int))
+    assert np.array_equal(network_model.predict(x), result["labels"])
+
+
+def test_serving_import_defers_training_dependencies_within_budget():
+    import subprocess
+    import sys
+    from networksecurity.constant.training_pipeline import SERVING_DEFERRED_IMPORTS, SERVING_IMPORT_TIME_BUDGET_SECONDS
+
+    probe = (
+        "import sys, threading, time\n"
+        "started = time.perf_counter()\n"
+        "import app\n"
+        "print(time.perf_counter() - started)\n"
+        f"print([name for name in {SERVING_DEFERRED_IMPORTS!r} if name in sys.modules])\n"
+        "print([thread.name for thread in threading.enumerate() if thread.name == 'training-jobs'])\n"
+        "import networksecurity.componenets.model_trainer\n"
+        "print('mlflow' in sys.modules)\n"
+    )
+    # serving must start without training-only configuration such as MONGODB_URL
+    env = {key: value for key, value in os.environ.items() if key != "MONGODB_URL"}
+    timings = []
+    for _ in range(3):
+        result = subprocess.run([sys.executable, "-c", probe], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env=env, capture_output=True, text=True, check=True)
+        seconds, loaded, threads, mlflow_loaded = result.stdout.strip().splitlines()[-4:]
+        assert loaded == "[]"
+        # the training job dispatcher starts with the app, not at import
+        assert threads == "[]"
+        assert mlflow_loaded == "False"
+        timings.append(float(seconds))
+        if timings[-1] <= SERVING_IMPORT_TIME_BUDGET_SECONDS:
+            break
+    assert min(timings) <= SERVING_IMPORT_TIME_BUDGET_SECONDS
+
+
+def test_training_pipeline_runs_and_caches_data_validation(tmp_path):
+    from networksecurity.entity.artifact_entity import ArtifactEntity
+    from networksecurity.pipeline.stage_cache import StageCache
+    from networksecurity.pipeline.training_pipeline import TrainingPipeline
+    from networksecurity.utils.main_utils.feature_matrix import read_compact_csv
+    from networksecurity.utils.main_utils.frame_store import artifact_file_name, write_frame
+
+    data = read_compact_csv(os.path.join("Network_Data", "phisingData.csv")).head(400)
+    train_file_path = str(tmp_path / "ingested" / artifact_file_name("train.csv"))
+    test_file_path = str(tmp_path / "ingested" / artifact_file_name("test.csv"))
+    write_frame(data.iloc[:300], train_file_path)
+    write_frame(data.iloc[300:], test_file_path)
+
+    pipeline = TrainingPipeline()
+    pipeline.training_pipeline_config.artifact_dir = str(tmp_path / "artifacts")
+    pipeline.stage_cache = StageCache(cache_dir=str(tmp_path / "cache"))
+    data_ingestion_artifact = ArtifactEntity(train_file_path=train_file_path, test_file_path=test_file_path)
+    first = pipeline.start_data_validation(data_ingestion_artifact)
+    assert os.path.exists(first.valid_train_file_path) and os.path.exists(first.drift_report_file_path)
+    assert pipeline.start_data_validation(data_ingestion_artifact) == first
+    assert pipeline.stage_cache.hits == ["data_validation"]
+
+
+def test_training_pipeline_resumes_checkpoint_only_on_unchanged_source(tmp_path, monkeypatch):
+    monkeypatch.setenv("MONGODB_URL", "mongodb://localhost:27017")
+    from networksecurity.componenets.data_ingestion import DataIngestion
+    from networksecurity.entity.artifact_entity import (ArtifactEntity, ClassificationMetricArtifact,
+                                                        DataTransformationArtifact, DataValidationArtifact,
+                                                        ModelTrainerArtifact)
+    from networksecurity.exception.exceptions import NetworkSecurityException
+    from networksecurity.pipeline.training_jobs import clear_training_checkpoint
+    from networksecurity.pipeline.training_pipeline import TrainingPipeline
+    from networksecurity.pipeline.training_state import TrainingState
+
+    source = {"count": 400, "newest_id": "a"}
+    monkeypatch.setattr(DataIngestion, "source_fingerprint", lambda self: dict(source))
+    data_file_path = tmp_path / "data.csv"
+    data_file_path.write_text("a\n1\n")
+    ingested, trained = [], []
+
+    def start_data_ingestion(mode, watermark=None):
+        ingested.append(source["count"])
+        return ArtifactEntity(str(data_file_path), str(data_file_path), mode=mode,
+                              watermark=source["newest_id"], n_records=source["count"])
+
+    def start_model_trainer(data_transformation_artifact, mode):
+        trained.append(ingested[-1])
+        if len(trained) < 3:
+            raise RuntimeError("training failed")
+        metric = ClassificationMetricArtifact(1.0, 1.0, 1.0)
+        return ModelTrainerArtifact(str(data_file_path), metric, metric)
+
+    pipeline = TrainingPipeline()
+    config = pipeline.training_pipeline_config
+    config.checkpoint_file_path = str(tmp_path / "checkpoint.yaml")
+    config.training_state_file_path = str(tmp_path / "training_state.yaml")
+    config.stage_timings_file_path = str(tmp_path / "stage_timings.yaml")
+    pipeline.start_data_ingestion = start_data_ingestion
+    pipeline.start_data_validation = lambda data_ingestion_artifact: DataValidationArtifact(
+        str(data_file_path), str(data_file_path), None, None, str(data_file_path))
+    pipeline.start_data_transformation = lambda data_validation_artifact, mode: DataTransformationArtifact(
+        str(data_file_path), str(data_file_path), str(data_file_path))
+    pipeline.start_model_trainer = start_model_trainer
+    pipeline.sync_artifact_dir_to_s3 = lambda: None
+    pipeline.sync_saved_model_dir_to_s3 = lambda: None
+
+    with pytest.raises(NetworkSecurityException):
+        pipeline.run_pipeline(mode="full")
+    # same source data, the failed run is resumed after its finished stages
+    with pytest.raises(NetworkSecurityException):
+        pipeline.run_pipeline(mode="full")
+    assert ingested == [400] and trained == [400, 400]
+
+    # documents were added since, the old snapshot is not trained on
+    source.update(count=450, newest_id="b")
+    assert pipeline.run_pipeline(mode="full") is not None
+    assert ingested == [400, 450] and trained == [400, 400, 450]
+    state = TrainingState.load(config.training_state_file_path)
+    assert state.watermark == "b" and not os.path.exists(config.checkpoint_file_path)
+
+    trained.clear()
+    with pytest.raises(NetworkSecurityException):
+        pipeline.run_pipeline(mode="full")
+    clear_training_checkpoint(config.checkpoint_file_path)
+    with pytest.raises(NetworkSecurityException):
+        pipeline.run_pipeline(mode="full")
+    assert ingested == [400, 450, 450, 450]
+
+
+def test_read_compact_csv_keeps_out_of_range_codes_wide():
+    import io
+    import numpy as np
+    from networksecurity.utils.main_utils.feature_matrix import FeatureMatrix, read_compact_csv
+
+    frame = read_compact_csv(io.StringIO("a,b\n1,-1\n0,0\n-1,1\n"))
+    assert all(dtype == np.int8 for dtype in frame.dtypes)
+
+    frame = read_compact_csv(io.StringIO("a,b\n1,-1\n128,0\n255,1\n"))
+    assert frame["a"].tolist() == [1, 128, 255] and frame["a"].dtype != np.int8
+    assert frame["b"].dtype == np.int8
+    with pytest.raises(ValueError):
+        FeatureMatrix.from_frame(frame)
+
+
+def test_batch_prediction_uses_published_threshold_like_online_scoring(tmp_path):
+    import numpy as np
+    import pandas as pd
+    from sklearn.linear_model import LogisticRegression
+    from networksecurity.pipeline.batch_prediction import BatchPrediction, BatchPredictionConfig
+    from networksecurity.entity.config_entity import TrainingPipelineConfig
+    from networksecurity.constant.training_pipeline import FINAL_MODEL_DIR, FINAL_MODEL_METADATA_FILE_NAME
+    from networksecurity.utils.main_utils.utils import load_object, save_object, write_yaml_file
+    from networksecurity.utils.model.registry import ModelRegistry, write_model_manifest
+
+    assert BatchPredictionConfig(TrainingPipelineConfig()).model_metadata_file_path == \
+        os.path.join(FINAL_MODEL_DIR, FINAL_MODEL_METADATA_FILE_NAME)
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path, n_rows=200)
+    features = pd.read_csv(input_file_path)
+    rng = np.random.default_rng(1)
+    labels = (features.iloc[:, 0] + rng.normal(size=len(features)) > 0).astype(int)
+    x = load_object(config.preprocessor_file_path).transform(features.to_numpy(dtype=float))
+    model = LogisticRegression().fit(x, labels)
+    save_object(config.model_file_path, model)
+    # a threshold away from 0.5, so argmax and the operating threshold label rows differently
+    threshold = float(np.quantile(model.predict_proba(x)[:, 1], 0.2))
+    write_yaml_file(config.model_metadata_file_path, {"threshold": threshold})
+    write_model_manifest(str(tmp_path))
+
+    registry = ModelRegistry(model_dir=str(tmp_path))
+    assert registry.refresh(force=True)
+    online_labels, online_scores = registry.get_model().predict_with_proba(features.to_numpy(dtype=np.int8))
+    assert not np.array_equal(online_labels, model.predict(x))
+
+    artifact = BatchPrediction(config).initiate_batch_prediction(features)
+    predictions = pd.read_csv(artifact.prediction_file_path)
+    np.testing.assert_array_equal(predictions["predicted_result"].to_numpy(), online_labels)
+    np.testing.assert_allclose(predictions["predicted_score"].to_numpy(), online_scores)
+
+
+def test_micro_batcher_fails_only_the_malformed_batch_and_keeps_serving():
+    import asyncio
+    import numpy as np
+    from networksecurity.utils.model.batcher import MicroBatcher
+
+    async def run():
+        batcher = MicroBatcher(lambda x: (x.sum(axis=1),), max_batch_size=64, max_wait_ms=50, max_queue_depth=100)
+        await batcher.start()
+        # rows of different widths cannot be stacked into one batch
+        malformed = await asyncio.wait_for(asyncio.gather(
+            batcher.submit(np.ones((2, 3))), batcher.submit(np.ones((2, 4))), return_exceptions=True), timeout=5)
+        (sums,) = await asyncio.wait_for(batcher.submit(np.ones((2, 3))), timeout=5)
+        await batcher.stop()
+        return malformed, sums
+
+    malformed, sums = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in malformed)
+    assert np.array_equal(sums, [3.0, 3.0])
+
+
+def test_stage_cache_fingerprint_covers_imported_modules(tmp_path, monkeypatch):
+    import importlib
+    import sys
+    from networksecurity.componenets import data_transformation, model_trainer
+    from networksecurity.entity.artifact_entity import DataValidationArtifact
+    from networksecurity.pipeline.stage_cache import StageCache, code_files
+
+    assert any(path.endswith(os.path.join("ml_utils", "imputer.py")) for path in code_files([data_transformation]))
+    assert any(path.endswith(os.path.join("model", "tree_engine.py")) for path in code_files([model_trainer]))
+
+    package = tmp_path / "stagepkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "stage.py").write_text("from stagepkg import helpers\n")
+    (package / "helpers.py").write_text("def compute():\n    from stagepkg.deep import VALUE\n    return VALUE\n")
+    (package / "deep.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    stage = importlib.import_module("stagepkg.stage")
+
+    output_file = tmp_path / "valid.csv"
+    output_file.write_text("a\n1\n")
+    runs = []
+
+    def compute():
+        runs.append(1)
+        return DataValidationArtifact(str(output_file), str(output_file), None, None, str(output_file))
+
+    cache = StageCache(cache_dir=str(tmp_path / "cache"))
+    run = lambda: cache.run("data_validation", DataValidationArtifact, compute, code_modules=[stage])
+    run()
+    run()
+    assert len(runs) == 1
+    # a module imported inside a function of a module the stage imports
+    (package / "deep.py").write_text("VALUE = 2\n")
+    run()
+    assert len(runs) == 2
+    for name in [name for name in sys.modules if name.startswith("stagepkg")]:
+        monkeypatch.delitem(sys.modules, name)
+
+
+def test_score_endpoint_reports_the_model_that_scored_the_rows(tmp_path, monkeypatch):
+    import pandas as pd
+    from fastapi.testclient import TestClient
+    from networksecurity.utils.main_utils.utils import write_yaml_file
+    from networksecurity.utils.model.registry import ModelRegistry, write_model_manifest
+    import app
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path)
+    metadata_file_path = str(tmp_path / "model_metadata.yaml")
+    write_yaml_file(metadata_file_path, {"threshold": 0.25})
+    write_model_manifest(str(tmp_path))
+    registry = ModelRegistry(model_dir=str(tmp_path), poll_interval=3600)
+    monkeypatch.setattr(app, "model_registry", registry)
+    monkeypatch.setenv("SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH", "")
+
+    def score_then_swap(x):
+        outputs = app.score_batch(x)
+        # a new model is published while the request is still on its way back
+        write_yaml_file(metadata_file_path, {"threshold": 0.75}, replace=True)
+        write_model_manifest(str(tmp_path))
+        registry.refresh(force=True)
+        return outputs
+
+    records = pd.read_csv(input_file_path).head(5).to_numpy().tolist()
+    with TestClient(app.app) as client:
+        monkeypatch.setattr(app.score_batcher, "predict_fn", score_then_swap)
+        response = client.post("/v1/score", json={"records": records})
+    assert response.status_code == 200
+    assert response.json()["model_version"] == 1 and response.json()["threshold"] == 0.25
+    assert registry.version == 2 and registry.get_model().threshold == 0.75
+
+
+def test_predict_uploads_are_scored_apart_from_the_micro_batcher(tmp_path, monkeypatch):
+    import threading
+    from fastapi.testclient import TestClient
+    from networksecurity.utils.model.registry import ModelRegistry, write_model_manifest
+    import app
+
+    config, input_file_path = _batch_prediction_fixture(tmp_path)
+    write_model_manifest(str(tmp_path))
+    monkeypatch.setattr(app, "model_registry", ModelRegistry(model_dir=str(tmp_path), poll_interval=3600))
+    monkeypatch.setattr(app, "write_prediction_output", lambda df: df.to_html())
+    monkeypatch.setenv("SERVING_PREDICTION_CACHE_PREWARM_FILE_PATH", "")
+    score_batch = app.score_batch
+    threads = []
+
+    def recording_score_batch(x):
+        threads.append(threading.current_thread().name)
+        return score_batch(x)
+
+    monkeypatch.setattr(app, "score_batch", recording_score_batch)
+    with TestClient(app.app) as client, open(input_file_path, "rb") as file_obj:
+        batches = app.score_batcher.batches
+        response = client.post("/predict", files={"file": ("input.csv", file_obj.read())})
+        assert response.status_code == 200 and app.score_batcher.batches == batches
+        assert len(threads) == 1 and threads[0].startswith("bulk-scoring")
+
+        monkeypatch.setattr(app, "bulk_slots", threading.BoundedSemaphore(1))
+        app.bulk_slots.acquire()
+        file_obj.seek(0)
+        assert client.post("/predict", files={"file": ("input.csv", file_obj.read())}).status_code == 503